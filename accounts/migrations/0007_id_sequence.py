@@ -0,0 +1,65 @@
+# Generated by Django 4.2 on 2026-10-18 10:15
+# Sequence cấp id 9 ký tự base-36 cho Post / User + hàm MySQL fn_next_id để SP
+# cấp id từ cùng sequence. sp_post_create hiện có (chỉ nằm trong DB) chưa gọi hàm này.
+
+from django.db import migrations, models
+
+SEQUENCES = ("listings.post", "accounts.user")
+
+# Cùng hoán vị với accounts/services/id_allocator.py::permute (hằng số phải khớp).
+# Server bật binary log cần log_bin_trust_function_creators=1 để tạo hàm.
+CREATE_FN_NEXT_ID = """
+CREATE FUNCTION fn_next_id(p_name VARCHAR(64)) RETURNS CHAR(9)
+    NOT DETERMINISTIC
+    MODIFIES SQL DATA
+BEGIN
+    DECLARE v_n BIGINT UNSIGNED;
+    DECLARE v_x BIGINT UNSIGNED;
+
+    UPDATE accounts_idsequence SET next_value = next_value + 1 WHERE name = p_name;
+    IF ROW_COUNT() = 0 THEN
+        INSERT IGNORE INTO accounts_idsequence (name, next_value) VALUES (p_name, 0);
+        UPDATE accounts_idsequence SET next_value = next_value + 1 WHERE name = p_name;
+    END IF;
+    -- dòng đang bị khoá bởi UPDATE ở trên -> đọc lại trong cùng transaction
+    SELECT next_value - 1 INTO v_n FROM accounts_idsequence WHERE name = p_name;
+
+    SET v_x = (v_n * 48271 + 29394751310387) MOD 101559956668416;
+    SET v_x = CAST(CONV(REVERSE(LPAD(CONV(v_x, 10, 36), 9, '0')), 36, 10) AS UNSIGNED);
+    SET v_x = (v_x * 69623 + 71183614207491) MOD 101559956668416;
+    SET v_x = CAST(CONV(REVERSE(LPAD(CONV(v_x, 10, 36), 9, '0')), 36, 10) AS UNSIGNED);
+    SET v_x = (v_x * 51853 + 13907204551229) MOD 101559956668416;
+    RETURN LPAD(CONV(v_x, 10, 36), 9, '0');
+END
+"""
+
+
+def create_sequences(apps, schema_editor):
+    IdSequence = apps.get_model("accounts", "IdSequence")
+    for name in SEQUENCES:
+        IdSequence.objects.get_or_create(name=name, defaults={"next_value": 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_usermembership_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdSequence',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('next_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_sequences, migrations.RunPython.noop),
+        migrations.RunSQL(
+            sql=[
+                "DROP FUNCTION IF EXISTS fn_next_id",
+                CREATE_FN_NEXT_ID,
+            ],
+            reverse_sql=["DROP FUNCTION IF EXISTS fn_next_id"],
+        ),
+    ]
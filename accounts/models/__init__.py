@@ -7,6 +7,7 @@ from .user_action_history import UserActionHistory
 from .membership_plan import MembershipPlan
 from .membership_order import MembershipOrder
 from .user_membership import UserMembership
+from .id_sequence import IdSequence
 __all__ = [
     'User',
     'Permission',
@@ -17,4 +18,5 @@ __all__ = [
     'MembershipPlan',
     'MembershipOrder',
     'UserMembership',
+    'IdSequence',
 ]
\ No newline at end of file
@@ -0,0 +1,19 @@
+# accounts/models/id_sequence.py
+
+from django.db import models
+
+
+class IdSequence(models.Model):
+    """
+    Bộ đếm cấp id 9 ký tự base-36 (xem accounts/services/id_allocator.py).
+    Mỗi process xin 1 khối giá trị [next_value, next_value + n) bằng 1 câu UPDATE,
+    rồi tự cấp id trong bộ nhớ. Hàm MySQL fn_next_id(name) cấp từ cùng sequence
+    cho SP, nhưng sp_post_create (chỉ có trong DB, không thuộc migration) chưa
+    gọi hàm này mà vẫn sinh id ngẫu nhiên -> xem id_allocator.insert_with_new_id.
+    """
+
+    name = models.CharField(primary_key=True, max_length=64)
+    next_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} -> {self.next_value}"
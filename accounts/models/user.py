@@ -1,14 +1,7 @@
-import string, random
+from functools import partial
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
-def generate_unique_id(model, field_name="id", length=9):
-    chars = string.ascii_uppercase + string.digits
-    while True:
-        new_id = "".join(random.choices(chars, k=length))
-        if not model.objects.filter(**{field_name: new_id}).exists():
-            return new_id
-
 class User(AbstractUser):
     id = models.CharField(primary_key=True, max_length=9, editable=False)
 
@@ -40,7 +33,13 @@ class User(AbstractUser):
 
     def save(self, *args, **kwargs):
         if not self.id:
-            self.id = generate_unique_id(User)
+            # cấp từ khối sequence giữ trước, không query bảng
+            from accounts.services.id_allocator import insert_with_new_id
+
+            # id vừa cấp -> INSERT thẳng, bỏ UPDATE thử trước
+            kwargs.setdefault("force_insert", True)
+            insert_with_new_id(self, partial(super().save, *args, **kwargs))
+            return
         super().save(*args, **kwargs)
 
     class Meta:
@@ -0,0 +1,199 @@
+# accounts/services/id_allocator.py
+
+import threading
+from collections import deque
+from typing import Callable, Deque, List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+
+from accounts.models import IdSequence
+
+ID_LENGTH = 9
+ID_SPACE = 36 ** ID_LENGTH  # 101_559_956_668_416 id khả dụng
+_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Hoán vị song ánh trên [0, 36^9): affine -> đảo chữ số base-36 -> affine -> đảo -> affine.
+# Hệ số nhân nguyên tố cùng nhau với 36 (lẻ, không chia hết cho 3) và đủ nhỏ để
+# x * A + B không tràn BIGINT UNSIGNED trong hàm MySQL fn_next_id (migration 0007).
+# KHÔNG được đổi sau khi đã cấp id (đổi sẽ sinh lại id cũ).
+ROUNDS = (
+    (48_271, 29_394_751_310_387),
+    (69_623, 71_183_614_207_491),
+    (51_853, 13_907_204_551_229),
+)
+
+SEQUENCE_POST = "listings.post"
+SEQUENCE_USER = "accounts.user"
+
+_SEQUENCE_TABLE = IdSequence._meta.db_table
+_local = threading.local()
+
+
+class SequenceExhausted(Exception):
+    pass
+
+
+# ========== HOÁN VỊ ==========
+def to_base36(value: int, length: int = ID_LENGTH) -> str:
+    chars = []
+    for _ in range(length):
+        value, rem = divmod(value, 36)
+        chars.append(_DIGITS[rem])
+    return "".join(reversed(chars))
+
+
+def permute(n: int) -> str:
+    """
+    Số thứ tự n -> id 9 ký tự (A-Z0-9). Khác n -> khác id; id liên tiếp
+    không lộ thứ tự / số lượng bài.
+    """
+    if not 0 <= n < ID_SPACE:
+        raise SequenceExhausted(f"Số thứ tự ngoài khoảng id: {n}")
+    x = n
+    for i, (mult, add) in enumerate(ROUNDS):
+        if i:
+            x = int(to_base36(x)[::-1], 36)
+        x = (x * mult + add) % ID_SPACE
+    return to_base36(x)
+
+
+# ========== GIỮ KHỐI ==========
+def _reservation_connection():
+    # connection riêng (autocommit) cho mỗi thread: khối đã giữ không bị
+    # rollback theo transaction của request, và không giữ khoá dòng lâu
+    conn = getattr(_local, "connection", None)
+    if conn is None:
+        conn = connections.create_connection(DEFAULT_DB_ALIAS)
+        _local.connection = conn
+    return conn
+
+
+def reserve_block(name: str, size: int) -> int:
+    """
+    Giữ [start, start + size) của sequence `name` trong 1 câu lệnh nguyên tử.
+    Trả start.
+    """
+    conn = _reservation_connection()
+    conn.close_if_unusable_or_obsolete()
+    for _ in range(2):
+        with conn.cursor() as cur:
+            if conn.vendor == "mysql":
+                cur.execute(
+                    f"UPDATE {_SEQUENCE_TABLE}"
+                    " SET next_value = LAST_INSERT_ID(next_value + %s) WHERE name = %s",
+                    [size, name],
+                )
+                if cur.rowcount:
+                    cur.execute("SELECT LAST_INSERT_ID()")
+                    return int(cur.fetchone()[0]) - size
+            else:
+                cur.execute(
+                    f"UPDATE {_SEQUENCE_TABLE}"
+                    " SET next_value = next_value + %s WHERE name = %s"
+                    " RETURNING next_value",
+                    [size, name],
+                )
+                row = cur.fetchone()
+                if row:
+                    return int(row[0]) - size
+            # sequence chưa có -> tạo (trùng do process khác tạo cùng lúc thì bỏ qua)
+            insert = "INSERT IGNORE INTO" if conn.vendor == "mysql" else "INSERT INTO"
+            suffix = "" if conn.vendor == "mysql" else " ON CONFLICT DO NOTHING"
+            cur.execute(
+                f"{insert} {_SEQUENCE_TABLE} (name, next_value) VALUES (%s, 0){suffix}",
+                [name],
+            )
+    raise RuntimeError(f"Không giữ được khối id cho sequence {name}")
+
+
+# ========== CẤP ID ==========
+class IdAllocator:
+    """
+    Cấp id cho 1 model từ các khối giữ trước: mỗi `block_size` id chỉ tốn
+    1 UPDATE sequence (+ 1 SELECT đối chiếu id ngẫu nhiên kiểu cũ còn trong bảng),
+    không query gì cho từng dòng. Thread-safe.
+    """
+
+    def __init__(self, sequence: str, model=None, block_size: Optional[int] = None):
+        self.sequence = sequence
+        self.model = model
+        self._block_size = block_size
+        self._pool: Deque[str] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def block_size(self) -> int:
+        if self._block_size:
+            return self._block_size
+        config = getattr(settings, "ID_ALLOCATOR", {}) or {}
+        return int(config.get("BLOCK_SIZE", 100))
+
+    def _refill(self, needed: int) -> None:
+        size = max(self.block_size, needed)
+        start = reserve_block(self.sequence, size)
+        ids = [permute(n) for n in range(start, start + size)]
+        if self.model is not None:
+            # id ngẫu nhiên cấp theo cách cũ có thể trùng 1 id trong khối -> bỏ id đó
+            taken = set()
+            for i in range(0, len(ids), 1000):
+                taken.update(
+                    self.model._default_manager.filter(pk__in=ids[i:i + 1000])
+                    .values_list("pk", flat=True)
+                )
+            ids = [i for i in ids if i not in taken]
+        self._pool.extend(ids)
+
+    def allocate(self, count: int) -> List[str]:
+        """
+        `count` id mới (dùng cho bulk_create khi import / seed).
+        """
+        with self._lock:
+            while len(self._pool) < count:
+                self._refill(count - len(self._pool))
+            return [self._pool.popleft() for _ in range(count)]
+
+    def next_id(self) -> str:
+        return self.allocate(1)[0]
+
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+
+def get_allocator(sequence: str, model=None) -> IdAllocator:
+    with _allocators_lock:
+        if sequence not in _allocators:
+            _allocators[sequence] = IdAllocator(sequence, model)
+        return _allocators[sequence]
+
+
+def next_id(model) -> str:
+    return allocate_ids(model, 1)[0]
+
+
+def allocate_ids(model, count: int) -> List[str]:
+    """
+    `count` id cho model (Post, User...). Sequence = "<app_label>.<model_name>".
+    """
+    sequence = f"{model._meta.app_label}.{model._meta.model_name}"
+    return get_allocator(sequence, model).allocate(count)
+
+
+def insert_with_new_id(instance, save: Callable[[], None], attempts: int = 3) -> None:
+    """
+    Gán id mới cho `instance` rồi gọi save() (INSERT thẳng). Khối id chỉ được
+    đối chiếu với bảng lúc giữ; SP (sp_post_create...) vẫn tự sinh id ngẫu nhiên
+    nên có thể chèn trùng 1 id đang nằm trong khối -> trùng khoá chính thì
+    lấy id kế tiếp, thử lại trong savepoint. Lỗi unique khác -> ném ra như cũ.
+    """
+    model = type(instance)
+    for attempt in range(attempts):
+        instance.pk = next_id(model)
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            if attempt == attempts - 1 or not model._default_manager.filter(pk=instance.pk).exists():
+                raise
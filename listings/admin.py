@@ -1,5 +1,30 @@
 from django.contrib import admin
-from .models import Post, PostType, Category, ApprovalStatus, PostStatus, PostHistory, PostImage
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from .models import (
+    Post,
+    PostType,
+    Category,
+    ApprovalStatus,
+    PostStatus,
+    PostHistory,
+    PostHistoryArchive,
+    PostImage,
+)
+
+
+class CappedCountPaginator(Paginator):
+    """
+    Đếm tối đa COUNT_CAP dòng (COUNT trên subquery có LIMIT) thay vì COUNT(*)
+    cả bảng lớn; quá mốc thì admin chỉ phân trang tới COUNT_CAP dòng đầu.
+    """
+
+    COUNT_CAP = 10000
+
+    @cached_property
+    def count(self):
+        return self.object_list.values("pk")[: self.COUNT_CAP].count()
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
@@ -75,10 +100,10 @@ class PostHistoryAdmin(admin.ModelAdmin):
         'change_type',
         'timestamp',
     )
+    # so khớp đúng id (dùng index) thay vì LIKE trên tiêu đề bài cả bảng
     search_fields = (
-        'post__title',
-        'change_type',
-        'actor_id',      # search theo id người thao tác
+        '=post__id',
+        '=actor_id',     # search theo id người thao tác
     )
     list_filter = (
         'change_type',
@@ -87,7 +112,15 @@ class PostHistoryAdmin(admin.ModelAdmin):
     # chỉ FK post là quan hệ, actor_id là CharField nên không đưa vào đây
     list_select_related = ('post',)
     autocomplete_fields = ('post',)
-    ordering = ('-timestamp',)
+    ordering = ('-timestamp',)   # index post_history_ts_idx
+    paginator = CappedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(PostHistoryArchive)
+class PostHistoryArchiveAdmin(admin.ModelAdmin):
+    list_display = ('id', 'before', 'first_timestamp', 'last_timestamp', 'rows', 'size_bytes', 'path', 'created_at')
+    ordering = ('-created_at',)
 
 @admin.register(PostImage)
 class PostImageAdmin(admin.ModelAdmin):
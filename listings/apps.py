@@ -4,3 +4,17 @@ class ListingsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "listings"
     verbose_name = "Quản lý Bài đăng"
+
+    def ready(self):
+        # Đăng ký các receiver của signal post_changed / danh mục
+        from listings.services import (  # noqa: F401
+            admin_units,
+            detail_cache,
+            masters,
+            post_attributes,
+            post_cards,
+            post_counters,
+            post_geo,
+            search_cache,
+            text_index,
+        )
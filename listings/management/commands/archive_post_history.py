@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from listings.services import post_history
+
+
+class Command(BaseCommand):
+    help = (
+        "Lưu trữ lịch sử bài cũ hơn N tháng ra file JSONL nén gzip "
+        "rồi xoá khỏi PostHistory theo lô"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months", type=int, default=None,
+            help="Giữ lại N tháng gần nhất (mặc định LISTINGS_HISTORY_ARCHIVE['MONTHS'])",
+        )
+        parser.add_argument("--chunk-size", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="Chỉ đếm số dòng sẽ lưu trữ")
+
+    def handle(self, *args, **options):
+        months = options["months"] if options["months"] is not None else post_history.keep_months()
+        if months < 1:
+            raise CommandError("--months phải >= 1")
+
+        before = post_history.cutoff_for(months)
+        result = post_history.archive_before(
+            before, chunk_size=options["chunk_size"], dry_run=options["dry_run"]
+        )
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ {result['rows']} history rows before {before:%Y-%m-%d} (dry run).")
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Archived {result['rows']} history rows before {before:%Y-%m-%d} "
+                f"-> {result['path'] or '(nothing to archive)'}, deleted {result['deleted']}."
+            )
+        )
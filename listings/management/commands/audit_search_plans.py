@@ -0,0 +1,88 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from listings.services import plan_audit, post_query
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN các tổ hợp filter / sort của query tìm kiếm + đếm bài đăng, "
+        "báo index dùng, số dòng quét, filesort / bảng tạm"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Chạy đủ 2^10 tổ hợp filter (mặc định: từng filter + từng cặp)",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Chạy thêm EXPLAIN ANALYZE (thực thi query thật, MySQL >= 8.0.18)",
+        )
+        parser.add_argument(
+            "--sort",
+            action="append",
+            choices=list(post_query.SORT_COLUMNS),
+            help="Chỉ audit các sort này (lặp lại được)",
+        )
+        parser.add_argument(
+            "--json",
+            dest="json_path",
+            help="Ghi kết quả JSON ra file ('-' = stdout) để diff giữa các release",
+        )
+        parser.add_argument(
+            "--fail-on-flagged",
+            action="store_true",
+            help="Exit code 1 nếu có tổ hợp bị đánh dấu (dùng trong CI)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = plan_audit.run_audit(
+                full=options["full"],
+                analyze=options["analyze"],
+                sorts=options["sort"],
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        json_path = options["json_path"]
+        if json_path:
+            data = json.dumps(report, cls=DjangoJSONEncoder, indent=2, ensure_ascii=False)
+            if json_path == "-":
+                self.stdout.write(data)
+                return
+            with open(json_path, "w", encoding="utf-8") as fh:
+                fh.write(data + "\n")
+
+        for entry in report["combinations"]:
+            if not entry["problems"]:
+                continue
+            sort = f" sort={entry['sort']} {entry['order']}" if entry["sort"] else ""
+            self.stdout.write(
+                self.style.WARNING(
+                    f"⚠️  {entry['query']} [{entry['filters']}]{sort}: "
+                    f"{', '.join(entry['problems'])} "
+                    f"(access={entry['access_type']}, key={entry['key']}, "
+                    f"rows≈{entry['rows_examined_estimate']})"
+                )
+            )
+
+        for index in report["unused_watched_indexes"]:
+            self.stdout.write(self.style.WARNING(f"⚠️  Index không được dùng: {index}"))
+
+        total = len(report["combinations"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Audited {total} query plans, {report['flagged']} flagged"
+                + (f" -> {json_path}" if json_path else "")
+            )
+        )
+
+        if options["fail_on_flagged"] and report["flagged"]:
+            sys.exit(1)
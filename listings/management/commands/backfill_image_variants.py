@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from listings.services import image_derivatives
+
+
+class Command(BaseCommand):
+    help = "Sinh thumbnail / medium WebP, blurhash và kích thước cho các ảnh đã upload"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--force", action="store_true", help="Sinh lại cả ảnh đã có derivative")
+
+    def handle(self, *args, **options):
+        written = image_derivatives.backfill(
+            batch_size=options["batch_size"], force=options["force"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Backfilled image variants ({written} images).")
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from listings.services import admin_units
+
+
+class Command(BaseCommand):
+    help = "Tính lại province_code / district_code / ward_code của mọi bài từ address"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = admin_units.backfill(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Backfilled location codes ({written} posts).")
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from listings.services import post_attributes
+
+
+class Command(BaseCommand):
+    help = "Tách thuộc tính có kiểu (phòng ngủ, phòng tắm, hướng, pháp lý, giá/m²) cho mọi bài"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = post_attributes.backfill(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Backfilled post attributes ({written} posts).")
+        )
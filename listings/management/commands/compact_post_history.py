@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from listings.services import post_history
+
+
+class Command(BaseCommand):
+    help = "Gom các dòng lịch sử bump liên tiếp của mỗi bài thành 1 dòng (bump_count)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-hours", type=int, default=24,
+            help="Chỉ gom dòng cũ hơn số giờ này (mặc định 24)",
+        )
+        parser.add_argument(
+            "--days", type=int, default=None,
+            help="Chỉ xét N ngày gần nhất (chạy định kỳ); bỏ trống = toàn bộ bảng",
+        )
+        parser.add_argument("--post-batch", type=int, default=500)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        before = now - timedelta(hours=max(0, options["older_than_hours"]))
+        since = now - timedelta(days=options["days"]) if options["days"] else None
+        stats = post_history.compact_bumps(before, since=since, post_batch=options["post_batch"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Compacted post history: {stats['runs']} bump runs, "
+                f"{stats['deleted']} rows removed ({stats['posts']} posts scanned)."
+            )
+        )
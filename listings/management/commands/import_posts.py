@@ -0,0 +1,50 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from listings.services import post_import
+
+
+class Command(BaseCommand):
+    help = "Import bài đăng hàng loạt từ file CSV / JSONL cho 1 người đăng"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File .csv / .jsonl")
+        parser.add_argument("--owner", required=True, help="Id người đăng (owner_id)")
+        parser.add_argument("--format", choices=post_import.FORMATS, default=None)
+        parser.add_argument("--agent", action="store_true", help="Áp hạn mức của AGENT")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="Chỉ kiểm tra, không tạo bài")
+        parser.add_argument(
+            "--report", default=None, help="Ghi kết quả từng dòng (JSONL); mặc định stdout"
+        )
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or post_import.detect_format(options["path"])
+        if fmt is None:
+            raise CommandError("Không đoán được định dạng, dùng --format csv|jsonl")
+
+        importer = post_import.PostImporter(
+            owner_id=options["owner"],
+            is_agent_flag=options["agent"],
+            batch_size_=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+        report = open(options["report"], "w", encoding="utf-8") if options["report"] else sys.stdout
+        try:
+            with open(options["path"], "rb") as fh:
+                for result in importer.run(post_import.iter_rows(fh, fmt)):
+                    if report is not sys.stdout or result["status"] not in ("created", "valid"):
+                        report.write(json.dumps(result, ensure_ascii=False) + "\n")
+        finally:
+            if report is not sys.stdout:
+                report.close()
+
+        stats = importer.summary()["summary"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Imported posts ({stats['created']}/{stats['total']} rows,"
+                f" {stats['invalid']} invalid, {stats['quota_exceeded']} over quota)."
+            )
+        )
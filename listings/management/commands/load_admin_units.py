@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from listings.services import admin_units
+
+
+class Command(BaseCommand):
+    help = "Nạp / cập nhật danh mục đơn vị hành chính (tỉnh, quận-huyện, phường-xã)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=None,
+            help="File .json.gz cùng định dạng listings/data/vn_admin_units.json.gz",
+        )
+
+    def handle(self, *args, **options):
+        count = admin_units.load_dataset(options["file"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Loaded admin units ({count} units)."))
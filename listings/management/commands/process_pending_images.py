@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from listings.models import PostImage
+from listings.services import image_pipeline
+
+
+class Command(BaseCommand):
+    help = "Upload lại các ảnh còn pending (vd. sau khi server restart giữa chừng)"
+
+    def handle(self, *args, **options):
+        ids = list(
+            PostImage.objects.filter(status=PostImage.STATUS_PENDING)
+            .order_by("created_at")
+            .values_list("id", flat=True)
+        )
+        ready = sum(1 for image_id in ids if image_pipeline.process_image(image_id))
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Processed pending images ({ready}/{len(ids)} ready).")
+        )
@@ -0,0 +1,33 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from listings.services import bump_log
+
+
+class Command(BaseCommand):
+    help = "Tính lại bảng tổng hợp bump theo ngày (PostBumpDaily) từ PostBumpLog"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD (mặc định: 30 ngày trước)")
+        parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD (mặc định: hôm nay)")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            date_to = date.fromisoformat(options["date_to"]) if options["date_to"] else timezone.localdate()
+            date_from = (
+                date.fromisoformat(options["date_from"])
+                if options["date_from"]
+                else date_to - timedelta(days=30)
+            )
+        except ValueError:
+            raise CommandError("--from/--to phải dạng YYYY-MM-DD")
+
+        total = bump_log.rebuild_rollups(date_from, date_to, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Rebuilt bump rollups {date_from}..{date_to} ({total} bump logs)."
+            )
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from listings.services import post_cards
+
+
+class Command(BaseCommand):
+    help = "Dựng lại read model card bài đăng (PostCard) theo từng lô"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        written = post_cards.rebuild_all(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Rebuilt post cards ({written} public posts).")
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from listings.services import post_counters
+
+
+class Command(BaseCommand):
+    help = "Đếm lại toàn bộ bộ đếm bài đăng (PostCounter / PostCounterLedger)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        counted = post_counters.rebuild_all(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Rebuilt post counters ({counted} public posts).")
+        )
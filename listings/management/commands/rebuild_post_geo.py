@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from listings.services import post_geo
+
+
+class Command(BaseCommand):
+    help = "Build lại index vị trí (PostGeo) từ Post.location"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        indexed = post_geo.rebuild_all(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Rebuilt post geo index ({indexed} posts).")
+        )
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from listings.services import text_index
+
+
+class Command(BaseCommand):
+    help = "Build lại full-text index (BM25) của bài đăng và ghi snapshot cho các worker nạp"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--path",
+            default=None,
+            help="Ghi snapshot ra file khác thay vì LISTINGS_TEXT_INDEX['PATH']",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        index = text_index.build_from_db(batch_size=options["batch_size"])
+        path = text_index.save_snapshot(index, path=options["path"])
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Indexed {len(index)} public posts -> {path} ({elapsed:.1f}s)"
+            )
+        )
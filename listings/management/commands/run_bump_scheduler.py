@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from listings.services import bump_schedules
+
+
+class Command(BaseCommand):
+    help = "Chạy lịch tự đẩy tin: mỗi phút bump theo lô các lịch đến hạn (--once: chạy 1 lượt)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Chạy 1 lượt rồi thoát (cron)")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--interval", type=int, default=60, help="Giây giữa 2 lượt")
+
+    def handle(self, *args, **options):
+        batch = options["batch_size"] or bump_schedules.batch_size()
+        if options["once"]:
+            stats = self._drain(batch)
+            self.stdout.write(self.style.SUCCESS(f"✅ Bump scheduler tick: {stats}"))
+            return
+
+        interval = max(1, options["interval"])
+        self.stdout.write(f"Bump scheduler chạy mỗi {interval}s (Ctrl+C để dừng)")
+        try:
+            while True:
+                close_old_connections()
+                stats = self._drain(batch)
+                if stats["due"]:
+                    self.stdout.write(self.style.SUCCESS(f"✅ Bump scheduler tick: {stats}"))
+                # ngủ tới đầu khoảng kế tiếp (đầu phút với interval 60)
+                time.sleep(interval - time.time() % interval)
+        except KeyboardInterrupt:
+            self.stdout.write("Đã dừng bump scheduler.")
+
+    @staticmethod
+    def _drain(batch: int):
+        # 1 lượt có thể nhiều lô (8h sáng): chạy tới khi hết lịch đến hạn
+        total = {"due": 0, "bumped": 0, "skipped": 0}
+        while True:
+            stats = bump_schedules.tick(limit=batch)
+            for key in total:
+                total[key] += stats[key]
+            if stats["due"] < batch:
+                return total
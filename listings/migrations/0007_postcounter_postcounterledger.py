@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 09:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0006_remove_post_is_vip_remove_post_vip_expired_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCounterLedger',
+            fields=[
+                ('post', models.OneToOneField(db_column='post_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='counter_ledger', serialize=False, to='listings.post')),
+                ('keys', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=255)),
+                ('facet', models.CharField(max_length=32)),
+                ('value', models.CharField(blank=True, default='', max_length=191)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('scope', 'facet', 'value')},
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# SP gộp trang kết quả + tổng số bài vào 1 lần CALL (2 result set).
+
+from django.db import migrations
+
+
+CREATE_SP_POSTS_SEARCH_PAGE = """
+CREATE PROCEDURE sp_posts_search_page(
+    IN p_q            VARCHAR(255),
+    IN p_category_id  BIGINT,
+    IN p_post_type_id BIGINT,
+    IN p_price_min    DECIMAL(15,2),
+    IN p_price_max    DECIMAL(15,2),
+    IN p_area_min     DOUBLE,
+    IN p_area_max     DOUBLE,
+    IN p_province     VARCHAR(255),
+    IN p_district     VARCHAR(255),
+    IN p_ward         VARCHAR(255),
+    IN p_sort         VARCHAR(32),
+    IN p_order        VARCHAR(8),
+    IN p_page         INT,
+    IN p_page_size    INT
+)
+BEGIN
+    -- Result set 1: các bài của trang
+    CALL sp_posts_search(
+        p_q, p_category_id, p_post_type_id,
+        p_price_min, p_price_max, p_area_min, p_area_max,
+        p_province, p_district, p_ward,
+        p_sort, p_order, p_page, p_page_size
+    );
+
+    -- Result set 2: {"total": n}
+    CALL sp_posts_count(
+        p_q, p_category_id, p_post_type_id,
+        p_price_min, p_price_max, p_area_min, p_area_max,
+        p_province, p_district, p_ward
+    );
+END
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0007_postcounter_postcounterledger'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "DROP PROCEDURE IF EXISTS sp_posts_search_page",
+                CREATE_SP_POSTS_SEARCH_PAGE,
+            ],
+            reverse_sql=["DROP PROCEDURE IF EXISTS sp_posts_search_page"],
+        ),
+    ]
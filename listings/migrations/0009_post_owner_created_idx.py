@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 09:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0008_sp_posts_search_page'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['owner_id', '-created_at'], name='listings_po_owner_i_bee875_idx'),
+        ),
+    ]
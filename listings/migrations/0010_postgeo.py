@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-18 09:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0009_post_owner_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostGeo',
+            fields=[
+                ('post', models.OneToOneField(db_column='post_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='geo', serialize=False, to='listings.post')),
+                ('lat', models.FloatField()),
+                ('lng', models.FloatField()),
+                ('cell', models.BigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='postgeo',
+            index=models.Index(fields=['cell'], name='listings_po_cell_473994_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postgeo',
+            index=models.Index(fields=['lat', 'lng'], name='listings_po_lat_6946ab_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2 on 2026-10-18 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0010_postgeo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCard',
+            fields=[
+                ('id', models.CharField(max_length=9, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('area', models.FloatField()),
+                ('price_per_m2', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('category_id', models.IntegerField()),
+                ('category_name', models.CharField(blank=True, default='', max_length=100)),
+                ('post_type_id', models.IntegerField()),
+                ('post_type_name', models.CharField(blank=True, default='', max_length=100)),
+                ('province', models.CharField(blank=True, default='', max_length=191)),
+                ('district', models.CharField(blank=True, default='', max_length=191)),
+                ('ward', models.CharField(blank=True, default='', max_length=191)),
+                ('cover_image_url', models.CharField(blank=True, default='', max_length=500)),
+                ('image_count', models.PositiveIntegerField(default=0)),
+                ('owner_id', models.CharField(max_length=9)),
+                ('created_at', models.DateTimeField()),
+                ('bumped_at', models.DateTimeField(blank=True, null=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['-bumped_at'], name='listings_po_bumped__507b4d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['-created_at'], name='listings_po_created_17faa8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['price'], name='listings_po_price_bcf1f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['area'], name='listings_po_area_91a653_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['category_id'], name='listings_po_categor_a247a9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['post_type_id'], name='listings_po_post_ty_342fb4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['province', 'district', 'ward'], name='listings_po_provinc_18f8ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['owner_id', '-created_at'], name='listings_po_owner_i_55e91b_idx'),
+        ),
+    ]
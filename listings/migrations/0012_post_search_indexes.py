@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-18 10:04
+
+from django.db import migrations, models
+
+
+# Tỉnh/thành nằm trong JSON address -> tách ra cột sinh (VIRTUAL, không tốn
+# chỗ) để index được; không khai báo trong model, ORM không ghi vào cột này.
+ADD_PROVINCE_COLUMN = """
+ALTER TABLE listings_post
+    ADD COLUMN address_province VARCHAR(191)
+    GENERATED ALWAYS AS (JSON_UNQUOTE(JSON_EXTRACT(address, '$.province'))) VIRTUAL
+"""
+
+ADD_PROVINCE_INDEX = """
+CREATE INDEX post_pub_prov_bump_idx ON listings_post
+    (approval_status_id, post_status_id, is_deleted, address_province, bumped_at)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0011_postcard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['approval_status', 'post_status', 'is_deleted', 'bumped_at'], name='post_pub_bump_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['approval_status', 'post_status', 'is_deleted', 'category', 'bumped_at'], name='post_pub_cat_bump_idx'),
+        ),
+        migrations.RunSQL(
+            sql=[ADD_PROVINCE_COLUMN, ADD_PROVINCE_INDEX],
+            reverse_sql=[
+                "DROP INDEX post_pub_prov_bump_idx ON listings_post",
+                "ALTER TABLE listings_post DROP COLUMN address_province",
+            ],
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-18 10:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0012_post_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostAttribute',
+            fields=[
+                ('post', models.OneToOneField(db_column='post_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='attributes', serialize=False, to='listings.post')),
+                ('bedrooms', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('bathrooms', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('direction', models.CharField(blank=True, default='', max_length=2)),
+                ('legal_status', models.CharField(blank=True, default='', max_length=64)),
+                ('price_per_m2', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='postattribute',
+            index=models.Index(fields=['bedrooms'], name='listings_po_bedroom_49c2c1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postattribute',
+            index=models.Index(fields=['bathrooms'], name='listings_po_bathroo_6410c3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postattribute',
+            index=models.Index(fields=['direction'], name='listings_po_directi_0138a2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postattribute',
+            index=models.Index(fields=['legal_status'], name='listings_po_legal_s_2ea037_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postattribute',
+            index=models.Index(fields=['price_per_m2'], name='listings_po_price_p_cb7fff_idx'),
+        ),
+    ]
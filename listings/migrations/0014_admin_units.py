@@ -0,0 +1,106 @@
+# Generated by Django 4.2 on 2026-10-18 10:08
+
+import gzip
+import json
+from pathlib import Path
+
+from django.db import migrations, models
+
+DATASET = Path(__file__).resolve().parent.parent / "data" / "vn_admin_units.json.gz"
+
+
+def load_admin_units(apps, schema_editor):
+    AdminUnit = apps.get_model("listings", "AdminUnit")
+    with gzip.open(DATASET, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    AdminUnit.objects.bulk_create(
+        [
+            AdminUnit(level=level, code=code, parent_code=parent_code, name=name)
+            for level, code, parent_code, name in data["rows"]
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0013_postattribute'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminUnit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.PositiveSmallIntegerField(choices=[(1, 'Tỉnh / Thành phố'), (2, 'Quận / Huyện'), (3, 'Phường / Xã')])),
+                ('code', models.PositiveIntegerField()),
+                ('parent_code', models.PositiveIntegerField(blank=True, null=True)),
+                ('name', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='district_code',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='province_code',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='ward_code',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='postcard',
+            name='district_code',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='postcard',
+            name='province_code',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='postcard',
+            name='ward_code',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['approval_status', 'post_status', 'is_deleted', 'province_code', 'bumped_at'], name='post_pub_provcode_bump_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['district_code'], name='listings_po_distric_001cf9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['ward_code'], name='listings_po_ward_co_6e3e6e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['province_code'], name='listings_po_provinc_9b3ed0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['district_code'], name='listings_po_distric_6ce9dc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['ward_code'], name='listings_po_ward_co_a7bbe0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminunit',
+            index=models.Index(fields=['level', 'parent_code'], name='listings_ad_level_bd9ba3_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='adminunit',
+            unique_together={('level', 'code')},
+        ),
+        migrations.RunPython(load_admin_units, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2 on 2026-10-18 10:14
+
+import ast
+import json
+import re
+from datetime import datetime
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.utils.timezone
+
+# Nội dung cũ là str(dict) của Python: Decimal('1.00'), datetime.datetime(2024, 5, 1, ...)
+_DECIMAL_RE = re.compile(r"Decimal\('([^']*)'\)")
+_DATETIME_RE = re.compile(
+    r"datetime\.datetime\((?P<args>[\d,\s]+?)(?P<tz>,\s*tzinfo=[\w.]+(?:\([^)]*\))?)?\)"
+)
+
+
+def _datetime_repl(m):
+    parts = [int(x) for x in m.group("args").split(",") if x.strip()]
+    value = datetime(*parts).isoformat()
+    return repr(value + ("+00:00" if m.group("tz") else ""))
+
+
+def _to_json_text(text):
+    if text is None:
+        return None
+    try:
+        json.loads(text)
+        return text
+    except ValueError:
+        pass
+    try:
+        value = ast.literal_eval(_DATETIME_RE.sub(_datetime_repl, _DECIMAL_RE.sub(r"'\1'", text)))
+    except (ValueError, SyntaxError):
+        value = {"_legacy": text}
+    if not isinstance(value, dict):
+        value = {"_legacy": text}
+    return json.dumps(value, ensure_ascii=False)
+
+
+def convert_history_to_json(apps, schema_editor):
+    # cột vẫn là TEXT ở bước này -> ghi chuỗi JSON hợp lệ trước khi đổi kiểu cột
+    PostHistory = apps.get_model("listings", "PostHistory")
+    batch = []
+    for row in PostHistory.objects.only("id", "old_content", "new_content").iterator():
+        row.old_content = _to_json_text(row.old_content) or "{}"
+        row.new_content = _to_json_text(row.new_content)
+        batch.append(row)
+        if len(batch) >= 1000:
+            PostHistory.objects.bulk_update(batch, ["old_content", "new_content"])
+            batch = []
+    if batch:
+        PostHistory.objects.bulk_update(batch, ["old_content", "new_content"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0014_admin_units'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_history_to_json, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='posthistory',
+            name='change_type',
+            field=models.CharField(choices=[('update', 'Update'), ('status_change', 'Status Change'), ('delete', 'Delete'), ('bump', 'Bump')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='posthistory',
+            name='new_content',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True),
+        ),
+        migrations.AlterField(
+            model_name='posthistory',
+            name='old_content',
+            field=models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+        migrations.AlterField(
+            model_name='posthistory',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-18 10:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0015_posthistory_json'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postimage',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postimage',
+            name='last_error',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='postimage',
+            name='spool_path',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='postimage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='postimage',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='posts/'),
+        ),
+        migrations.AddIndex(
+            model_name='postimage',
+            index=models.Index(fields=['status', 'created_at'], name='listings_po_status_ba87c1_idx'),
+        ),
+    ]
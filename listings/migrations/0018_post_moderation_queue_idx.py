@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0017_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['approval_status', 'is_deleted', 'created_at'], name='post_moderation_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0018_post_moderation_queue_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuotaCounter',
+            fields=[
+                ('quota_key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('period', models.DateField()),
+                ('used', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-18 10:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0019_quota_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostBumpDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(max_length=16)),
+                ('value', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='postbumplog',
+            name='plan_code',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='postbumplog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='postbumpdaily',
+            index=models.Index(fields=['dimension', 'day', 'count'], name='post_bump_daily_top_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='postbumpdaily',
+            unique_together={('day', 'dimension', 'value')},
+        ),
+    ]
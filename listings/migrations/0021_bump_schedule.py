@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-18 10:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0020_bump_log_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostBumpSchedule',
+            fields=[
+                ('post', models.OneToOneField(db_column='post_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='bump_schedule', serialize=False, to='listings.post')),
+                ('owner_id', models.CharField(db_index=True, max_length=9)),
+                ('times', models.JSONField(default=list)),
+                ('is_active', models.BooleanField(default=True)),
+                ('next_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.CharField(blank=True, default='', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='postbumpschedule',
+            index=models.Index(fields=['is_active', 'next_run_at'], name='post_bump_schedule_due_idx'),
+        ),
+    ]
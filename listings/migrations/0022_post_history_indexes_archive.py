@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-18 10:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0021_bump_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostHistoryArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500)),
+                ('before', models.DateTimeField()),
+                ('first_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('sha256', models.CharField(blank=True, default='', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='posthistory',
+            index=models.Index(fields=['post', 'timestamp'], name='post_history_post_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posthistory',
+            index=models.Index(fields=['timestamp'], name='post_history_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posthistory',
+            index=models.Index(fields=['change_type', 'timestamp'], name='post_history_type_ts_idx'),
+        ),
+    ]
@@ -2,17 +2,35 @@ from .post_type import PostType
 from .category import Category
 from .approval_status import ApprovalStatus
 from .post_status import PostStatus
-from .post_history import PostHistory
+from .post_history import PostHistory, PostHistoryArchive
 from .post import Post
 from .post_image import PostImage
 from .post_bump_log import PostBumpLog
+from .post_bump_daily import PostBumpDaily
+from .post_bump_schedule import PostBumpSchedule
+from .post_counter import PostCounter, PostCounterLedger
+from .post_geo import PostGeo
+from .post_card import PostCard
+from .post_attribute import PostAttribute
+from .admin_unit import AdminUnit
+from .quota_counter import QuotaCounter
 __all__ = [
     "PostType",
     "Category",
     "ApprovalStatus",
     "PostStatus",
     "PostHistory",
+    "PostHistoryArchive",
     "Post",
     "PostImage",
     "PostBumpLog",
+    "PostBumpDaily",
+    "PostBumpSchedule",
+    "PostCounter",
+    "PostCounterLedger",
+    "PostGeo",
+    "PostCard",
+    "PostAttribute",
+    "AdminUnit",
+    "QuotaCounter",
 ]
\ No newline at end of file
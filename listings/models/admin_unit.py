@@ -0,0 +1,35 @@
+# listings/models/admin_unit.py
+
+from django.db import models
+
+
+class AdminUnit(models.Model):
+    """
+    Đơn vị hành chính Việt Nam (tỉnh / quận-huyện / phường-xã) theo mã
+    của Tổng cục Thống kê. Nạp từ listings/data/vn_admin_units.json.gz
+    (migration 0014 hoặc `manage.py load_admin_units`).
+    Mã chỉ duy nhất trong cùng 1 cấp.
+    """
+
+    LEVEL_PROVINCE = 1
+    LEVEL_DISTRICT = 2
+    LEVEL_WARD = 3
+    LEVEL_CHOICES = [
+        (LEVEL_PROVINCE, "Tỉnh / Thành phố"),
+        (LEVEL_DISTRICT, "Quận / Huyện"),
+        (LEVEL_WARD, "Phường / Xã"),
+    ]
+
+    level = models.PositiveSmallIntegerField(choices=LEVEL_CHOICES)
+    code = models.PositiveIntegerField()
+    parent_code = models.PositiveIntegerField(null=True, blank=True)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ("level", "code")
+        indexes = [
+            models.Index(fields=["level", "parent_code"]),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -1,17 +1,10 @@
-import string, random
+import copy
+from functools import partial
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.conf import settings
 
 
-def generate_unique_id(model, field_name="id", length=9):
-    chars = string.ascii_uppercase + string.digits
-    while True:
-        rid = "".join(random.choices(chars, k=length))
-        if not model.objects.filter(**{field_name: rid}).exists():
-            return rid
-
-
 class Post(models.Model):
     id = models.CharField(primary_key=True, max_length=9, editable=False)
 
@@ -55,6 +48,12 @@ class Post(models.Model):
         related_name="posts",
     )
 
+    # Mã đơn vị hành chính (AdminUnit.code) tách từ address lúc ghi,
+    # để lọc địa chỉ bằng so sánh số nguyên có index thay vì chuỗi trong JSON.
+    province_code = models.PositiveIntegerField(null=True, blank=True)
+    district_code = models.PositiveIntegerField(null=True, blank=True)
+    ward_code = models.PositiveIntegerField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
@@ -71,75 +70,145 @@ class Post(models.Model):
             models.Index(fields=["post_status"]),
             models.Index(fields=["-created_at"]),
             models.Index(fields=["-bumped_at"]),  # giúp sort theo bump nhanh hơn
+            # owner-posts phân trang keyset theo (created_at, id)
+            models.Index(fields=["owner_id", "-created_at"]),
+            # hàng đợi duyệt: bài chờ duyệt cũ nhất trước (keyset created_at, id)
+            models.Index(
+                fields=["approval_status", "is_deleted", "created_at"],
+                name="post_moderation_queue_idx",
+            ),
+            # search engine "dynamic": bài public (+ category) theo bumped_at,
+            # ORDER BY bumped_at DESC, id DESC = quét ngược index, không filesort
+            models.Index(
+                fields=["approval_status", "post_status", "is_deleted", "bumped_at"],
+                name="post_pub_bump_idx",
+            ),
+            models.Index(
+                fields=[
+                    "approval_status",
+                    "post_status",
+                    "is_deleted",
+                    "category",
+                    "bumped_at",
+                ],
+                name="post_pub_cat_bump_idx",
+            ),
+            models.Index(
+                fields=[
+                    "approval_status",
+                    "post_status",
+                    "is_deleted",
+                    "province_code",
+                    "bumped_at",
+                ],
+                name="post_pub_provcode_bump_idx",
+            ),
+            models.Index(fields=["district_code"]),
+            models.Index(fields=["ward_code"]),
+            # (approval, status, is_deleted, address_province, bumped_at):
+            # tạo bằng RunSQL trên cột sinh address_province, xem migration 0012.
         ]
 
+    # Các field được ghi lịch sử khi sửa (PostHistory)
+    TRACKED_FIELDS = (
+        "title",
+        "description",
+        "address",
+        "location",
+        "details",
+        "other_info",
+        "area",
+        "price",
+        "approval_status_id",
+        "post_status_id",
+        "bumped_at",  # track luôn bump
+    )
+    # Thay đổi chỉ gồm các field này -> lịch sử ghi trễ theo lô (tần suất cao)
+    BUFFERED_HISTORY_FIELDS = {"bumped_at"}
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._snapshot_tracked()
+
+    def _tracked_names(self, update_fields=None):
+        if update_fields is None:
+            return set(self.TRACKED_FIELDS)
+        return {self._meta.get_field(f).attname for f in update_fields}
+
+    def _snapshot_tracked(self, names=None):
+        # giá trị đang có trong DB (field JSON là dict/list -> copy sâu, tránh bị sửa tại chỗ)
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None or names is None:
+            loaded = self._loaded_values = {}
+        for f in self.TRACKED_FIELDS:
+            if f in self.__dict__ and (names is None or f in names):
+                loaded[f] = copy.deepcopy(self.__dict__[f])
+
+    def _tracked_diff(self, names):
+        loaded = getattr(self, "_loaded_values", None) or {}
+        old_content, new_content = {}, {}
+        for f in self.TRACKED_FIELDS:
+            if f not in names or f not in loaded:
+                continue
+            new_val = getattr(self, f)
+            if loaded[f] != new_val:
+                old_content[f] = loaded[f]
+                new_content[f] = new_val
+        return old_content, new_content
+
     def save(self, *args, **kwargs):
         creating = self._state.adding
 
-        # mặc định trạng thái nếu chưa có
-        if not self.approval_status:
-            from .approval_status import ApprovalStatus
-            self.approval_status = (
-                ApprovalStatus.objects.filter(name="Pending").first()
-            )
+        # mặc định trạng thái nếu chưa có (tra registry trong process, không query)
+        from listings.services import masters
 
-        if not self.post_status:
-            from .post_status import PostStatus
-            self.post_status = (
-                PostStatus.objects.filter(name="Hidden").first()
-            )
+        if self.approval_status_id is None:
+            self.approval_status_id = masters.approval_status_id(masters.APPROVAL_PENDING)
+
+        if self.post_status_id is None:
+            self.post_status_id = masters.post_status_id(masters.POST_HIDDEN)
 
-        # gán id nếu chưa có
+        # gán id nếu chưa có (cấp từ khối sequence giữ trước, không query bảng)
         if not self.id:
-            self.id = generate_unique_id(Post)
+            from accounts.services.id_allocator import insert_with_new_id
 
-        if creating:
-            super().save(*args, **kwargs)
+            # id vừa cấp -> INSERT thẳng, bỏ UPDATE thử trước
+            kwargs.setdefault("force_insert", True)
+            insert_with_new_id(self, partial(super().save, *args, **kwargs))
+            self._snapshot_tracked()
             return
 
-        # cập nhật: so sánh trước-sau để ghi PostHistory
-        from .post_history import PostHistory
-
-        try:
-            old = Post.objects.get(pk=self.pk)
-        except Post.DoesNotExist:
+        if creating:
             super().save(*args, **kwargs)
+            self._snapshot_tracked()
             return
 
-        tracked_fields = [
-            "title",
-            "description",
-            "address",
-            "location",
-            "details",
-            "other_info",
-            "area",
-            "price",
-            "approval_status_id",
-            "post_status_id",
-            "bumped_at",  # track luôn bump
-        ]
-
-        old_content, new_content, changed = {}, {}, False
-
-        for f in tracked_fields:
-            old_val = getattr(old, f)
-            new_val = getattr(self, f)
-            if old_val != new_val:
-                changed = True
-                old_content[f] = old_val
-                new_content[f] = new_val
+        # cập nhật: so với snapshot lúc load (không đọc lại bài từ DB).
+        # Instance tự dựng (không load từ DB) không có snapshot -> không ghi lịch sử.
+        names = self._tracked_names(kwargs.get("update_fields"))
+        old_content, new_content = self._tracked_diff(names)
 
         super().save(*args, **kwargs)
+        self._snapshot_tracked(names)
+
+        if old_content:
+            from listings.services.post_history import record_change
 
-        if changed:
-            PostHistory.objects.create(
-                post=self,
+            bump_only = set(new_content) <= self.BUFFERED_HISTORY_FIELDS
+            record_change(
+                post_id=self.pk,
                 actor_id=self.owner_id,
-                old_content=str(old_content),
-                new_content=str(new_content),
-                change_type="update",
+                old_content=old_content,
+                new_content=new_content,
+                change_type="bump" if bump_only else "update",
+                buffered=bump_only,
             )
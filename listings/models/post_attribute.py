@@ -0,0 +1,43 @@
+# listings/models/post_attribute.py
+
+from django.db import models
+
+
+class PostAttribute(models.Model):
+    """
+    Thuộc tính có kiểu (tách từ Post.details + price / area) để lọc / sắp xếp
+    bằng index thay vì đọc JSON. 1 dòng / 1 bài chưa xoá.
+    Được cập nhật theo signal post_changed (create / update),
+    backfill bằng `manage.py backfill_post_attributes`.
+    """
+
+    post = models.OneToOneField(
+        "listings.Post",
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="post_id",
+        related_name="attributes",
+        db_constraint=False,
+    )
+    bedrooms = models.PositiveSmallIntegerField(null=True, blank=True)
+    bathrooms = models.PositiveSmallIntegerField(null=True, blank=True)
+    # mã hướng: N, S, E, W, NE, NW, SE, SW ("" = không rõ)
+    direction = models.CharField(max_length=2, blank=True, default="")
+    # pháp lý đã bỏ dấu + lowercase, ví dụ "so hong"
+    legal_status = models.CharField(max_length=64, blank=True, default="")
+    price_per_m2 = models.DecimalField(
+        max_digits=15, decimal_places=2, null=True, blank=True
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["bedrooms"]),
+            models.Index(fields=["bathrooms"]),
+            models.Index(fields=["direction"]),
+            models.Index(fields=["legal_status"]),
+            models.Index(fields=["price_per_m2"]),
+        ]
+
+    def __str__(self):
+        return f"Attributes of post {self.post_id}"
@@ -0,0 +1,28 @@
+# listings/models/post_bump_daily.py
+
+from django.db import models
+
+
+class PostBumpDaily(models.Model):
+    """
+    Số lượt bump theo ngày (theo TIME_ZONE), cộng dồn từ mỗi lô PostBumpLog
+    được flush (services/bump_log.py).
+
+    - dimension: "post" | "actor" | "plan"
+    - value:     post_id / actor_id / MembershipPlan.code
+    """
+
+    day = models.DateField()
+    dimension = models.CharField(max_length=16)
+    value = models.CharField(max_length=50)
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("day", "dimension", "value")
+        indexes = [
+            models.Index(fields=["dimension", "day", "count"], name="post_bump_daily_top_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.dimension}={self.value}: {self.count}"
@@ -1,12 +1,14 @@
 # listings/models/post_bump_log.py
 
 from django.db import models
+from django.utils import timezone
 
 
 class PostBumpLog(models.Model):
     """
-    Log mỗi lần user đẩy tin (bump).
-    Dùng để giới hạn số lần bump/ngày theo role (MEMBER / AGENT).
+    Log mỗi lần user đẩy tin (bump), chỉ append.
+    Ghi theo lô qua services/bump_log.py (không chặn request bump);
+    dùng cho thống kê (PostBumpDaily) và khôi phục bộ đếm hạn mức bump.
     """
 
     # Không bắt buộc phải có FK cứng, nhưng ORM dùng FK cho tiện.
@@ -21,8 +23,10 @@ class PostBumpLog(models.Model):
 
     actor_id = models.CharField(max_length=9)   # id user đã bump (trùng user_id)
     is_agent = models.BooleanField(default=False)
+    plan_code = models.CharField(max_length=50, blank=True, default="")  # MembershipPlan.code lúc bump
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # default (không auto_now_add): giữ thời điểm bump, không phải lúc flush lô
+    created_at = models.DateTimeField(default=timezone.now)
     note = models.CharField(max_length=255, blank=True, null=True)
 
     class Meta:
@@ -0,0 +1,39 @@
+# listings/models/post_bump_schedule.py
+
+from django.db import models
+
+
+class PostBumpSchedule(models.Model):
+    """
+    Lịch tự đẩy tin của 1 bài (VIP): mỗi ngày bump vào các giờ trong `times`
+    ("HH:MM" theo TIME_ZONE). Lệnh run_bump_scheduler mỗi phút lấy các lịch
+    đến hạn (next_run_at <= now, qua index) và bump cả lô 1 lần.
+    """
+
+    post = models.OneToOneField(
+        "listings.Post",
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="post_id",
+        related_name="bump_schedule",
+        db_constraint=False,
+    )
+    owner_id = models.CharField(max_length=9, db_index=True)
+    times = models.JSONField(default=list)  # ["08:00", "20:30"]
+    is_active = models.BooleanField(default=True)
+
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    # lần chạy gần nhất không bump được: MAX_DAILY_BUMP_REACHED, NO_ACTIVE_MEMBERSHIP...
+    last_error = models.CharField(max_length=64, blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_active", "next_run_at"], name="post_bump_schedule_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"Bump schedule {self.post_id} {self.times}"
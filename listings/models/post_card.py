@@ -0,0 +1,61 @@
+# listings/models/post_card.py
+
+from django.db import models
+
+
+class PostCard(models.Model):
+    """
+    Read model cho card kết quả tìm kiếm: 1 dòng / 1 bài public, đã join sẵn
+    tên category / loại tin, địa chỉ, ảnh bìa, số ảnh.
+    Không ghi trực tiếp – được đồng bộ từ signal post_changed
+    (services/post_cards.py) hoặc `manage.py rebuild_post_cards`.
+    """
+
+    id = models.CharField(primary_key=True, max_length=9)  # = Post.id
+
+    title = models.CharField(max_length=255)
+    price = models.DecimalField(max_digits=15, decimal_places=2)
+    area = models.FloatField()
+    price_per_m2 = models.DecimalField(
+        max_digits=15, decimal_places=2, null=True, blank=True
+    )
+
+    category_id = models.IntegerField()
+    category_name = models.CharField(max_length=100, blank=True, default="")
+    post_type_id = models.IntegerField()
+    post_type_name = models.CharField(max_length=100, blank=True, default="")
+
+    province = models.CharField(max_length=191, blank=True, default="")
+    district = models.CharField(max_length=191, blank=True, default="")
+    ward = models.CharField(max_length=191, blank=True, default="")
+    province_code = models.PositiveIntegerField(null=True, blank=True)
+    district_code = models.PositiveIntegerField(null=True, blank=True)
+    ward_code = models.PositiveIntegerField(null=True, blank=True)
+
+    cover_image_url = models.CharField(max_length=500, blank=True, default="")
+    cover_variants = models.JSONField(default=dict, blank=True)  # {"thumb": {"url", "width", "height"}, ...}
+    cover_blurhash = models.CharField(max_length=64, blank=True, default="")
+    image_count = models.PositiveIntegerField(default=0)
+
+    owner_id = models.CharField(max_length=9)
+    created_at = models.DateTimeField()
+    bumped_at = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-bumped_at"]),
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["price"]),
+            models.Index(fields=["area"]),
+            models.Index(fields=["category_id"]),
+            models.Index(fields=["post_type_id"]),
+            models.Index(fields=["province", "district", "ward"]),
+            models.Index(fields=["province_code"]),
+            models.Index(fields=["district_code"]),
+            models.Index(fields=["ward_code"]),
+            models.Index(fields=["owner_id", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Card {self.id}: {self.title}"
@@ -0,0 +1,47 @@
+# listings/models/post_counter.py
+
+from django.db import models
+
+
+class PostCounter(models.Model):
+    """
+    Bộ đếm bài đăng được duy trì sẵn (không COUNT(*) mỗi request).
+
+    - scope: tập filter "rộng" mà bộ đếm áp dụng, ví dụ "*" (tất cả bài public)
+             hoặc "province=hồ chí minh".
+    - facet/value: chiều đếm, ví dụ ("total", "").
+    """
+
+    scope = models.CharField(max_length=255)
+    facet = models.CharField(max_length=32)
+    value = models.CharField(max_length=191, blank=True, default="")
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("scope", "facet", "value")
+
+    def __str__(self):
+        return f"{self.scope} / {self.facet}={self.value}: {self.count}"
+
+
+class PostCounterLedger(models.Model):
+    """
+    Ghi nhớ mỗi bài đang được cộng vào những key (scope, facet, value) nào.
+    Khi bài thay đổi, chỉ cần so sánh key cũ - key mới để cộng/trừ bộ đếm,
+    không phải đọc lại trạng thái trước khi gọi SP.
+    """
+
+    post = models.OneToOneField(
+        "listings.Post",
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="post_id",
+        related_name="counter_ledger",
+        db_constraint=False,
+    )
+    keys = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Counter ledger of post {self.post_id}"
@@ -0,0 +1,36 @@
+# listings/models/post_geo.py
+
+from django.db import models
+
+
+class PostGeo(models.Model):
+    """
+    Index không gian cho Post.location ({lat, lng} dạng JSON).
+
+    - lat/lng: toạ độ đã tách ra cột số để lọc theo khung (bbox).
+    - cell: mã ô lưới (GEO_CELL_DEG độ mỗi cạnh) -> tìm "quanh đây"
+            chỉ quét vài dải ô thay vì cả bảng.
+    Được cập nhật theo signal post_changed, xem services/post_geo.py.
+    """
+
+    post = models.OneToOneField(
+        "listings.Post",
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="post_id",
+        related_name="geo",
+        db_constraint=False,
+    )
+    lat = models.FloatField()
+    lng = models.FloatField()
+    cell = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["cell"]),
+            models.Index(fields=["lat", "lng"]),
+        ]
+
+    def __str__(self):
+        return f"Geo of post {self.post_id}: ({self.lat}, {self.lng})"
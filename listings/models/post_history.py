@@ -1,4 +1,6 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 from django.conf import settings
 
 class PostHistory(models.Model):
@@ -6,20 +8,53 @@ class PostHistory(models.Model):
         ("update", "Update"),
         ("status_change", "Status Change"),
         ("delete", "Delete"),
+        ("bump", "Bump"),
     ]
 
     post = models.ForeignKey("listings.Post", on_delete=models.CASCADE, related_name="history")
     #user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="post_changes")
     actor_id = models.CharField(max_length=9)
-    # giữ kiểu Text như code cũ (huynh đã serialize dict thành str)
-    old_content = models.TextField()
-    new_content = models.TextField(null=True, blank=True)
+    # diff dạng JSON: {field: giá trị} trước / sau (Decimal, datetime -> chuỗi)
+    old_content = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    new_content = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
     change_type = models.CharField(max_length=50, choices=CHANGE_TYPE_CHOICES)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # default (không auto_now_add) để bản ghi ghi trễ theo lô giữ đúng thời điểm đổi
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         #db_table = "polls_posthistory"  # đổi nếu bảng cũ tên khác
         ordering = ["-timestamp"]
+        indexes = [
+            # lịch sử 1 bài (mới nhất trước) + gom bump liên tiếp theo bài
+            models.Index(fields=["post", "timestamp"], name="post_history_post_ts_idx"),
+            # admin sắp -timestamp, lưu trữ theo mốc thời gian
+            models.Index(fields=["timestamp"], name="post_history_ts_idx"),
+            models.Index(fields=["change_type", "timestamp"], name="post_history_type_ts_idx"),
+        ]
 
     def __str__(self):
         return f"{self.actor_id} {self.change_type} bài {self.post} lúc {self.timestamp}"
+
+
+class PostHistoryArchive(models.Model):
+    """
+    Mỗi lần lưu trữ lịch sử cũ (lệnh archive_post_history): các dòng PostHistory
+    có timestamp < `before` được ghi ra 1 file JSONL nén gzip rồi xoá khỏi bảng.
+    Bảng PostHistory chỉ giữ phần "nóng" (vài tháng gần nhất), phần "lạnh" nằm
+    trong các file liệt kê ở đây.
+    """
+
+    path = models.CharField(max_length=500)
+    before = models.DateTimeField()          # mốc cắt (các dòng cũ hơn mốc này)
+    first_timestamp = models.DateTimeField(null=True, blank=True)
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+    rows = models.PositiveIntegerField(default=0)
+    size_bytes = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.path} ({self.rows} dòng trước {self.before})"
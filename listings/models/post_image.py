@@ -2,17 +2,43 @@
 from django.db import models
 
 class PostImage(models.Model):
+    STATUS_PENDING = "pending"   # đã nhận file, đang chờ upload lên storage
+    STATUS_READY = "ready"
+    STATUS_FAILED = "failed"     # hết số lần thử
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_READY, "Ready"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
     post = models.ForeignKey(
         "listings.Post",          # dùng tên app + tên model, không phụ thuộc file
         on_delete=models.CASCADE,
         related_name="images",
     )
-    image = models.ImageField(upload_to="posts/")  # tự upload lên Cloudinary
+    # upload lên storage (Cloudinary) bởi image_pipeline; rỗng khi còn pending
+    image = models.ImageField(upload_to="posts/", blank=True)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=STATUS_READY
+    )
+    # file tạm trên đĩa local trong lúc chờ upload
+    spool_path = models.CharField(max_length=500, blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.CharField(max_length=255, blank=True, default="")
+    # sinh lúc ingest (image_derivatives): kích thước gốc, blurhash placeholder,
+    # các bản WebP {"thumb": {"name", "width", "height"}, ...}; rỗng = chưa sinh
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    blurhash = models.CharField(max_length=64, blank=True, default="")
+    variants = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
 
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
 
     def __str__(self):
         return f"Image #{self.id} for post {self.post_id}"
@@ -0,0 +1,22 @@
+# listings/models/quota_counter.py
+
+from django.db import models
+
+
+class QuotaCounter(models.Model):
+    """
+    Bộ đếm hạn mức (lượt bump / bài đăng trong ngày, số ảnh của 1 bài).
+    Tăng bằng 1 câu UPDATE có điều kiện (services/quotas.py):
+    chỉ tăng khi không vượt hạn mức -> 2 request song song không cùng lọt.
+
+    - quota_key: "<loại>:<user_id | post_id>", ví dụ "bump:ABC123XYZ"
+    - period:    ngày (theo TIME_ZONE) của bộ đếm; sang ngày khác -> đếm lại từ 0.
+                 Hạn mức không theo ngày (ảnh / bài) dùng ngày cố định 1970-01-01.
+    """
+
+    quota_key = models.CharField(primary_key=True, max_length=64)
+    period = models.DateField()
+    used = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.quota_key} @ {self.period}: {self.used}"
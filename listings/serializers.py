@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from listings.models import PostImage 
 from listings.models import Post
+from listings.services.post_images import absolute_base, variant_urls
 
 class PostCreateUpdateSerializer(serializers.Serializer):
     # required khi create; optional khi update (partial=True)
@@ -36,11 +37,16 @@ class PostCreateUpdateSerializer(serializers.Serializer):
     
 class PostImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         model = PostImage
-        # Trả về id, url và created_at là đủ xài
-        fields = ["id", "image_url", "created_at"]
+        # Trả về id, url, created_at + status (pending: đang upload, chưa có url)
+        # variants: bản WebP thu nhỏ cho srcset; blurhash: placeholder lúc tải
+        fields = [
+            "id", "image_url", "variants", "width", "height", "blurhash",
+            "status", "created_at",
+        ]
 
     def get_image_url(self, obj):
         if not obj.image:
@@ -54,6 +60,9 @@ class PostImageSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(url)
 
         return url
+
+    def get_variants(self, obj):
+        return variant_urls(obj.variants, absolute_base(self.context.get("request")))
     
 class PostSerializer(serializers.ModelSerializer):
     images = PostImageSerializer(many=True, read_only=True)   # <–– thêm dòng này
@@ -0,0 +1,289 @@
+# listings/services/admin_units.py
+
+import gzip
+import json
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.dispatch import receiver
+
+from listings.models import AdminUnit, Post
+from listings.services.text_index import fold_vietnamese
+from listings.signals import post_changed
+
+DATASET = Path(__file__).resolve().parent.parent / "data" / "vn_admin_units.json.gz"
+
+LEVELS = (AdminUnit.LEVEL_PROVINCE, AdminUnit.LEVEL_DISTRICT, AdminUnit.LEVEL_WARD)
+
+# Tiền tố loại đơn vị (đã bỏ dấu), thử dài trước
+_PREFIXES = (
+    "thanh pho", "thi tran", "thi xa", "phuong", "huyen", "quan", "tinh", "tp", "xa",
+)
+# "q1", "q 1", "p.7", "f7" (cách viết tắt hay gặp) -> "1", "7"
+_SHORT_NUMBER_RE = re.compile(r"^(?:q|p|f)\s*(\d+)$")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+# Tên gọi khác của tỉnh / thành (đã chuẩn hoá bằng unit_key) -> mã tỉnh
+PROVINCE_ALIASES = {
+    "hcm": 79, "tphcm": 79, "hcmc": 79, "sai gon": 79, "saigon": 79, "sg": 79,
+    "hn": 1, "hanoi": 1,
+    "hp": 31,
+    "danang": 48,
+    "thua thien hue": 46,
+    "brvt": 77, "vung tau": 77, "ba ria": 77,
+    "ct": 92,
+}
+
+_lock = threading.Lock()
+_registry: Optional["Registry"] = None
+
+
+# ========== CHUẨN HOÁ TÊN ==========
+def unit_key(name: Any) -> str:
+    """
+    "Thành phố Hồ Chí Minh" / "TP. HCM" -> "ho chi minh" / "hcm";
+    "Quận 01" / "Q.1" -> "1".
+    """
+    text = _NON_WORD_RE.sub(" ", fold_vietnamese(str(name or ""))).strip()
+    m = _SHORT_NUMBER_RE.match(text)
+    if m:
+        text = m.group(1)
+    else:
+        for prefix in _PREFIXES:
+            if text.startswith(prefix + " ") and len(text) > len(prefix) + 1:
+                text = text[len(prefix) + 1:]
+                break
+    return str(int(text)) if text.isdigit() else text
+
+
+def _as_code(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    text = str(value or "").strip()
+    return int(text) if text.isdigit() else None
+
+
+# ========== REGISTRY TRONG BỘ NHỚ ==========
+class Registry:
+    """
+    Bảng tra tên -> mã theo từng cấp, dựng 1 lần / process từ AdminUnit.
+    Quận / phường tra trong phạm vi cấp cha; không rõ cấp cha thì chỉ nhận
+    khi tên là duy nhất trên cả nước.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, int, Optional[int], str]]):
+        self.parent: Dict[Tuple[int, int], Optional[int]] = {}
+        self.names: Dict[Tuple[int, int], str] = {}
+        self.provinces: Dict[str, int] = {}
+        self.scoped: Dict[Tuple[int, int, str], int] = {}
+        self.global_keys: Dict[Tuple[int, str], Set[int]] = defaultdict(set)
+
+        for level, code, parent_code, name in rows:
+            key = unit_key(name)
+            self.parent[(level, code)] = parent_code
+            self.names[(level, code)] = name
+            if level == AdminUnit.LEVEL_PROVINCE:
+                self.provinces[key] = code
+                self.provinces[key.replace(" ", "")] = code
+            else:
+                self.scoped[(level, parent_code, key)] = code
+                self.global_keys[(level, key)].add(code)
+        for alias, code in PROVINCE_ALIASES.items():
+            self.provinces.setdefault(alias, code)
+
+    def exists(self, level: int, code: Optional[int]) -> bool:
+        return code is not None and (level, code) in self.parent
+
+    def name(self, level: int, code: Optional[int]) -> Optional[str]:
+        return self.names.get((level, code))
+
+    def lookup(self, level: int, value: Any, parent_code: Optional[int] = None) -> Optional[int]:
+        if value in (None, ""):
+            return None
+        key = unit_key(value)
+        if not key:
+            return None
+
+        if level == AdminUnit.LEVEL_PROVINCE:
+            code = self.provinces.get(key)
+        elif parent_code is not None:
+            code = self.scoped.get((level, parent_code, key))
+        else:
+            candidates = self.global_keys.get((level, key), ())
+            code = next(iter(candidates)) if len(candidates) == 1 else None
+        if code is not None:
+            return code
+
+        # không khớp tên -> chấp nhận nếu là mã hợp lệ (và đúng cấp cha)
+        code = _as_code(value)
+        if not self.exists(level, code):
+            return None
+        if parent_code is not None and self.parent[(level, code)] != parent_code:
+            return None
+        return code
+
+    def resolve(
+        self,
+        province: Any = None,
+        district: Any = None,
+        ward: Any = None,
+    ) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """
+        (tỉnh, quận, phường) dạng tên hoặc mã -> (mã, mã, mã).
+        Cấp dưới tra được thì suy ngược cấp trên nếu cấp trên bị thiếu.
+        """
+        p = self.lookup(AdminUnit.LEVEL_PROVINCE, province)
+        d = self.lookup(AdminUnit.LEVEL_DISTRICT, district, p)
+        w = self.lookup(AdminUnit.LEVEL_WARD, ward, d)
+
+        if w is not None and d is None:
+            d = self.parent[(AdminUnit.LEVEL_WARD, w)]
+        if d is not None and p is None:
+            p = self.parent[(AdminUnit.LEVEL_DISTRICT, d)]
+        return p, d, w
+
+
+def dataset_rows(path: Optional[Path] = None) -> List[Tuple[int, int, Optional[int], str]]:
+    with gzip.open(path or DATASET, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    return [tuple(row) for row in data["rows"]]
+
+
+def get_registry() -> Registry:
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                rows = list(
+                    AdminUnit.objects.values_list("level", "code", "parent_code", "name")
+                )
+                # DB chưa nạp (vd. test với syncdb) -> đọc thẳng file đi kèm
+                _registry = Registry(rows or dataset_rows())
+    return _registry
+
+
+def reset_registry() -> None:
+    global _registry
+    with _lock:
+        _registry = None
+
+
+def resolve(province: Any = None, district: Any = None, ward: Any = None):
+    return get_registry().resolve(province, district, ward)
+
+
+def address_codes(address: Any) -> Dict[str, Optional[int]]:
+    """
+    Post.address -> {"province_code", "district_code", "ward_code"}.
+    FE gửi kèm *_code thì ưu tiên mã, không thì tra theo tên.
+    """
+    if not isinstance(address, dict):
+        address = {}
+    p, d, w = resolve(
+        address.get("province_code") or address.get("province"),
+        address.get("district_code") or address.get("district"),
+        address.get("ward_code") or address.get("ward"),
+    )
+    return {"province_code": p, "district_code": d, "ward_code": w}
+
+
+def apply_filter_codes(
+    filters: Dict[str, Any],
+    province_code: Any = None,
+    district_code: Any = None,
+    ward_code: Any = None,
+) -> Dict[str, Any]:
+    """
+    Filter địa chỉ (tên hoặc mã) -> *_code. Cấp nào tra được mã thì bỏ filter
+    chuỗi tương ứng (so khớp JSON); không tra được thì giữ filter chuỗi như cũ.
+    """
+    registry = get_registry()
+    filters = dict(filters)
+    p = registry.lookup(AdminUnit.LEVEL_PROVINCE, province_code or filters.get("province"))
+    d = registry.lookup(AdminUnit.LEVEL_DISTRICT, district_code or filters.get("district"), p)
+    w = registry.lookup(AdminUnit.LEVEL_WARD, ward_code or filters.get("ward"), d)
+
+    for name, code in (("province", p), ("district", d), ("ward", w)):
+        if code is not None:
+            filters[name] = None
+            filters[f"{name}_code"] = code
+        elif filters.get(f"{name}_code") is None:
+            filters[f"{name}_code"] = None
+    return filters
+
+
+# ========== NẠP DỮ LIỆU / BACKFILL ==========
+@transaction.atomic
+def load_dataset(path: Optional[Path] = None) -> int:
+    """
+    Upsert danh mục từ file (mặc định bản đi kèm repo). Trả số đơn vị.
+    """
+    rows = dataset_rows(path)
+    existing = {
+        (u.level, u.code): u for u in AdminUnit.objects.all()
+    }
+    creates, updates = [], []
+    for level, code, parent_code, name in rows:
+        unit = existing.get((level, code))
+        if unit is None:
+            creates.append(
+                AdminUnit(level=level, code=code, parent_code=parent_code, name=name)
+            )
+        elif unit.parent_code != parent_code or unit.name != name:
+            unit.parent_code, unit.name = parent_code, name
+            updates.append(unit)
+    AdminUnit.objects.bulk_create(creates, batch_size=1000)
+    AdminUnit.objects.bulk_update(updates, ["parent_code", "name"], batch_size=1000)
+    reset_registry()
+    return len(rows)
+
+
+def _write_codes(rows: Iterable[Tuple[str, Any]]) -> int:
+    # gom theo bộ mã -> 1 UPDATE / bộ mã thay vì 1 UPDATE / bài
+    groups: Dict[Tuple, List[str]] = defaultdict(list)
+    for post_id, address in rows:
+        codes = address_codes(address)
+        groups[tuple(sorted(codes.items()))].append(post_id)
+    for codes, ids in groups.items():
+        # .update() không đụng updated_at (auto_now chỉ chạy trong save())
+        Post.objects.filter(id__in=ids).update(**dict(codes))
+    return sum(len(ids) for ids in groups.values())
+
+
+def refresh_posts(post_ids: Iterable[str]) -> None:
+    ids = list(dict.fromkeys(str(pid) for pid in post_ids))
+    if ids:
+        _write_codes(Post.objects.filter(id__in=ids).values_list("id", "address"))
+
+
+def backfill(batch_size: int = 1000) -> int:
+    """
+    Tính lại mã địa chỉ cho mọi bài theo lô id (mỗi lô 1 transaction).
+    """
+    written = 0
+    last_id = ""
+    while True:
+        rows = list(
+            Post.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "address")[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        with transaction.atomic():
+            written += _write_codes(rows)
+    return written
+
+
+@receiver(post_changed)
+def _on_post_changed(sender, post_ids, action, **kwargs):
+    # address chỉ đổi khi tạo / sửa
+    if action in ("create", "update"):
+        refresh_posts(post_ids)
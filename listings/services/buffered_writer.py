@@ -0,0 +1,142 @@
+# listings/services/buffered_writer.py
+
+import atexit
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedBulkWriter:
+    """
+    Gom các object (chưa lưu) của 1 model rồi ghi bằng bulk_create theo lô,
+    cho các bảng log ghi nhiều nhưng không cần có ngay (lịch sử bump, log...).
+
+    - add() chỉ append vào buffer, không chạm DB của request.
+    - Thread nền (daemon, tạo khi add lần đầu) flush mỗi `flush_interval` giây
+      hoặc ngay khi buffer đủ `max_batch`; process thoát -> flush nốt (atexit).
+    - Ghi lỗi -> giữ lại để lần sau ghi tiếp (tối đa `max_pending`, quá thì bỏ
+      bản cũ nhất và đếm vào `dropped`).
+    - on_flush(batch): chạy cùng transaction với bulk_create (vd. cộng bảng
+      tổng hợp) -> lỗi thì cả lô rollback và được ghi lại, không cộng 2 lần.
+    Process bị kill đột ngột sẽ mất phần chưa flush: chỉ dùng cho dữ liệu
+    chấp nhận mất vài giây cuối.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch: int = 500,
+        flush_interval: float = 5.0,
+        max_pending: Optional[int] = None,
+        on_flush: Optional[Callable[[List[Any]], None]] = None,
+    ):
+        self.model = model
+        self.on_flush = on_flush
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval = max(0.1, float(flush_interval))
+        self.max_pending = max_pending or self.max_batch * 20
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer: List[Any] = []
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._written = 0
+        self._failed_flushes = 0
+        self._dropped = 0
+        atexit.register(self.flush)
+
+    # ----- ghi -----
+    def add(self, obj) -> None:
+        self.extend([obj])
+
+    def extend(self, objs) -> None:
+        with self._lock:
+            self._buffer.extend(objs)
+            overflow = len(self._buffer) - self.max_pending
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self._dropped += overflow
+            full = len(self._buffer) >= self.max_batch
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Ghi toàn bộ buffer hiện có (gọi được từ bất kỳ thread nào). Trả số dòng đã ghi.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                if self.on_flush is None:
+                    self.model.objects.bulk_create(batch, batch_size=self.max_batch)
+                else:
+                    with transaction.atomic():
+                        self.model.objects.bulk_create(batch, batch_size=self.max_batch)
+                        self.on_flush(batch)
+            except Exception:
+                logger.exception(
+                    "BufferedBulkWriter(%s): ghi %d dòng lỗi, giữ lại để ghi lại",
+                    self.model.__name__,
+                    len(batch),
+                )
+                with self._lock:
+                    self._buffer[:0] = batch
+                    self._failed_flushes += 1
+                return 0
+            with self._lock:
+                self._written += len(batch)
+            return len(batch)
+
+    def snapshot(self) -> List[Any]:
+        """
+        Bản sao các object đang chờ ghi (chỉ đọc).
+        """
+        with self._lock:
+            return list(self._buffer)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model": self.model.__name__,
+                "pending": len(self._buffer),
+                "written": self._written,
+                "failed_flushes": self._failed_flushes,
+                "dropped": self._dropped,
+            }
+
+    # ----- thread nền -----
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"bulk-writer-{self.model.__name__}",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # connection DB là theo thread -> đóng của thread này sau mỗi lượt
+                connections.close_all()
@@ -0,0 +1,185 @@
+# listings/services/bump_log.py
+
+from collections import Counter
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from listings.models import PostBumpDaily, PostBumpLog
+from listings.services.buffered_writer import BufferedBulkWriter
+
+DIM_POST = "post"
+DIM_ACTOR = "actor"
+DIM_PLAN = "plan"
+DIMENSIONS = (DIM_POST, DIM_ACTOR, DIM_PLAN)
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_BUMP_LOG", {}) or {}
+
+
+# ========== TỔNG HỢP THEO NGÀY ==========
+def _rollup_keys(entry: PostBumpLog) -> List[Tuple[date, str, str]]:
+    day = timezone.localdate(entry.created_at)
+    return [
+        (day, DIM_POST, str(entry.post_id)),
+        (day, DIM_ACTOR, entry.actor_id),
+        (day, DIM_PLAN, entry.plan_code or ""),
+    ]
+
+
+def apply_rollups(entries: Iterable[PostBumpLog]) -> int:
+    """
+    Cộng 1 lô log vào PostBumpDaily: 1 SELECT ... FOR UPDATE các dòng đã có,
+    1 bulk_update (count = count + n), 1 bulk_create dòng mới.
+    Gọi trong transaction (writer chạy cùng transaction với bulk_create log).
+    Trả số dòng tổng hợp bị chạm.
+    """
+    deltas = Counter(key for entry in entries for key in _rollup_keys(entry))
+    if not deltas:
+        return 0
+    days = {day for day, _, _ in deltas}
+    existing = {
+        (row.day, row.dimension, row.value): row
+        for row in PostBumpDaily.objects.select_for_update().filter(
+            day__in=days, value__in={value for _, _, value in deltas}
+        )
+        if (row.day, row.dimension, row.value) in deltas
+    }
+    now = timezone.now()
+    for key, row in existing.items():
+        row.count = F("count") + deltas[key]
+        row.updated_at = now  # bulk_update không tự gán auto_now
+    if existing:
+        PostBumpDaily.objects.bulk_update(list(existing.values()), ["count", "updated_at"])
+    missing = [key for key in deltas if key not in existing]
+    if missing:
+        # 2 process cùng tạo 1 dòng -> IntegrityError, writer rollback cả lô rồi ghi lại
+        PostBumpDaily.objects.bulk_create(
+            [
+                PostBumpDaily(day=day, dimension=dim, value=value, count=deltas[(day, dim, value)])
+                for day, dim, value in missing
+            ]
+        )
+    return len(deltas)
+
+
+bump_log_writer = BufferedBulkWriter(
+    PostBumpLog,
+    max_batch=int(_config().get("MAX_BATCH", 500)),
+    flush_interval=float(_config().get("FLUSH_INTERVAL", 1)),
+    on_flush=apply_rollups,
+)
+
+
+# ========== GHI LOG ==========
+def record_bump(post_id: str, actor_id: str, is_agent_flag, plan_code: str = "") -> None:
+    """
+    Ghi 1 lượt bump: chỉ đưa vào buffer sau khi transaction commit,
+    thread nền bulk_create theo lô + cộng PostBumpDaily.
+    """
+    entry = PostBumpLog(
+        post_id=post_id,
+        actor_id=actor_id,
+        is_agent=bool(is_agent_flag),
+        plan_code=(plan_code or "").upper(),
+        created_at=timezone.now(),
+    )
+    if _config().get("ENABLED", True):
+        transaction.on_commit(lambda: bump_log_writer.add(entry))
+    else:
+        transaction.on_commit(lambda: _write_now(entry))
+
+
+def _write_now(entry: PostBumpLog) -> None:
+    write_batch([entry])
+
+
+def write_batch(entries: List[PostBumpLog]) -> None:
+    """
+    Ghi ngay 1 lô log (không qua buffer): 1 bulk insert + cộng PostBumpDaily,
+    cùng 1 transaction. Dùng khi người gọi đã gom sẵn lô (auto-bump theo lịch).
+    """
+    if not entries:
+        return
+    with transaction.atomic():
+        PostBumpLog.objects.bulk_create(entries, batch_size=bump_log_writer.max_batch)
+        apply_rollups(entries)
+
+
+def count_today(actor_id: str) -> int:
+    """
+    Số lượt bump hôm nay của user theo log (đã ghi + đang chờ trong buffer
+    của process này) -> khôi phục bộ đếm hạn mức khi bộ đếm bị mất / reset.
+    """
+    start = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+    logged = PostBumpLog.objects.filter(actor_id=actor_id, created_at__gte=start).count()
+    pending = sum(
+        1 for entry in bump_log_writer.snapshot()
+        if entry.actor_id == actor_id and entry.created_at >= start
+    )
+    return logged + pending
+
+
+# ========== ĐỌC ==========
+def daily_rollups(
+    dimension: str,
+    date_from: date,
+    date_to: date,
+    value: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    Số bump theo ngày cho 1 chiều (post / actor / plan) trong [date_from, date_to]:
+      - value có -> chuỗi theo ngày của đúng value đó;
+      - không có -> top `limit` value theo tổng số bump trong khoảng.
+    """
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"dimension không hợp lệ: {dimension}")
+    qs = PostBumpDaily.objects.filter(dimension=dimension, day__gte=date_from, day__lte=date_to)
+    if value is not None:
+        rows = [
+            {"day": row["day"].isoformat(), "count": row["count"]}
+            for row in qs.filter(value=value).order_by("day").values("day", "count")
+        ]
+        return {"value": value, "total": sum(r["count"] for r in rows), "days": rows}
+    top = list(
+        qs.values("value").annotate(total=Sum("count")).order_by("-total", "value")[:limit]
+    )
+    return {
+        "total": qs.aggregate(total=Sum("count"))["total"] or 0,
+        "results": top,
+    }
+
+
+# ========== TÍNH LẠI TỪ LOG ==========
+def rebuild_rollups(date_from: date, date_to: date, batch_size: int = 5000) -> int:
+    """
+    Xoá + tính lại PostBumpDaily của [date_from, date_to] từ PostBumpLog
+    (sau khi sửa log bằng tay / writer mất lô). Trả số log đã đọc.
+    Flush buffer của process này trước để không bỏ sót.
+    """
+    bump_log_writer.flush()
+    start = timezone.make_aware(datetime.combine(date_from, dt_time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), dt_time.min))
+    total = 0
+    with transaction.atomic():
+        PostBumpDaily.objects.filter(day__gte=date_from, day__lte=date_to).delete()
+        logs = PostBumpLog.objects.filter(created_at__gte=start, created_at__lt=end).only(
+            "post_id", "actor_id", "plan_code", "created_at"
+        )
+        batch: List[PostBumpLog] = []
+        for entry in logs.iterator(chunk_size=batch_size):
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                apply_rollups(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            apply_rollups(batch)
+            total += len(batch)
+    return total
@@ -0,0 +1,241 @@
+# listings/services/bump_schedules.py
+
+import re
+from collections import Counter
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import UserMembership
+from listings.models import Post, PostBumpLog, PostBumpSchedule
+from listings.services import bump_log, post_history, quotas
+from listings.signals import notify_post_changed
+
+_TIME_RE = re.compile(r"^([01]\d|2[0-3]):([0-5]\d)$")
+
+ERROR_POST_UNAVAILABLE = "POST_UNAVAILABLE"
+ERROR_NO_MEMBERSHIP = "NO_ACTIVE_MEMBERSHIP"
+ERROR_NO_BUMP = "NO_BUMP_ALLOWED"
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_BUMP_SCHEDULE", {}) or {}
+
+
+def batch_size() -> int:
+    return int(_config().get("BATCH_SIZE", 1000))
+
+
+# ========== GIỜ CHẠY ==========
+def parse_times(raw: Any) -> List[str]:
+    """
+    ["08:00", "20:30"] -> list "HH:MM" đã bỏ trùng + sắp xếp. Sai định dạng -> ValueError.
+    """
+    if not isinstance(raw, list) or not raw:
+        raise ValueError("times phải là list giờ dạng HH:MM")
+    times = set()
+    for value in raw:
+        if not isinstance(value, str) or not _TIME_RE.match(value.strip()):
+            raise ValueError(f"Giờ không hợp lệ: {value} (dạng HH:MM)")
+        times.add(value.strip())
+    return sorted(times)
+
+
+def next_run(times: List[str], after: datetime) -> Optional[datetime]:
+    """
+    Mốc chạy gần nhất sau `after` (giờ theo TIME_ZONE). Lỡ nhiều mốc (scheduler
+    dừng) -> chỉ lấy mốc kế tiếp trong tương lai, không bump bù.
+    """
+    local = timezone.localtime(after)
+    for offset in (0, 1):
+        day = local.date() + timedelta(days=offset)
+        for value in sorted(times):
+            hour, minute = (int(x) for x in value.split(":"))
+            candidate = timezone.make_aware(datetime.combine(day, dt_time(hour, minute)))
+            if candidate > after:
+                return candidate
+    return None
+
+
+def to_dict(schedule: PostBumpSchedule) -> Dict[str, Any]:
+    return {
+        "post_id": schedule.post_id,
+        "times": schedule.times,
+        "is_active": schedule.is_active,
+        "next_run_at": schedule.next_run_at.isoformat() if schedule.next_run_at else None,
+        "last_run_at": schedule.last_run_at.isoformat() if schedule.last_run_at else None,
+        "last_error": schedule.last_error,
+    }
+
+
+# ========== ĐẶT / XOÁ LỊCH ==========
+def save_schedule(post: Post, user, raw_times: Any, is_active: bool = True) -> Dict[str, Any]:
+    """
+    Tạo / sửa lịch tự bump của bài. Cùng điều kiện với bump tay (chính chủ,
+    VIP còn hạn, gói cho phép bump); số mốc / ngày không vượt hạn mức bump của gói.
+    """
+    user_id = str(user.id)
+    if str(post.owner_id) != user_id:
+        return {"ok": 0, "error": "NOT_OWNER", "message": "Bạn không phải chủ của bài đăng này."}
+
+    plan_code = quotas.active_plan_code(user_id)
+    if plan_code is None:
+        return {
+            "ok": 0,
+            "error": ERROR_NO_MEMBERSHIP,
+            "message": "Tài khoản của bạn chưa có VIP hoặc đã hết hạn, không thể hẹn giờ đẩy tin.",
+        }
+    daily_limit = quotas.limits_for(1, plan_code)[quotas.KIND_BUMP]
+    if daily_limit <= 0:
+        return {"ok": 0, "error": ERROR_NO_BUMP, "message": "Gói VIP hiện tại không hỗ trợ đẩy tin."}
+
+    try:
+        times = parse_times(raw_times)
+    except ValueError as e:
+        return {"ok": 0, "error": "INVALID_TIMES", "message": str(e)}
+    max_times = min(daily_limit, int(_config().get("MAX_TIMES", 24)))
+    if len(times) > max_times:
+        return {
+            "ok": 0,
+            "error": "TOO_MANY_TIMES",
+            "message": f"Chỉ được hẹn tối đa {max_times} mốc giờ mỗi ngày.",
+        }
+
+    schedule, _ = PostBumpSchedule.objects.update_or_create(
+        post_id=post.id,
+        defaults={
+            "owner_id": user_id,
+            "times": times,
+            "is_active": bool(is_active),
+            "next_run_at": next_run(times, timezone.now()) if is_active else None,
+            "last_error": "",
+        },
+    )
+    return {"ok": 1, "schedule": to_dict(schedule)}
+
+
+def delete_schedule(post: Post, user) -> Dict[str, Any]:
+    if str(post.owner_id) != str(user.id):
+        return {"ok": 0, "error": "NOT_OWNER", "message": "Bạn không phải chủ của bài đăng này."}
+    deleted, _ = PostBumpSchedule.objects.filter(post_id=post.id).delete()
+    return {"ok": 1, "deleted": bool(deleted)}
+
+
+# ========== TICK ==========
+def tick(now: Optional[datetime] = None, limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Chạy 1 lượt scheduler: lấy tối đa `limit` lịch đến hạn (index is_active,
+    next_run_at; SKIP LOCKED để nhiều scheduler không lấy trùng), rồi cho cả lô:
+      - 1 query bài + 1 query gói VIP của các chủ bài;
+      - hạn mức bump gộp theo chủ bài (1 lần đọc + 1 lần tăng);
+      - 1 UPDATE bumped_at, 1 bulk insert PostBumpLog (+ PostBumpDaily),
+        lịch sử "bump" qua buffer (ghi theo lô sau commit), 1 post_changed("bump");
+      - 1 bulk_update lịch (mốc kế tiếp, lỗi nếu có).
+    Trả số lịch đến hạn / đã bump / bị bỏ qua.
+    """
+    now = now or timezone.now()
+    limit = limit or batch_size()
+    stats = {"due": 0, "bumped": 0, "skipped": 0}
+
+    with transaction.atomic():
+        due = list(
+            PostBumpSchedule.objects.select_for_update(skip_locked=True)
+            .filter(is_active=True, next_run_at__lte=now)
+            .order_by("next_run_at")[:limit]
+        )
+        if not due:
+            return stats
+        stats["due"] = len(due)
+
+        posts = {
+            post_id: (owner_id, bumped_at)
+            for post_id, owner_id, bumped_at in Post.objects.filter(
+                id__in=[s.post_id for s in due], is_deleted=False
+            ).values_list("id", "owner_id", "bumped_at")
+        }
+        plans = dict(
+            UserMembership.objects.filter(
+                user_id__in={s.owner_id for s in due}, expired_at__gt=now
+            ).values_list("user_id", "plan__code")
+        )
+
+        errors: Dict[str, str] = {}
+        candidates: List[PostBumpSchedule] = []
+        wanted: Counter = Counter()
+        limits: Dict[str, Dict[str, int]] = {}
+        for schedule in due:
+            if posts.get(schedule.post_id, (None, None))[0] != schedule.owner_id:
+                # bài đã xoá / đổi chủ -> tắt lịch
+                errors[schedule.post_id] = ERROR_POST_UNAVAILABLE
+                continue
+            if schedule.owner_id not in plans:
+                errors[schedule.post_id] = ERROR_NO_MEMBERSHIP
+                continue
+            owner_limits = limits.setdefault(
+                schedule.owner_id, quotas.limits_for(1, plans[schedule.owner_id] or "")
+            )
+            if owner_limits[quotas.KIND_BUMP] <= 0:
+                errors[schedule.post_id] = ERROR_NO_BUMP
+                continue
+            candidates.append(schedule)
+            wanted[schedule.owner_id] += 1
+
+        granted = quotas.consume_upto_many(quotas.KIND_BUMP, wanted, limits) if wanted else {}
+        bumped: List[PostBumpSchedule] = []
+        for schedule in candidates:  # đến hạn sớm hơn được ưu tiên
+            if granted.get(schedule.owner_id, 0) > 0:
+                granted[schedule.owner_id] -= 1
+                bumped.append(schedule)
+            else:
+                errors[schedule.post_id] = quotas.ERRORS[quotas.KIND_BUMP]
+
+        if bumped:
+            ids = [s.post_id for s in bumped]
+            # updated_at: text index của worker khác đồng bộ theo cột này
+            Post.objects.filter(id__in=ids).update(bumped_at=now, updated_at=now)
+            # UPDATE theo lô không qua Post.save -> tự ghi lịch sử "bump" (buffered)
+            for s in bumped:
+                post_history.record_change(
+                    post_id=s.post_id,
+                    actor_id=s.owner_id,
+                    old_content={"bumped_at": posts[s.post_id][1]},
+                    new_content={"bumped_at": now},
+                    change_type="bump",
+                    buffered=True,
+                )
+            bump_log.write_batch(
+                [
+                    PostBumpLog(
+                        post_id=s.post_id,
+                        actor_id=s.owner_id,
+                        is_agent=True,
+                        plan_code=(plans[s.owner_id] or "").upper(),
+                        note="schedule",
+                        created_at=now,
+                    )
+                    for s in bumped
+                ]
+            )
+            notify_post_changed(ids, "bump")
+
+        for schedule in due:
+            error = errors.get(schedule.post_id, "")
+            schedule.last_error = error
+            schedule.updated_at = now
+            if error == ERROR_POST_UNAVAILABLE:
+                schedule.is_active = False
+                schedule.next_run_at = None
+            else:
+                schedule.next_run_at = next_run(schedule.times, now)
+            if not error:
+                schedule.last_run_at = now
+        PostBumpSchedule.objects.bulk_update(
+            due, ["is_active", "next_run_at", "last_run_at", "last_error", "updated_at"]
+        )
+
+    stats["bumped"] = len(bumped)
+    stats["skipped"] = stats["due"] - len(bumped)
+    return stats
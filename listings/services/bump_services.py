@@ -1,34 +1,26 @@
 # listings/services/bump_services.py
 
-from datetime import timedelta
-
 from django.utils import timezone
 from django.db import transaction
 
 from listings.models import Post
+from listings.services import bump_log, quotas
+from listings.signals import notify_post_changed
 from accounts.services.membership_services import get_active_membership
 
 
 def get_daily_bump_limit(membership) -> int:
     """
-    Xác định số lượt bump tối đa / ngày theo gói VIP.
+    Số lượt bump tối đa / ngày theo gói VIP (LISTINGS_QUOTAS["PLANS"]).
     Ví dụ:
       - AGENT_1M: 10 lượt/ngày
       - AGENT_3M: 20 lượt/ngày
-      - default: 10
+      - gói khác: DEFAULT (10)
     """
     if not membership or not membership.plan:
         return 0
-
-    code = (membership.plan.code or "").upper()
-
-    if code == "AGENT_3M":
-        return 20
-    if code == "AGENT_1M":
-        return 10
-
-    # mặc định nếu sau này có gói khác
-    return 10
+    # có VIP = AGENT (kích hoạt gói gán role AGENT)
+    return quotas.limits_for(1, membership.plan.code or "")[quotas.KIND_BUMP]
 
 
 @transaction.atomic
@@ -60,13 +52,7 @@ def bump_post_for_request(post: Post, user):
             "message": "Tài khoản của bạn chưa có VIP hoặc đã hết hạn, không thể đẩy tin.",
         }
 
-    # 3) Reset counter nếu sang ngày mới
-    today = timezone.localdate()
-    if membership.last_bump_date != today:
-        membership.last_bump_date = today
-        membership.bumps_used_today = 0
-
-    # 4) Kiểm tra hạn mức theo gói
+    # 3) Kiểm tra hạn mức theo gói
     daily_limit = get_daily_bump_limit(membership)
     if daily_limit <= 0:
         return {
@@ -75,28 +61,34 @@ def bump_post_for_request(post: Post, user):
             "message": "Gói VIP hiện tại không hỗ trợ đẩy tin.",
         }
 
-    if membership.bumps_used_today >= daily_limit:
-        return {
-            "ok": 0,
-            "error": "MAX_DAILY_BUMP_REACHED",
-            "message": f"Bạn đã dùng hết {daily_limit} lượt đẩy tin hôm nay.",
-        }
+    # 4) Trừ 1 lượt: kiểm + tăng nguyên tử (2 click song song không cùng lọt).
+    #    Nằm trong transaction: bump lỗi -> lượt được trả lại (backend db).
+    quota = quotas.consume(
+        {quotas.KIND_BUMP: 1},
+        user_id=user_id_str,
+        limits={quotas.KIND_BUMP: daily_limit},
+        return_used=True,
+    )
+    if not quota["ok"]:
+        return {"ok": 0, "error": quota["error"], "message": quota["message"]}
 
     # 5) Thực hiện bump: cập nhật bumped_at
     now = timezone.now()
     post.bumped_at = now
-    post.save(update_fields=["bumped_at"])
+    # qua Post.save: diff với snapshot lúc load -> ghi lịch sử "bump" (buffered).
+    # updated_at (auto_now): text index của worker khác đồng bộ theo cột này
+    post.save(update_fields=["bumped_at", "updated_at"])
+
+    # 6) Log lượt bump (ghi theo lô ở thread nền sau commit, không chờ insert)
+    bump_log.record_bump(post.id, user_id_str, True, membership.plan.code)
 
-    # 6) Tăng counter
-    membership.bumps_used_today += 1
-    membership.last_bump_date = today
-    membership.save(update_fields=["bumps_used_today", "last_bump_date"])
+    notify_post_changed([post.id], "bump")
 
     return {
         "ok": 1,
         "message": "BUMP_SUCCESS",
         "post_id": post.id,
         "bumped_at": now.isoformat(),
-        "bumps_used_today": membership.bumps_used_today,
+        "bumps_used_today": quota["used"].get(quotas.KIND_BUMP),
         "daily_limit": daily_limit,
     }
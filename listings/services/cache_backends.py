@@ -0,0 +1,178 @@
+# listings/services/cache_backends.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLRUCache:
+    """
+    Cache trong process: LRU + TTL, thread-safe.
+    Mỗi worker có 1 bản riêng -> hợp cho dev / 1 process;
+    nhiều worker thì nên dùng RedisCache.
+    """
+
+    name = "local"
+
+    def __init__(self, max_entries: int = 1024, default_ttl: int = 60):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def add(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        """
+        Chỉ ghi khi key chưa có (hoặc đã hết hạn). Trả True nếu đã ghi.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and (item[1] is None or item[1] > now):
+                return False
+            self._data[key] = (value, now + ttl if ttl else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value, expires_at = self._data.get(key, (0, None))
+            value = int(value) + 1
+            self._data[key] = (value, expires_at)
+            return value
+
+    def get_int(self, key: str) -> int:
+        value = self.get(key)
+        return int(value or 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisCache:
+    """
+    Cache dùng chung giữa các worker qua Redis.
+    Lỗi kết nối Redis chỉ ghi log và coi như cache miss, không làm hỏng request.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "listings:", default_ttl: int = 60):
+        import redis
+
+        self._redis = redis
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def _k(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.get(self._k(key))
+        except self._redis.RedisError as e:
+            logger.warning("Redis GET failed: %s", e)
+            return None
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            if ttl:
+                self._client.setex(self._k(key), ttl, value)
+            else:
+                self._client.set(self._k(key), value)
+        except self._redis.RedisError as e:
+            logger.warning("Redis SET failed: %s", e)
+
+    def add(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            return bool(self._client.set(self._k(key), value, nx=True, ex=ttl or None))
+        except self._redis.RedisError as e:
+            logger.warning("Redis SET NX failed: %s", e)
+            return False
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(self._k(key))
+        except self._redis.RedisError as e:
+            logger.warning("Redis DEL failed: %s", e)
+
+    def incr(self, key: str) -> int:
+        try:
+            return int(self._client.incr(self._k(key)))
+        except self._redis.RedisError as e:
+            logger.warning("Redis INCR failed: %s", e)
+            return 0
+
+    def get_int(self, key: str) -> int:
+        return int(self.get(key) or 0)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self._client.scan_iter(match=f"{self.prefix}*"))
+            if keys:
+                self._client.delete(*keys)
+        except self._redis.RedisError as e:
+            logger.warning("Redis clear failed: %s", e)
+
+
+def build_cache(config: dict, prefix: str):
+    """
+    Tạo backend theo config dạng:
+        {"BACKEND": "local" | "redis" | "off", "TTL": 60,
+         "MAX_ENTRIES": 2048, "REDIS_URL": "redis://..."}
+    "off" -> trả None.
+    """
+    backend = (config.get("BACKEND") or "local").lower()
+    ttl = int(config.get("TTL", 60))
+
+    if backend == "off":
+        return None
+    if backend == "redis":
+        return RedisCache(
+            url=config.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
+            prefix=prefix,
+            default_ttl=ttl,
+        )
+    return LocalLRUCache(
+        max_entries=int(config.get("MAX_ENTRIES", 1024)),
+        default_ttl=ttl,
+    )
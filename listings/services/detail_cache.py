@@ -0,0 +1,300 @@
+# listings/services/detail_cache.py
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import receiver
+from rest_framework.renderers import JSONRenderer
+
+from listings.models import Post
+from listings.services import post_images, post_procs
+from listings.services.cache_backends import LocalLRUCache, build_cache
+from listings.signals import post_changed
+
+logger = logging.getLogger(__name__)
+
+# Key entry: "detail:<post_id>:<version>:<sha1(base URL)[:8]>".
+# version (key "detail:v:<post_id>") đổi mỗi khi bài có ghi (sửa / đổi
+# trạng thái / xoá / bump / ảnh) -> entry cũ của đúng bài đó tự "chết".
+#   - redis: INCR;
+#   - local: lưu ngay trong LRU (giới hạn MAX_ENTRIES như entry); key version
+#     bị đẩy ra -> cấp giá trị mới time_ns() chứ không về 0, nên không "sống lại"
+#     entry cũ.
+# INCR lỗi -> xem _pending.
+# Value: "<meta JSON>\n<body JSON>" -> body đã render sẵn, trả thẳng ra response
+# nên ETag (sha256 của body) khớp từng byte.
+_VERSION_KEY = "detail:v:{}"
+_LOCK_KEY = "detail:lock:{}"
+
+_lock = threading.Lock()
+_cache = None
+_cache_built = False
+# INCR version lỗi (Redis chập chờn) -> post_id: hạn bỏ qua cache. Trong hạn,
+# worker này đọc thẳng DB cho bài đó và thử INCR lại (tối đa 1 lần / giây)
+# tới khi được hoặc entry cũ đã tự hết TTL + STALE_TTL.
+_pending: Dict[str, float] = {}
+_next_retry = 0.0
+_stats = {"hits": 0, "stale": 0, "misses": 0}
+_executor: Optional[ThreadPoolExecutor] = None
+_renderer = JSONRenderer()
+
+
+class Entry:
+    __slots__ = ("body", "etag", "owner_id", "state")
+
+    def __init__(self, body: bytes, etag: str, owner_id: str, state: str):
+        self.body = body
+        self.etag = etag
+        self.owner_id = owner_id
+        self.state = state  # "hit" | "stale" | "miss"
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_DETAIL_CACHE", {}) or {}
+
+
+def fresh_ttl() -> int:
+    return int(_config().get("TTL", 300))
+
+
+def stale_ttl() -> int:
+    return int(_config().get("STALE_TTL", 60))
+
+
+def _get_cache():
+    global _cache, _cache_built
+    if not _cache_built:
+        with _lock:
+            if not _cache_built:
+                # entry sống thêm STALE_TTL sau khi hết "tươi" để còn trả bản cũ
+                config = {**_config(), "TTL": fresh_ttl() + stale_ttl()}
+                _cache = build_cache(config, prefix="listings:")
+                _cache_built = True
+    return _cache
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(_config().get("REFRESH_WORKERS", 2)),
+                    thread_name_prefix="detail-cache",
+                )
+    return _executor
+
+
+def _version(cache, post_id: str) -> int:
+    key = _VERSION_KEY.format(post_id)
+    if not isinstance(cache, LocalLRUCache):
+        return cache.get_int(key)
+    value = cache.get(key)
+    if value is None:
+        fresh = time.time_ns()
+        value = fresh if cache.add(key, fresh, ttl=0) else (cache.get(key) or fresh)
+    return int(value)
+
+
+def _key(post_id: str, version: int, base: str) -> str:
+    digest = hashlib.sha1(base.encode()).hexdigest()[:8]
+    return f"detail:{post_id}:{version}:{digest}"
+
+
+def _bump_version(cache, post_id: str) -> bool:
+    key = _VERSION_KEY.format(post_id)
+    if isinstance(cache, LocalLRUCache):
+        cache.set(key, time.time_ns(), ttl=0)
+        return True
+    return cache.incr(key) > 0  # RedisCache nuốt RedisError và trả 0
+
+
+def _retry_pending(cache) -> None:
+    global _next_retry
+    now = time.time()
+    if not _pending or now < _next_retry:
+        return
+    _next_retry = now + 1
+    for post_id, until in list(_pending.items()):
+        if until <= now or _bump_version(cache, post_id):
+            _pending.pop(post_id, None)
+
+
+def _count(kind: str, cache) -> None:
+    with _lock:
+        _stats[kind] += 1
+    if not isinstance(cache, LocalLRUCache):
+        cache.incr(f"detail:stats:{kind}")
+
+
+# ========== DỰNG PAYLOAD ==========
+def compute(post_id: str, base: str) -> Optional[Tuple[bytes, str]]:
+    """
+    Chi tiết bài dạng công khai: SP sp_post_get_json + ảnh đã sẵn sàng
+    (cùng format PostImageSerializer). Chỉ cần base URL, không cần request
+    -> chạy được ở thread nền. Trả (body JSON, owner_id) hoặc None nếu không có bài.
+    """
+    data = post_procs.sp_post_get_json(post_id)
+    if not data:
+        return None
+    owner_id = ""
+    if isinstance(data, dict):
+        owner_id = str(data.get("owner_id") or "")
+        if not owner_id:
+            owner_id = str(
+                Post.objects.filter(id=post_id).values_list("owner_id", flat=True).first() or ""
+            )
+        data["images"] = post_images.images_for_posts([post_id], base=base).get(str(post_id), [])
+    return _renderer.render(data), owner_id
+
+
+def _pack(body: bytes, owner_id: str) -> Tuple[bytes, str]:
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    meta = {"etag": etag, "owner_id": owner_id, "fresh_until": time.time() + fresh_ttl()}
+    return json.dumps(meta, separators=(",", ":")).encode() + b"\n" + body, etag
+
+
+def _unpack(raw: bytes) -> Tuple[Dict[str, Any], bytes]:
+    meta, _, body = raw.partition(b"\n")
+    return json.loads(meta), body
+
+
+def _store(cache, key: str, post_id: str, base: str) -> Optional[Entry]:
+    result = compute(post_id, base)
+    if result is None:
+        return None  # 404 không cache
+    body, owner_id = result
+    raw, etag = _pack(body, owner_id)
+    cache.set(key, raw)
+    return Entry(body, etag, owner_id, "miss")
+
+
+def _refresh(key: str, post_id: str, base: str) -> None:
+    cache = _get_cache()
+    try:
+        _store(cache, key, post_id, base)
+    except Exception:
+        logger.exception("Làm mới cache chi tiết bài %s thất bại", post_id)
+    finally:
+        cache.delete(_LOCK_KEY.format(post_id))
+        connections.close_all()  # connection của thread nền
+
+
+# ========== ĐỌC ==========
+def get(post_id: str, base: str) -> Optional[Entry]:
+    """
+    Read-through cache chi tiết bài (bản công khai, chỉ ảnh READY):
+      - còn tươi -> trả luôn, không chạm MySQL;
+      - hết tươi nhưng còn trong STALE_TTL -> trả bản cũ, đúng 1 worker
+        (khoá cache.add) dựng lại ở thread nền -> bài hot hết hạn không dồn DB;
+      - không có -> dựng tại chỗ rồi lưu.
+    None = không có bài (không cache).
+    """
+    post_id = str(post_id)
+    cache = _get_cache()
+    if cache is None:
+        result = compute(post_id, base)
+        if result is None:
+            return None
+        body, owner_id = result
+        return Entry(body, _pack(body, owner_id)[1], owner_id, "miss")
+
+    _retry_pending(cache)
+    if post_id in _pending:
+        # version chưa tăng được -> entry cũ (kể cả stale) không còn đúng
+        result = compute(post_id, base)
+        if result is None:
+            return None
+        body, owner_id = result
+        return Entry(body, _pack(body, owner_id)[1], owner_id, "miss")
+
+    key = _key(post_id, _version(cache, post_id), base)
+    raw = cache.get(key)
+    if raw is not None:
+        meta, body = _unpack(raw)
+        if meta["fresh_until"] > time.time():
+            _count("hits", cache)
+            return Entry(body, meta["etag"], meta["owner_id"], "hit")
+        _count("stale", cache)
+        if cache.add(_LOCK_KEY.format(post_id), b"1", int(_config().get("LOCK_TTL", 30))):
+            _get_executor().submit(_refresh, key, post_id, base)
+        return Entry(body, meta["etag"], meta["owner_id"], "stale")
+
+    _count("misses", cache)
+    return _store(cache, key, post_id, base)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match: "*" / 1 hay nhiều ETag cách dấu phẩy, so khớp yếu
+    (bỏ tiền tố W/) theo RFC 9110 cho GET.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+# ========== HUỶ ==========
+def invalidate(post_ids) -> None:
+    cache = _get_cache()
+    if cache is None:
+        return
+    for post_id in {str(pid) for pid in post_ids}:
+        if _bump_version(cache, post_id):
+            _pending.pop(post_id, None)
+            continue
+        # version giữ nguyên -> bản cũ còn bị trả tới TTL + STALE_TTL: ghi nhận
+        # để worker này bỏ qua cache + thử lại (worker khác vẫn có thể trả bản cũ)
+        _pending[post_id] = time.time() + fresh_ttl() + stale_ttl()
+        logger.error(
+            "Không tăng được version cache chi tiết bài %s (Redis lỗi), "
+            "bỏ qua cache và thử lại tới khi thành công",
+            post_id,
+        )
+
+
+def stats() -> Dict[str, Any]:
+    """
+    Số hit / stale / miss: local = của process hiện tại; redis = cộng dồn mọi worker.
+    """
+    cache = _get_cache()
+    if cache is None:
+        return {"backend": "off", "hits": 0, "stale": 0, "misses": 0, "hit_rate": None}
+
+    if isinstance(cache, LocalLRUCache):
+        counts = dict(_stats)
+        extra = {"entries": len(cache)}
+    else:
+        counts = {kind: cache.get_int(f"detail:stats:{kind}") for kind in _stats}
+        extra = {}
+
+    total = sum(counts.values())
+    served = counts["hits"] + counts["stale"]
+    return {
+        "backend": cache.name,
+        **counts,
+        "hit_rate": round(served / total, 4) if total else None,
+        **extra,
+    }
+
+
+@receiver(post_changed)
+def _on_post_changed(sender, post_ids, action, **kwargs):
+    if action == "create":
+        return  # bài mới chưa có entry nào
+    invalidate(post_ids)
@@ -0,0 +1,252 @@
+# listings/services/direct_uploads.py
+
+import hmac
+import time
+import uuid
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.urls import reverse
+from django.utils.crypto import salted_hmac
+
+from listings.models import Post, PostImage
+from listings.services import image_derivatives, image_pipeline, quotas
+from listings.signals import notify_post_changed
+
+TOKEN_SALT = "listings.direct_uploads"
+_LOCAL_SALT = "listings.direct_uploads.local"
+
+
+class UploadError(Exception):
+    """
+    Lỗi nghiệp vụ của upload trực tiếp (view trả 400 / 403 kèm `code`).
+    """
+
+    def __init__(self, code: str, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status_code = status_code
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_DIRECT_UPLOAD", {}) or {}
+
+
+def token_ttl() -> int:
+    return int(_config().get("TOKEN_TTL", 3600))
+
+
+def _storage():
+    return PostImage._meta.get_field("image").storage
+
+
+# ========== SIGNER ==========
+class CloudinarySigner:
+    """
+    Client POST thẳng file lên Cloudinary với tham số đã ký (API secret không
+    rời server). Response của Cloudinary có `signature` = sha1(public_id, version)
+    -> finalize kiểm tra được mà không cần gọi Cloudinary.
+    """
+
+    def stored_name(self, name: str) -> str:
+        # public_id = name trong DB (MediaCloudinaryStorage thêm prefix "media/")
+        storage = _storage()
+        prepend = getattr(storage, "_prepend_prefix", None)
+        return prepend(name) if prepend else name
+
+    def sign(self, public_id: str, expires_at: int, request=None) -> Dict[str, Any]:
+        import cloudinary
+        import cloudinary.utils
+
+        config = cloudinary.config()
+        params = {"public_id": public_id, "timestamp": int(time.time())}
+        tag = getattr(_storage(), "TAG", None)
+        if tag:
+            params["tags"] = tag
+        signature = cloudinary.utils.api_sign_request(params, config.api_secret)
+        return {
+            "upload_url": cloudinary.utils.cloudinary_api_url("upload", resource_type="image"),
+            "method": "POST",
+            "file_field": "file",
+            "fields": {**params, "api_key": config.api_key, "signature": signature},
+        }
+
+    def verify(self, public_id: str, version: Any, signature: str) -> bool:
+        import cloudinary.utils
+
+        return bool(
+            signature
+            and cloudinary.utils.verify_api_response_signature(public_id, version, signature)
+        )
+
+
+class LocalSigner:
+    """
+    Stand-in chạy offline (dev / test): upload vào endpoint uploads/local
+    (lưu bằng storage của PostImage), chữ ký HMAC theo SECRET_KEY.
+    Response giả lập Cloudinary: {"public_id", "version", "signature"}.
+    """
+
+    def stored_name(self, name: str) -> str:
+        return name
+
+    @staticmethod
+    def _sig(*parts: Any) -> str:
+        return salted_hmac(_LOCAL_SALT, ":".join(str(p) for p in parts)).hexdigest()
+
+    def sign(self, public_id: str, expires_at: int, request=None) -> Dict[str, Any]:
+        url = reverse("direct-upload-local")
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return {
+            "upload_url": url,
+            "method": "POST",
+            "file_field": "file",
+            "fields": {
+                "public_id": public_id,
+                "expires": expires_at,
+                "signature": self._sig(public_id, expires_at),
+            },
+        }
+
+    def accept(self, public_id: str, expires: Any, signature: str, upload) -> Dict[str, Any]:
+        """
+        Nhận file cho endpoint local: kiểm chữ ký + hạn rồi lưu đúng public_id.
+        """
+        if not hmac.compare_digest(self._sig(public_id, expires), signature or ""):
+            raise UploadError("INVALID_SIGNATURE", "Chữ ký upload không hợp lệ", 403)
+        try:
+            expired = int(expires) < time.time()
+        except (TypeError, ValueError):
+            expired = True
+        if expired:
+            raise UploadError("UPLOAD_EXPIRED", "Tham số upload đã hết hạn", 403)
+        stored = _storage().save(public_id, upload)
+        if stored != public_id:
+            # trùng tên (upload lại cùng slot) -> bỏ bản mới, giữ bản đầu
+            _storage().delete(stored)
+        version = int(time.time())
+        return {
+            "public_id": public_id,
+            "version": version,
+            "signature": self._sig(public_id, version),
+        }
+
+    def verify(self, public_id: str, version: Any, signature: str) -> bool:
+        return hmac.compare_digest(self._sig(public_id, version), signature or "")
+
+
+SIGNERS = {"cloudinary": CloudinarySigner, "local": LocalSigner}
+
+
+def get_signer():
+    name = _config().get("SIGNER", "cloudinary")
+    try:
+        return SIGNERS[name]()
+    except KeyError:
+        raise ValueError(f"LISTINGS_DIRECT_UPLOAD['SIGNER'] không hợp lệ: {name}")
+
+
+# ========== INTENT ==========
+def create_intent(post: Post, actor_id: str, is_agent_flag, count: int, request=None) -> Dict[str, Any]:
+    """
+    Cấp `count` slot upload cho bài: mỗi slot 1 public_id + tham số đã ký.
+    Token trả kèm liệt kê các public_id được phép finalize cho bài / người này.
+    """
+    if count < 1:
+        raise UploadError("INVALID_COUNT", "count phải >= 1")
+    # chỉ xem còn bao nhiêu slot, hạn mức bị trừ lúc finalize
+    limits = quotas.limits_for_user(actor_id, is_agent_flag)
+    left = quotas.remaining(quotas.KIND_IMAGE, limits, post_id=post.id)
+    if count > left:
+        raise UploadError(
+            quotas.ERRORS[quotas.KIND_IMAGE],
+            f"Bài đăng chỉ còn được thêm {left} ảnh (tối đa {limits[quotas.KIND_IMAGE]} ảnh mỗi bài).",
+        )
+
+    signer = get_signer()
+    expires_at = int(time.time()) + token_ttl()
+    public_ids = [
+        signer.stored_name(f"posts/{post.id}/{uuid.uuid4().hex}") for _ in range(count)
+    ]
+    token = signing.dumps(
+        {"post": post.id, "actor": actor_id, "ids": public_ids},
+        salt=TOKEN_SALT,
+        compress=True,
+    )
+    return {
+        "token": token,
+        "expires_at": expires_at,
+        "max_images": limits[quotas.KIND_IMAGE],
+        "slots": [
+            {"public_id": public_id, **signer.sign(public_id, expires_at, request)}
+            for public_id in public_ids
+        ],
+    }
+
+
+# ========== FINALIZE ==========
+def finalize(
+    post: Post,
+    actor_id: str,
+    is_agent_flag,
+    token: str,
+    uploads: List[Dict[str, Any]],
+) -> List[PostImage]:
+    """
+    Đăng ký các ảnh client đã upload xong thành PostImage(status=ready)
+    bằng 1 bulk insert. Mỗi upload phải thuộc token và có chữ ký hợp lệ từ
+    storage; public_id đã đăng ký rồi thì bỏ qua (gọi lại finalize an toàn).
+    """
+    try:
+        payload = signing.loads(token or "", salt=TOKEN_SALT, max_age=token_ttl())
+    except signing.SignatureExpired:
+        raise UploadError("UPLOAD_EXPIRED", "Phiên upload đã hết hạn", 403)
+    except signing.BadSignature:
+        raise UploadError("INVALID_TOKEN", "Token upload không hợp lệ", 403)
+    if payload.get("post") != post.id or payload.get("actor") != actor_id:
+        raise UploadError("INVALID_TOKEN", "Token không thuộc bài / người dùng này", 403)
+
+    allowed = set(payload.get("ids") or [])
+    signer = get_signer()
+    names: List[str] = []
+    for item in uploads:
+        public_id = str(item.get("public_id") or "")
+        if public_id not in allowed:
+            raise UploadError("UNKNOWN_UPLOAD", f"public_id không thuộc phiên upload: {public_id}")
+        if not signer.verify(public_id, item.get("version"), str(item.get("signature") or "")):
+            raise UploadError("INVALID_SIGNATURE", f"Chữ ký upload không hợp lệ: {public_id}", 403)
+        if public_id not in names:
+            names.append(public_id)
+
+    with transaction.atomic():
+        # khoá dòng bài: 2 finalize song song không đăng ký trùng public_id
+        Post.objects.select_for_update().filter(id=post.id).values_list("id", flat=True).first()
+        existing = set(
+            PostImage.objects.filter(post_id=post.id, image__in=names).values_list("image", flat=True)
+        )
+        names = [n for n in names if n not in existing]
+        if not names:
+            return []
+        # trừ hạn mức ảnh trong cùng transaction (lỗi sau đó -> rollback cả hạn mức)
+        quota = quotas.consume(
+            {quotas.KIND_IMAGE: len(names)},
+            post_id=post.id,
+            limits=quotas.limits_for_user(actor_id, is_agent_flag),
+        )
+        if not quota["ok"]:
+            raise UploadError(quota["error"], quota["message"])
+        PostImage.objects.bulk_create(
+            [PostImage(post_id=post.id, image=name, status=PostImage.STATUS_READY) for name in names]
+        )
+        # MySQL bulk_create không trả id -> đọc lại theo tên
+        images = list(PostImage.objects.filter(post_id=post.id, image__in=names).order_by("id"))
+        notify_post_changed([post.id], "images")
+        if image_derivatives.is_enabled():
+            ids = [img.id for img in images]
+            # derivative đọc ảnh từ storage trên thread nền, không trong request
+            transaction.on_commit(lambda: image_pipeline.submit_derivatives(ids))
+    return images
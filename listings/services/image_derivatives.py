@@ -0,0 +1,174 @@
+# listings/services/image_derivatives.py
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from listings.models import PostImage
+from listings.services import image_render
+from listings.signals import notify_post_changed
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = "posts/variants/"
+
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_IMAGE_VARIANTS", {}) or {}
+
+
+def is_enabled() -> bool:
+    return bool(_config().get("ENABLED", True))
+
+
+def widths() -> Dict[str, int]:
+    return dict(_config().get("WIDTHS") or {"thumb": 320, "medium": 960})
+
+
+def _storage():
+    return PostImage._meta.get_field("image").storage
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    # Resize / encode WebP tốn CPU và giữ GIL -> chạy ở process riêng.
+    # spawn (không fork) vì process cha có nhiều thread (pool upload, writer...).
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=int(_config().get("WORKERS", 2)),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+# ========== SINH DERIVATIVE ==========
+def variant_name(image_name: str, variant: str) -> str:
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f"{VARIANT_DIR}{stem}_{variant}.webp"
+
+
+def render_async(source: bytes) -> Future:
+    config = _config()
+    return _process_pool().submit(
+        image_render.render,
+        source,
+        widths(),
+        int(config.get("QUALITY", 75)),
+        tuple(config.get("BLURHASH_COMPONENTS", (4, 3))),
+    )
+
+
+def _store(image_name: str, rendered: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Upload các bản WebP đã render -> dict field cho PostImage.
+    """
+    storage = _storage()
+    variants = {}
+    for variant, data in rendered["variants"].items():
+        stored = storage.save(variant_name(image_name, variant), ContentFile(data["data"]))
+        variants[variant] = {"name": stored, "width": data["width"], "height": data["height"]}
+    return {
+        "width": rendered["width"],
+        "height": rendered["height"],
+        "blurhash": rendered["blurhash"],
+        "variants": variants,
+    }
+
+
+def _wait(future: Future, label: Any) -> Optional[Dict[str, Any]]:
+    try:
+        return future.result(timeout=float(_config().get("TIMEOUT", 60)))
+    except Exception as e:
+        # ảnh hỏng / định dạng lạ -> vẫn dùng ảnh gốc, chỉ thiếu derivative
+        logger.warning("image_derivatives: không render được ảnh %s: %s", label, e)
+        return None
+
+
+def derive(image_name: str, source_path: str) -> Dict[str, Any]:
+    """
+    Sinh derivative cho ảnh vừa upload (đọc từ file tạm local).
+    Trả dict field để ghi cùng lúc chuyển ready; {} nếu tắt / lỗi.
+    """
+    if not is_enabled():
+        return {}
+    try:
+        with open(source_path, "rb") as fh:
+            source = fh.read()
+    except OSError as e:
+        logger.warning("image_derivatives: không đọc được %s: %s", source_path, e)
+        return {}
+    rendered = _wait(render_async(source), image_name)
+    if rendered is None:
+        return {}
+    try:
+        return _store(image_name, rendered)
+    except Exception as e:
+        logger.warning("image_derivatives: upload derivative của %s lỗi: %s", image_name, e)
+        return {}
+
+
+def derive_existing(images: Iterable[PostImage]) -> int:
+    """
+    Sinh derivative cho các ảnh đã có trên storage (backfill / upload đồng bộ):
+    tải ảnh gốc, render song song trên process pool, ghi lại từng ảnh.
+    Trả số ảnh đã sinh được.
+    """
+    jobs = []
+    for image in images:
+        if not image.image:
+            continue
+        try:
+            with image.image.open("rb") as fh:
+                source = fh.read()
+        except Exception as e:
+            logger.warning("image_derivatives: không tải được ảnh %s: %s", image.id, e)
+            continue
+        jobs.append((image, render_async(source)))
+
+    done = 0
+    changed_posts: List[str] = []
+    for image, future in jobs:
+        rendered = _wait(future, image.id)
+        if rendered is None:
+            continue
+        try:
+            fields = _store(image.image.name, rendered)
+        except Exception as e:
+            logger.warning("image_derivatives: upload derivative của ảnh %s lỗi: %s", image.id, e)
+            continue
+        if PostImage.objects.filter(id=image.id).update(**fields):
+            done += 1
+            changed_posts.append(image.post_id)
+    if changed_posts:
+        notify_post_changed(list(dict.fromkeys(changed_posts)), "images")
+    return done
+
+
+def backfill(batch_size: int = 100, force: bool = False) -> int:
+    """
+    Sinh derivative cho các ảnh ready chưa có (blurhash rỗng = chưa sinh),
+    duyệt theo id từng lô. force=True -> sinh lại tất cả.
+    """
+    qs = PostImage.objects.filter(status=PostImage.STATUS_READY).exclude(image="")
+    if not force:
+        qs = qs.filter(blurhash="")
+    written = 0
+    last_id = 0
+    while True:
+        batch = list(qs.filter(id__gt=last_id).order_by("id")[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        written += derive_existing(batch)
+    return written
@@ -0,0 +1,240 @@
+# listings/services/image_pipeline.py
+
+import logging
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+
+from listings.models import PostImage
+from listings.services import image_derivatives, quotas
+from listings.signals import notify_post_changed
+
+logger = logging.getLogger(__name__)
+
+_SAFE_CHARS_RE = re.compile(r"[^A-Za-z0-9._-]+")
+_SPOOL_SEP = "__"
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_IMAGE_PIPELINE", {}) or {}
+
+
+def is_enabled() -> bool:
+    return bool(_config().get("ENABLED", True))
+
+
+def spool_dir() -> Path:
+    path = Path(_config().get("SPOOL_DIR") or Path(settings.BASE_DIR) / "var" / "image_spool")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _storage():
+    # cùng storage với field -> URL sinh ra khớp với file đã upload
+    return PostImage._meta.get_field("image").storage
+
+
+def _executor_pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(_config().get("WORKERS", 4)),
+                    thread_name_prefix="image-upload",
+                )
+    return _executor
+
+
+# ========== NHẬN FILE ==========
+def _spool(post_id: str, upload) -> str:
+    """
+    Ghi file upload xuống đĩa local theo từng chunk; tên file giữ lại tên gốc
+    (sau dấu "__") để lúc upload storage đặt tên như cũ.
+    """
+    original = _SAFE_CHARS_RE.sub("_", os.path.basename(upload.name or "image")) or "image"
+    target_dir = spool_dir() / str(post_id)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    path = target_dir / f"{uuid.uuid4().hex}{_SPOOL_SEP}{original}"
+    with open(path, "wb") as out:
+        for chunk in upload.chunks():
+            out.write(chunk)
+    return str(path)
+
+
+def _original_name(spool_path: str) -> str:
+    name = os.path.basename(spool_path)
+    return name.split(_SPOOL_SEP, 1)[1] if _SPOOL_SEP in name else name
+
+
+def enqueue_uploads(post, files: Iterable) -> List[PostImage]:
+    """
+    Nhận ảnh cho 1 bài: lưu tạm xuống đĩa + tạo PostImage(status=pending),
+    upload thật chạy nền sau khi transaction commit. Trả các PostImage vừa tạo
+    (placeholder, chưa có URL).
+    Pipeline tắt -> upload trực tiếp như cũ (status=ready).
+    """
+    files = [f for f in files if f]
+    if not is_enabled():
+        images = [PostImage.objects.create(post=post, image=f) for f in files]
+        if images:
+            notify_post_changed([post.id], "images")
+        if images and image_derivatives.is_enabled():
+            ids = [img.id for img in images]
+            # derivative vẫn sinh nền, không giữ request
+            transaction.on_commit(lambda: submit_derivatives(ids))
+        return images
+
+    images = []
+    for f in files:
+        images.append(
+            PostImage.objects.create(
+                post=post,
+                status=PostImage.STATUS_PENDING,
+                spool_path=_spool(post.id, f),
+            )
+        )
+    ids = [img.id for img in images]
+    if ids:
+        transaction.on_commit(lambda: submit(ids))
+    return images
+
+
+def submit(image_ids: Iterable[int]) -> None:
+    if _config().get("EAGER"):
+        # chạy ngay trong thread hiện tại (test / management command)
+        for image_id in image_ids:
+            process_image(image_id)
+        return
+    pool = _executor_pool()
+    for image_id in image_ids:
+        pool.submit(_run_task, image_id)
+
+
+def submit_derivatives(image_ids: List[int]) -> None:
+    """
+    Sinh derivative nền cho ảnh đã có trên storage (upload đồng bộ / upload trực tiếp).
+    """
+    if _config().get("EAGER"):
+        image_derivatives.derive_existing(PostImage.objects.filter(id__in=image_ids))
+        return
+    _executor_pool().submit(_run_derive, list(image_ids))
+
+
+# ========== WORKER ==========
+def _run_task(image_id: int) -> None:
+    try:
+        process_image(image_id)
+    except Exception:
+        logger.exception("image_pipeline: lỗi không mong đợi với ảnh %s", image_id)
+    finally:
+        # connection DB theo thread -> không để thread của pool giữ connection cũ
+        connection.close()
+
+
+def _run_derive(image_ids: List[int]) -> None:
+    try:
+        image_derivatives.derive_existing(PostImage.objects.filter(id__in=image_ids))
+    except Exception:
+        logger.exception("image_pipeline: lỗi sinh derivative cho ảnh %s", image_ids)
+    finally:
+        connection.close()
+
+
+def _schedule_retry(image_id: int, attempts: int) -> None:
+    delay = float(_config().get("RETRY_BACKOFF", 2.0)) * (2 ** (attempts - 1))
+    timer = threading.Timer(delay, lambda: submit([image_id]))
+    timer.daemon = True
+    timer.start()
+
+
+def process_image(image_id: int) -> bool:
+    """
+    Upload 1 ảnh pending lên storage, sinh derivative (thumb / medium WebP,
+    blurhash, kích thước) từ file tạm rồi chuyển ready. Lỗi upload -> thử lại với
+    backoff luỹ thừa, quá MAX_ATTEMPTS -> failed. Trả True nếu đã ready.
+    """
+    image = PostImage.objects.filter(id=image_id, status=PostImage.STATUS_PENDING).first()
+    if image is None:
+        return False  # đã xử lý / đã bị xoá
+
+    spool_path = image.spool_path
+    if not spool_path or not os.path.exists(spool_path):
+        if PostImage.objects.filter(id=image_id, status=PostImage.STATUS_PENDING).update(
+            status=PostImage.STATUS_FAILED, last_error="Mất file tạm"
+        ):
+            quotas.release({quotas.KIND_IMAGE: 1}, post_id=image.post_id)
+        return False
+
+    name = PostImage._meta.get_field("image").generate_filename(
+        image, _original_name(spool_path)
+    )
+    try:
+        with open(spool_path, "rb") as fh:
+            stored_name = _storage().save(name, File(fh, name=os.path.basename(name)))
+    except Exception as e:
+        attempts = image.attempts + 1
+        max_attempts = int(_config().get("MAX_ATTEMPTS", 5))
+        failed = attempts >= max_attempts
+        PostImage.objects.filter(id=image_id).update(
+            attempts=attempts,
+            last_error=str(e)[:255],
+            status=PostImage.STATUS_FAILED if failed else PostImage.STATUS_PENDING,
+        )
+        logger.warning("image_pipeline: upload ảnh %s lỗi (lần %s): %s", image_id, attempts, e)
+        if failed:
+            # ảnh failed không tính vào hạn mức ảnh của bài
+            quotas.release({quotas.KIND_IMAGE: 1}, post_id=image.post_id)
+        else:
+            _schedule_retry(image_id, attempts)
+        return False
+
+    # derivative lỗi không chặn ảnh gốc (card fallback về image_url)
+    derived = image_derivatives.derive(stored_name, spool_path)
+
+    # bài / ảnh bị xoá trong lúc upload -> update 0 dòng, dọn file vừa upload
+    updated = PostImage.objects.filter(
+        id=image_id, status=PostImage.STATUS_PENDING
+    ).update(
+        image=stored_name,
+        status=PostImage.STATUS_READY,
+        spool_path="",
+        attempts=image.attempts + 1,
+        last_error="",
+        **derived,
+    )
+    if not updated:
+        for name in [stored_name] + [v["name"] for v in derived.get("variants", {}).values()]:
+            _storage().delete(name)
+    _remove_spool(spool_path)
+    if updated:
+        notify_post_changed([image.post_id], "images")
+    return bool(updated)
+
+
+def _remove_spool(path: str) -> None:
+    try:
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))  # chỉ xoá được khi thư mục đã rỗng
+    except OSError:
+        pass
+
+
+def discard(images: Iterable[PostImage]) -> None:
+    """
+    Dọn file tạm của các ảnh pending sắp bị xoá.
+    """
+    for image in images:
+        if image.spool_path:
+            _remove_spool(image.spool_path)
@@ -0,0 +1,132 @@
+# listings/services/image_render.py
+#
+# Xử lý ảnh thuần Pillow, KHÔNG import Django: chạy trong process con của
+# ProcessPoolExecutor (spawn) mà không cần setup Django.
+
+import io
+import math
+from typing import Any, Dict, List, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+_B83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+_BLURHASH_SIZE = 32  # blurhash tính trên ảnh thu nhỏ (đủ cho vài thành phần cos)
+_ORIENTATION_TAG = 0x0112
+
+
+# ========== BLURHASH ==========
+def _encode83(value: int, length: int) -> str:
+    out = []
+    for i in range(1, length + 1):
+        out.append(_B83[(value // 83 ** (length - i)) % 83])
+    return "".join(out)
+
+
+def _srgb_to_linear(value: int) -> float:
+    v = value / 255.0
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value: float) -> int:
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value: float, exp: float) -> float:
+    return math.copysign(abs(value) ** exp, value)
+
+
+def encode_blurhash(
+    pixels: Sequence[Tuple[int, int, int]],
+    width: int,
+    height: int,
+    x_components: int = 4,
+    y_components: int = 3,
+) -> str:
+    """
+    Blurhash (https://blurha.sh) của ảnh RGB `width` x `height`
+    (pixels theo hàng, như Image.getdata()).
+    """
+    linear = [tuple(_srgb_to_linear(c) for c in px[:3]) for px in pixels]
+    cos_x = [[math.cos(math.pi * i * x / width) for x in range(width)] for i in range(x_components)]
+    cos_y = [[math.cos(math.pi * j * y / height) for y in range(height)] for j in range(y_components)]
+
+    factors: List[Tuple[float, float, float]] = []
+    for j in range(y_components):
+        for i in range(x_components):
+            norm = (1 if i == 0 and j == 0 else 2) / (width * height)
+            r = g = b = 0.0
+            for y in range(height):
+                cy = cos_y[j][y]
+                row = y * width
+                for x in range(width):
+                    basis = cos_x[i][x] * cy
+                    pr, pg, pb = linear[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            factors.append((r * norm, g * norm, b * norm))
+
+    dc, ac = factors[0], factors[1:]
+    result = _encode83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        actual_max = max(abs(v) for f in ac for v in f)
+        quantised_max = int(max(0, min(82, math.floor(actual_max * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+        result += _encode83(quantised_max, 1)
+    else:
+        max_value = 1.0
+        result += _encode83(0, 1)
+
+    result += _encode83(
+        (_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4
+    )
+
+    def quant(v: float) -> int:
+        return int(max(0, min(18, math.floor(_sign_pow(v / max_value, 0.5) * 9 + 9.5))))
+
+    for r, g, b in ac:
+        result += _encode83(quant(r) * 19 * 19 + quant(g) * 19 + quant(b), 2)
+    return result
+
+
+# ========== DERIVATIVES ==========
+def render(
+    source: bytes,
+    widths: Dict[str, int],
+    quality: int = 75,
+    components: Tuple[int, int] = (4, 3),
+) -> Dict[str, Any]:
+    """
+    Ảnh gốc (bytes) -> kích thước gốc (đã xoay theo EXIF), blurhash và
+    các bản WebP theo chiều rộng cố định trong `widths` (không phóng to).
+    Trả {"width", "height", "blurhash", "variants": {name: {"width", "height", "data"}}}.
+    """
+    with Image.open(io.BytesIO(source)) as img:
+        width, height = img.size
+        if img.getexif().get(_ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+            width, height = height, width  # ảnh chụp dọc: EXIF xoay 90 độ
+
+        # JPEG: decode luôn ở độ phân giải nhỏ hơn (vẫn >= bản lớn nhất cần dựng)
+        largest = max(widths.values()) if widths else _BLURHASH_SIZE
+        img.draft("RGB", (largest, largest))
+        frame = ImageOps.exif_transpose(img)
+        if frame.mode not in ("RGB", "RGBA"):
+            frame = frame.convert("RGBA" if "A" in frame.getbands() else "RGB")
+
+        variants: Dict[str, Dict[str, Any]] = {}
+        for name, target in sorted(widths.items(), key=lambda kv: kv[1]):
+            w = min(int(target), frame.width)
+            h = max(1, round(frame.height * w / frame.width))
+            resized = frame if (w, h) == frame.size else frame.resize((w, h), Image.LANCZOS)
+            buf = io.BytesIO()
+            resized.save(buf, "WEBP", quality=quality, method=4)
+            variants[name] = {"width": w, "height": h, "data": buf.getvalue()}
+
+        small = frame.convert("RGB")
+        small.thumbnail((_BLURHASH_SIZE, _BLURHASH_SIZE))
+        blurhash = encode_blurhash(list(small.getdata()), small.width, small.height, *components)
+
+    return {"width": width, "height": height, "blurhash": blurhash, "variants": variants}
@@ -0,0 +1,132 @@
+# listings/services/masters.py
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from listings.models import ApprovalStatus, Category, PostStatus, PostType
+
+# Tên trạng thái cố định (seed_listings_masters)
+APPROVAL_PENDING = "Pending"
+APPROVAL_APPROVED = "Approved"
+APPROVAL_REJECTED = "Rejected"
+POST_HIDDEN = "Hidden"
+POST_PUBLISHED = "Published"
+POST_ARCHIVED = "Archived"
+
+# key trong bundle -> (model, các field trả về)
+KINDS = {
+    "categories": (Category, ("id", "name")),
+    "post_types": (PostType, ("id", "name")),
+    "approval_statuses": (ApprovalStatus, ("id", "name", "description")),
+    "post_statuses": (PostStatus, ("id", "name", "description")),
+}
+
+_lock = threading.Lock()
+_registry: Optional["Registry"] = None
+
+
+class Registry:
+    """
+    Ảnh chụp danh mục (category, loại tin, trạng thái) tại 1 thời điểm.
+    Không đổi sau khi tạo -> đọc không cần khoá; đổi dữ liệu thì thay cả object.
+    """
+
+    def __init__(self, bundle: Dict[str, List[Dict[str, Any]]]):
+        self.bundle = bundle
+        self.loaded_at = time.monotonic()
+        self._ids = {
+            kind: {row["name"]: row["id"] for row in rows}
+            for kind, rows in bundle.items()
+        }
+        self._names = {
+            kind: {row["id"]: row["name"] for row in rows}
+            for kind, rows in bundle.items()
+        }
+        # JSON chuẩn hoá (sort key, không khoảng trắng) -> hash làm ETag / version
+        raw = json.dumps(bundle, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        self.version = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def id_of(self, kind: str, name: str) -> Optional[int]:
+        return self._ids[kind].get(name)
+
+    def name_of(self, kind: str, pk: Any) -> Optional[str]:
+        try:
+            return self._names[kind].get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def names(self, kind: str) -> Dict[int, str]:
+        return dict(self._names[kind])
+
+
+def _ttl() -> int:
+    # signal chỉ xoá được registry của process hiện tại;
+    # TTL để các worker khác cũng thấy thay đổi (0 = không hết hạn)
+    return int((getattr(settings, "LISTINGS_MASTERS", {}) or {}).get("TTL", 300))
+
+
+def _load() -> Registry:
+    bundle = {
+        kind: list(model.objects.order_by("id").values(*fields))
+        for kind, (model, fields) in KINDS.items()
+    }
+    return Registry(bundle)
+
+
+def get_registry() -> Registry:
+    global _registry
+    registry = _registry
+    ttl = _ttl()
+    if registry is None or (ttl and time.monotonic() - registry.loaded_at > ttl):
+        with _lock:
+            if _registry is registry:
+                _registry = _load()
+            registry = _registry
+    return registry
+
+
+def invalidate() -> None:
+    global _registry
+    with _lock:
+        _registry = None
+
+
+# ========== TRA CỨU ==========
+def approval_status_id(name: str) -> Optional[int]:
+    return get_registry().id_of("approval_statuses", name)
+
+
+def post_status_id(name: str) -> Optional[int]:
+    return get_registry().id_of("post_statuses", name)
+
+
+def category_names() -> Dict[int, str]:
+    return get_registry().names("categories")
+
+
+def post_type_names() -> Dict[int, str]:
+    return get_registry().names("post_types")
+
+
+def bundle() -> Dict[str, Any]:
+    registry = get_registry()
+    return {"version": registry.version, **registry.bundle}
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=PostType)
+@receiver(post_save, sender=ApprovalStatus)
+@receiver(post_save, sender=PostStatus)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=PostType)
+@receiver(post_delete, sender=ApprovalStatus)
+@receiver(post_delete, sender=PostStatus)
+def _on_master_changed(sender, **kwargs):
+    invalidate()
@@ -0,0 +1,149 @@
+# listings/services/moderation.py
+
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from listings.models import Post, PostHistory
+from listings.services import masters, post_images, post_query
+from listings.signals import notify_post_changed
+
+ACTION_APPROVE = "approve"
+ACTION_REJECT = "reject"
+ACTION_HIDE = "hide"
+
+# action -> permission cần có (kiểm 1 lần cho cả lô)
+ACTION_PERMS = {
+    ACTION_APPROVE: "post.approve",
+    ACTION_REJECT: "post.reject",
+    ACTION_HIDE: "post.view_all",
+}
+
+
+class ModerationError(ValueError):
+    pass
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_MODERATION", {}) or {}
+
+
+def max_batch() -> int:
+    return int(_config().get("MAX_BATCH", 500))
+
+
+def target_statuses(action: str) -> Dict[str, int]:
+    """
+    action -> các cột trạng thái cần ghi (None = giữ nguyên):
+      approve: Approved + Published (hiện công khai ngay)
+      reject:  Rejected + Hidden
+      hide:    Hidden (giữ trạng thái duyệt)
+    """
+    if action == ACTION_APPROVE:
+        targets = {
+            "approval_status_id": masters.approval_status_id(masters.APPROVAL_APPROVED),
+            "post_status_id": masters.post_status_id(masters.POST_PUBLISHED),
+        }
+    elif action == ACTION_REJECT:
+        targets = {
+            "approval_status_id": masters.approval_status_id(masters.APPROVAL_REJECTED),
+            "post_status_id": masters.post_status_id(masters.POST_HIDDEN),
+        }
+    elif action == ACTION_HIDE:
+        targets = {"post_status_id": masters.post_status_id(masters.POST_HIDDEN)}
+    else:
+        raise ModerationError(f"action không hợp lệ: {action}")
+    if any(v is None for v in targets.values()):
+        raise ModerationError("Thiếu dữ liệu trạng thái (chạy seed_listings_masters)")
+    return targets
+
+
+# ========== HÀNG ĐỢI ==========
+def queue_page(
+    cursor: Optional[str],
+    page_size: int,
+    category_id: Optional[int] = None,
+    request=None,
+) -> Dict[str, Any]:
+    """
+    1 trang bài chờ duyệt (cũ nhất trước) kèm ảnh bìa và thông tin người đăng:
+    1 query bài + 1 query ảnh + 1 query user cho cả trang.
+    """
+    pending_id = masters.approval_status_id(masters.APPROVAL_PENDING)
+    items, next_cursor = post_query.moderation_queue_keyset(
+        pending_id, cursor, page_size, category_id=category_id
+    )
+    ids = [item["id"] for item in items]
+    covers = post_images.images_for_posts(ids, limit=1, request=request)
+    owners = {
+        u["id"]: u
+        for u in User.objects.filter(id__in={item["owner_id"] for item in items}).values(
+            "id", "username", "email", "so_dien_thoai", "da_xac_minh"
+        )
+    }
+    for item in items:
+        cover = covers.get(item["id"])
+        item["cover_image"] = cover[0] if cover else None
+        item["owner"] = owners.get(item["owner_id"])
+    return {"results": items, "next_cursor": next_cursor}
+
+
+# ========== DUYỆT THEO LÔ ==========
+def moderate(
+    post_ids: Iterable[str],
+    action: str,
+    actor_id: str,
+    reason: str = "",
+) -> Dict[str, Any]:
+    """
+    Đổi trạng thái tối đa max_batch() bài trong 1 transaction:
+    1 SELECT ... FOR UPDATE, 1 UPDATE, 1 bulk insert PostHistory,
+    1 post_changed("status"). Bài đã ở đúng trạng thái -> "unchanged".
+    """
+    ids = list(dict.fromkeys(str(pid) for pid in post_ids if pid))
+    if not ids:
+        raise ModerationError("post_ids rỗng")
+    if len(ids) > max_batch():
+        raise ModerationError(f"Tối đa {max_batch()} bài mỗi lần")
+    targets = target_statuses(action)
+    fields = list(targets)
+
+    with transaction.atomic():
+        rows = {
+            r["id"]: r
+            for r in Post.objects.select_for_update()
+            .filter(id__in=ids, is_deleted=False)
+            .values("id", *fields)
+        }
+        changed = [
+            pid for pid in ids
+            if pid in rows and any(rows[pid][f] != v for f, v in targets.items())
+        ]
+        if changed:
+            now = timezone.now()
+            Post.objects.filter(id__in=changed).update(**targets, updated_at=now)
+            PostHistory.objects.bulk_create(
+                [
+                    PostHistory(
+                        post_id=pid,
+                        actor_id=actor_id,
+                        old_content={f: rows[pid][f] for f in fields},
+                        new_content={**targets, "action": action, **({"reason": reason} if reason else {})},
+                        change_type="status_change",
+                        timestamp=now,
+                    )
+                    for pid in changed
+                ]
+            )
+            notify_post_changed(changed, "status")
+
+    return {
+        "ok": 1,
+        "action": action,
+        "updated": changed,
+        "unchanged": [pid for pid in ids if pid in rows and pid not in changed],
+        "not_found": [pid for pid in ids if pid not in rows],
+    }
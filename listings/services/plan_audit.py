@@ -0,0 +1,292 @@
+# listings/services/plan_audit.py
+
+import json
+import re
+from decimal import Decimal
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import Count
+
+from listings.models import Post
+from listings.services import admin_units, post_query
+
+POST_TABLE = "listings_post"
+POST_ALIAS = "p"
+
+# Cột có index riêng trên listings_post mà các query tìm kiếm nên dùng tới
+WATCHED_COLUMNS = (
+    "category_id",
+    "post_type_id",
+    "approval_status_id",
+    "post_status_id",
+    "created_at",
+    "bumped_at",
+    "district_code",
+    "ward_code",
+)
+
+# Nhóm filter bật/tắt trong ma trận (price_* / area_* luôn đi theo cặp)
+FILTER_GROUPS = {
+    "q": ("q",),
+    "category_id": ("category_id",),
+    "post_type_id": ("post_type_id",),
+    "price": ("price_min", "price_max"),
+    "area": ("area_min", "area_max"),
+    "province": ("province",),
+    "district": ("district",),
+    "ward": ("ward",),
+    "province_code": ("province_code",),
+    "district_code": ("district_code",),
+}
+
+_WORD_RE = re.compile(r"\w{3,}", re.UNICODE)
+_ANALYZE_ROWS_RE = re.compile(
+    r"actual time=[\d.]+\.\.([\d.]+) rows=([\d.]+) loops=(\d+)"
+)
+_ON_POST_RE = re.compile(rf" on {POST_ALIAS}\b")
+
+
+# ========== GIÁ TRỊ ĐẠI DIỆN ==========
+def _most_common(field: str):
+    row = (
+        Post.objects.filter(is_deleted=False)
+        .values(field)
+        .annotate(n=Count("id"))
+        .order_by("-n")
+        .first()
+    )
+    return row[field] if row else None
+
+
+def sample_values() -> Dict[str, Any]:
+    """
+    Giá trị filter "thật" lấy từ DB hiện tại: category / loại tin phổ biến nhất,
+    địa chỉ + khoảng giá / diện tích quanh 1 bài đang có, 1 từ trong tiêu đề.
+    """
+    sample = (
+        Post.objects.filter(is_deleted=False)
+        .order_by("-created_at")
+        .values("title", "address", "price", "area")
+        .first()
+    ) or {}
+    address = sample.get("address") if isinstance(sample.get("address"), dict) else {}
+    words = _WORD_RE.findall(sample.get("title") or "")
+    price = sample.get("price") or Decimal("1000000000")
+    area = sample.get("area") or 50.0
+
+    province_code, district_code, _ = admin_units.resolve(
+        address.get("province"), address.get("district")
+    )
+    return {
+        "q": max(words, key=len) if words else "nhà",
+        "category_id": _most_common("category_id") or 1,
+        "post_type_id": _most_common("post_type_id") or 1,
+        "price_min": float(price) * 0.5,
+        "price_max": float(price) * 1.5,
+        "area_min": float(area) * 0.5,
+        "area_max": float(area) * 1.5,
+        "province": address.get("province") or "Hồ Chí Minh",
+        "district": address.get("district") or "Quận 1",
+        "ward": address.get("ward") or "Phường 1",
+        "province_code": province_code or 79,
+        "district_code": district_code or 760,
+    }
+
+
+def filter_matrix(full: bool = False, max_on: int = 2) -> List[Tuple[str, ...]]:
+    """
+    Các tổ hợp nhóm filter được bật.
+    Mặc định: tất cả tắt, từng nhóm, từng cặp nhóm (+ tất cả bật).
+    full=True: đủ 2^10 tổ hợp.
+    """
+    groups = list(FILTER_GROUPS)
+    limit = len(groups) if full else max_on
+    combos: List[Tuple[str, ...]] = []
+    for size in range(0, limit + 1):
+        combos.extend(combinations(groups, size))
+    if not full:
+        combos.append(tuple(groups))
+    return combos
+
+
+def _filters_for(groups: Iterable[str], values: Dict[str, Any]) -> Dict[str, Any]:
+    filters = {key: None for g in FILTER_GROUPS.values() for key in g}
+    for group in groups:
+        for key in FILTER_GROUPS[group]:
+            filters[key] = values[key]
+    return filters
+
+
+# ========== PHÂN TÍCH EXPLAIN ==========
+def post_indexes() -> Dict[str, List[str]]:
+    """
+    Tên index trên listings_post -> danh sách cột.
+    """
+    with connection.cursor() as cur:
+        constraints = connection.introspection.get_constraints(cur, POST_TABLE)
+    return {
+        name: info["columns"]
+        for name, info in constraints.items()
+        if info.get("index") or info.get("primary_key")
+    }
+
+
+def _walk(node: Any, tables: List[Dict[str, Any]], flags: Dict[str, bool]) -> None:
+    if isinstance(node, dict):
+        if node.get("using_filesort"):
+            flags["filesort"] = True
+        if node.get("using_temporary_table"):
+            flags["temporary"] = True
+        table = node.get("table")
+        if isinstance(table, dict):
+            tables.append(table)
+        for value in node.values():
+            _walk(value, tables, flags)
+    elif isinstance(node, list):
+        for item in node:
+            _walk(item, tables, flags)
+
+
+def parse_explain_json(raw: str) -> Dict[str, Any]:
+    """
+    Rút gọn EXPLAIN FORMAT=JSON: cách truy cập listings_post (alias p),
+    index dùng, số dòng ước tính, có filesort / bảng tạm hay không.
+    """
+    plan = json.loads(raw)
+    tables: List[Dict[str, Any]] = []
+    flags = {"filesort": False, "temporary": False}
+    _walk(plan, tables, flags)
+
+    post = next(
+        (t for t in tables if t.get("table_name") in (POST_ALIAS, POST_TABLE)),
+        {},
+    )
+    return {
+        "access_type": post.get("access_type"),
+        "key": post.get("key"),
+        "possible_keys": post.get("possible_keys") or [],
+        "rows_examined_estimate": post.get("rows_examined_per_scan"),
+        "filtered_pct": _to_float(post.get("filtered")),
+        "using_filesort": flags["filesort"],
+        "using_temporary": flags["temporary"],
+    }
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_explain_analyze(text: str) -> Dict[str, Any]:
+    """
+    EXPLAIN ANALYZE (MySQL >= 8.0.18): thời gian thật + số dòng thật
+    đọc từ listings_post (cộng rows * loops của các node "... on p").
+    """
+    lines = text.splitlines()
+    total_ms = None
+    if lines:
+        m = _ANALYZE_ROWS_RE.search(lines[0])
+        if m:
+            total_ms = float(m.group(1))
+
+    examined = 0.0
+    for line in lines:
+        m = _ANALYZE_ROWS_RE.search(line)
+        if m and _ON_POST_RE.search(line):
+            examined += float(m.group(2)) * int(m.group(3))
+    return {"actual_ms": total_ms, "rows_examined_actual": int(examined)}
+
+
+def _explain(sql: str, params: List[Any], analyze: bool) -> Dict[str, Any]:
+    with connection.cursor() as cur:
+        cur.execute(f"EXPLAIN FORMAT=JSON {sql}", params)
+        result = parse_explain_json(cur.fetchone()[0])
+        if analyze:
+            cur.execute(f"EXPLAIN ANALYZE {sql}", params)
+            result.update(parse_explain_analyze(cur.fetchone()[0]))
+    return result
+
+
+def _problems(entry: Dict[str, Any], watched_keys: Dict[str, str]) -> List[str]:
+    problems = []
+    if entry["access_type"] == "ALL" or not entry["key"]:
+        problems.append("full_scan")
+    elif entry["key"] not in watched_keys and entry["key"] != "PRIMARY":
+        problems.append("unwatched_index")
+    if entry["using_filesort"]:
+        problems.append("filesort")
+    if entry["using_temporary"]:
+        problems.append("temporary")
+    return problems
+
+
+# ========== CHẠY AUDIT ==========
+def run_audit(
+    full: bool = False,
+    analyze: bool = False,
+    sorts: Optional[List[str]] = None,
+    values: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    EXPLAIN từng tổ hợp filter x sort x order cho query tìm kiếm (1 trang)
+    và query đếm. Kết quả sắp xếp ổn định để diff giữa các bản release.
+    """
+    if connection.vendor != "mysql":
+        raise RuntimeError("Audit EXPLAIN chỉ chạy trên MySQL")
+
+    values = values or sample_values()
+    sorts = sorts or list(post_query.SORT_COLUMNS)
+    indexes = post_indexes()
+    # index (1 cột) trên các cột cần theo dõi: tên index -> cột
+    watched_keys = {
+        name: cols[0]
+        for name, cols in indexes.items()
+        if cols and cols[0] in WATCHED_COLUMNS
+    }
+
+    entries: List[Dict[str, Any]] = []
+    for groups in filter_matrix(full=full):
+        filters = _filters_for(groups, values)
+        combo = "+".join(groups) or "none"
+
+        sql, params = post_query.count_sql(**filters)
+        entry = {"query": "count", "filters": combo, "sort": None, "order": None}
+        entry.update(_explain(sql, params, analyze))
+        entries.append(entry)
+
+        for sort in sorts:
+            for order in ("asc", "desc"):
+                sql, params = post_query.search_sql(
+                    sort=sort, order=order, **filters
+                )
+                entry = {"query": "search", "filters": combo, "sort": sort, "order": order}
+                entry.update(_explain(sql, params, analyze))
+                entries.append(entry)
+
+    used_keys = set()
+    for entry in entries:
+        entry["problems"] = _problems(entry, watched_keys)
+        if entry["key"]:
+            used_keys.add(entry["key"])
+
+    with connection.cursor() as cur:
+        cur.execute("SELECT VERSION()")
+        version = cur.fetchone()[0]
+
+    return {
+        "mysql_version": version,
+        "analyze": analyze,
+        "sample_values": {k: str(v) for k, v in sorted(values.items())},
+        "indexes": {name: indexes[name] for name in sorted(indexes)},
+        "unused_watched_indexes": sorted(
+            f"{name} ({col})"
+            for name, col in watched_keys.items()
+            if name not in used_keys
+        ),
+        "flagged": sum(1 for e in entries if e["problems"]),
+        "combinations": entries,
+    }
@@ -0,0 +1,146 @@
+# listings/services/post_attributes.py
+
+import re
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.dispatch import receiver
+
+from listings.models import Post, PostAttribute
+from listings.services.text_index import fold_vietnamese
+from listings.signals import post_changed
+
+# Các key có thể gặp trong Post.details (FE cũ / mới, tiếng Việt / Anh)
+BEDROOM_KEYS = ("bedrooms", "bedroom", "so_phong_ngu", "phong_ngu", "num_bedrooms")
+BATHROOM_KEYS = ("bathrooms", "bathroom", "so_phong_tam", "phong_tam", "toilets", "wc")
+DIRECTION_KEYS = ("direction", "huong", "huong_nha", "house_direction")
+LEGAL_KEYS = ("legal_status", "legal", "phap_ly", "giay_to")
+
+DIRECTIONS = {
+    "n": "N", "north": "N", "bac": "N",
+    "s": "S", "south": "S", "nam": "S",
+    "e": "E", "east": "E", "dong": "E",
+    "w": "W", "west": "W", "tay": "W",
+    "ne": "NE", "northeast": "NE", "dong bac": "NE",
+    "nw": "NW", "northwest": "NW", "tay bac": "NW",
+    "se": "SE", "southeast": "SE", "dong nam": "SE",
+    "sw": "SW", "southwest": "SW", "tay nam": "SW",
+}
+
+_INT_RE = re.compile(r"\d+")
+_ROW_FIELDS = ("id", "details", "price", "area")
+
+
+# ========== CHUẨN HOÁ ==========
+def _first(details: Dict[str, Any], keys) -> Any:
+    for key in keys:
+        if details.get(key) not in (None, ""):
+            return details[key]
+    return None
+
+
+def parse_count(value: Any) -> Optional[int]:
+    """
+    "3", 3, "3 PN", "3 phòng" -> 3. Giá trị vô lý (> 100) -> None.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = int(value)
+    else:
+        m = _INT_RE.search(str(value))
+        if not m:
+            return None
+        number = int(m.group(0))
+    return number if 0 <= number <= 100 else None
+
+
+def normalize_direction(value: Any) -> str:
+    """
+    "Đông Nam" / "dong-nam" / "south east" / "SE" -> "SE"; không nhận ra -> "".
+    """
+    if value in (None, ""):
+        return ""
+    text = fold_vietnamese(str(value))
+    text = " ".join(re.split(r"[\s\-_/]+", text.replace("huong", ""))).strip()
+    return DIRECTIONS.get(text) or DIRECTIONS.get(text.replace(" ", ""), "")
+
+
+def normalize_legal(value: Any) -> str:
+    if value in (None, ""):
+        return ""
+    return " ".join(fold_vietnamese(str(value)).split())[:64]
+
+
+def price_per_m2(price, area) -> Optional[Decimal]:
+    if price is None or not area:
+        return None
+    value = Decimal(price) / Decimal(str(area))
+    return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def extract(details: Any, price, area) -> Dict[str, Any]:
+    if not isinstance(details, dict):
+        details = {}
+    return {
+        "bedrooms": parse_count(_first(details, BEDROOM_KEYS)),
+        "bathrooms": parse_count(_first(details, BATHROOM_KEYS)),
+        "direction": normalize_direction(_first(details, DIRECTION_KEYS)),
+        "legal_status": normalize_legal(_first(details, LEGAL_KEYS)),
+        "price_per_m2": price_per_m2(price, area),
+    }
+
+
+def _build(rows: Iterable[Dict[str, Any]]) -> List[PostAttribute]:
+    return [
+        PostAttribute(post_id=r["id"], **extract(r["details"], r["price"], r["area"]))
+        for r in rows
+    ]
+
+
+# ========== ĐỒNG BỘ ==========
+@transaction.atomic
+def refresh_posts(post_ids: Iterable[str]) -> None:
+    ids = list(dict.fromkeys(str(pid) for pid in post_ids))
+    if not ids:
+        return
+    rows = Post.objects.filter(id__in=ids, is_deleted=False).values(*_ROW_FIELDS)
+    attrs = _build(rows)
+    PostAttribute.objects.filter(post_id__in=ids).delete()
+    if attrs:
+        PostAttribute.objects.bulk_create(attrs)
+
+
+def backfill(batch_size: int = 1000) -> int:
+    """
+    Tách lại thuộc tính cho mọi bài chưa xoá, theo lô id (mỗi lô 1 transaction).
+    """
+    written = 0
+    last_id = ""
+    while True:
+        rows = list(
+            Post.objects.filter(id__gt=last_id, is_deleted=False)
+            .order_by("id")
+            .values(*_ROW_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        attrs = _build(rows)
+        with transaction.atomic():
+            PostAttribute.objects.filter(post_id__in=[r["id"] for r in rows]).delete()
+            PostAttribute.objects.bulk_create(attrs)
+        written += len(attrs)
+
+    PostAttribute.objects.exclude(
+        post_id__in=Post.objects.filter(is_deleted=False).values("id")
+    ).delete()
+    return written
+
+
+@receiver(post_changed)
+def _on_post_changed(sender, post_ids, action, **kwargs):
+    # details / price / area chỉ đổi khi tạo / sửa; xoá mềm -> gỡ dòng
+    if action in ("create", "update", "delete"):
+        refresh_posts(post_ids)
@@ -0,0 +1,335 @@
+# listings/services/post_cards.py
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.dispatch import receiver
+
+from listings.models import Category, Post, PostCard, PostImage, PostType
+from listings.services import admin_units, post_images, post_query
+from listings.services.post_attributes import price_per_m2
+from listings.services.post_counters import is_public_row, public_status_ids
+from listings.signals import post_changed
+
+CARD_TABLE = PostCard._meta.db_table
+
+CARD_COLUMNS = [
+    "id",
+    "title",
+    "price",
+    "area",
+    "price_per_m2",
+    "category_id",
+    "category_name",
+    "post_type_id",
+    "post_type_name",
+    "province",
+    "district",
+    "ward",
+    "province_code",
+    "district_code",
+    "ward_code",
+    "cover_image_url",
+    "cover_variants",
+    "cover_blurhash",
+    "image_count",
+    "owner_id",
+    "created_at",
+    "bumped_at",
+]
+
+_ROW_FIELDS = (
+    "id",
+    "title",
+    "price",
+    "area",
+    "address",
+    "category_id",
+    "post_type_id",
+    "owner_id",
+    "is_deleted",
+    "approval_status_id",
+    "post_status_id",
+    "created_at",
+    "bumped_at",
+)
+
+
+# ========== BUILD CARD ==========
+def _addr(address: Any, key: str) -> str:
+    if not isinstance(address, dict):
+        return ""
+    return str(address.get(key) or "")[:191]
+
+
+def _build_cards(rows: List[Dict[str, Any]]) -> List[PostCard]:
+    """
+    Card cho các bài public trong `rows` (dict từ .values(_ROW_FIELDS)).
+    Tên category / loại tin, ảnh bìa, số ảnh lấy theo lô.
+    """
+    approved_id, published_id = public_status_ids()
+    rows = [r for r in rows if is_public_row(r, approved_id, published_id)]
+    if not rows:
+        return []
+
+    ids = [r["id"] for r in rows]
+    category_names = dict(
+        Category.objects.filter(id__in={r["category_id"] for r in rows})
+        .values_list("id", "name")
+    )
+    post_type_names = dict(
+        PostType.objects.filter(id__in={r["post_type_id"] for r in rows})
+        .values_list("id", "name")
+    )
+    image_counts = dict(
+        PostImage.objects.filter(post_id__in=ids, status=PostImage.STATUS_READY)
+        .values("post_id")
+        .annotate(n=Count("id"))
+        .values_list("post_id", "n")
+    )
+    # URL lưu theo storage (không gắn host của request)
+    covers = post_images.images_for_posts(ids, limit=1)
+
+    cards = []
+    for r in rows:
+        cover = covers.get(r["id"])
+        address = r.get("address")
+        cards.append(
+            PostCard(
+                id=r["id"],
+                title=r["title"],
+                price=r["price"],
+                area=r["area"],
+                price_per_m2=price_per_m2(r["price"], r["area"]),
+                category_id=r["category_id"],
+                category_name=category_names.get(r["category_id"], ""),
+                post_type_id=r["post_type_id"],
+                post_type_name=post_type_names.get(r["post_type_id"], ""),
+                province=_addr(address, "province"),
+                district=_addr(address, "district"),
+                ward=_addr(address, "ward"),
+                # tính lại từ address (không phụ thuộc thứ tự receiver ghi Post.*_code)
+                **admin_units.address_codes(address),
+                cover_image_url=(cover[0]["image_url"] or "") if cover else "",
+                cover_variants=cover[0]["variants"] if cover else {},
+                cover_blurhash=cover[0]["blurhash"] if cover else "",
+                image_count=image_counts.get(r["id"], 0),
+                owner_id=r["owner_id"],
+                created_at=r["created_at"],
+                bumped_at=r["bumped_at"],
+            )
+        )
+    return cards
+
+
+# ========== ĐỒNG BỘ ==========
+@transaction.atomic
+def refresh_posts(post_ids: Iterable[str]) -> None:
+    """
+    Dựng lại card của các bài; bài không còn public -> xoá card.
+    """
+    ids = list(dict.fromkeys(str(pid) for pid in post_ids))
+    if not ids:
+        return
+    rows = list(Post.objects.filter(id__in=ids).values(*_ROW_FIELDS))
+    cards = _build_cards(rows)
+    PostCard.objects.filter(id__in=ids).delete()
+    if cards:
+        PostCard.objects.bulk_create(cards)
+
+
+def rebuild_all(batch_size: int = 500) -> int:
+    """
+    Dựng lại toàn bộ card theo từng lô id (mỗi lô 1 transaction),
+    không giữ cả bảng trong bộ nhớ, endpoint vẫn đọc được trong lúc chạy.
+    Trả số card đã ghi.
+    """
+    written = 0
+    last_id = ""
+    while True:
+        rows = list(
+            Post.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values(*_ROW_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        ids = [r["id"] for r in rows]
+        cards = _build_cards(rows)
+        with transaction.atomic():
+            PostCard.objects.filter(id__in=ids).delete()
+            PostCard.objects.bulk_create(cards)
+        written += len(cards)
+
+    # card của bài đã bị xoá cứng khỏi listings_post
+    PostCard.objects.exclude(id__in=Post.objects.values("id")).delete()
+    return written
+
+
+@receiver(post_changed)
+def _on_post_changed(sender, post_ids, action, **kwargs):
+    refresh_posts(post_ids)
+
+
+# ========== ĐỌC ==========
+def _card_filters(
+    q: Optional[str] = None,
+    category_id: Optional[int] = None,
+    post_type_id: Optional[int] = None,
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+    area_min: Optional[float] = None,
+    area_max: Optional[float] = None,
+    province: Optional[str] = None,
+    district: Optional[str] = None,
+    ward: Optional[str] = None,
+    province_code: Optional[int] = None,
+    district_code: Optional[int] = None,
+    ward_code: Optional[int] = None,
+) -> Tuple[List[str], List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    if q:
+        clauses.append("p.title LIKE %s")
+        params.append(f"%{q}%")
+    for col, op, val in (
+        ("category_id", "=", category_id),
+        ("post_type_id", "=", post_type_id),
+        ("price", ">=", price_min),
+        ("price", "<=", price_max),
+        ("area", ">=", area_min),
+        ("area", "<=", area_max),
+        ("province_code", "=", province_code),
+        ("district_code", "=", district_code),
+        ("ward_code", "=", ward_code),
+    ):
+        if val is not None:
+            clauses.append(f"p.{col} {op} %s")
+            params.append(val)
+    for col, val in (("province", province), ("district", district), ("ward", ward)):
+        if val:
+            clauses.append(f"p.{col} = %s")
+            params.append(val)
+    return clauses, params
+
+
+def _page(
+    where: List[str],
+    params: List[Any],
+    sort: str,
+    order: str,
+    page: int,
+    page_size: int,
+) -> Tuple[List[Dict[str, Any]], int]:
+    page = max(page or 1, 1)
+    page_size = max(1, min(page_size or 20, post_query.MAX_PAGE_SIZE))
+    col = post_query.SORT_COLUMNS[sort][0]
+    direction = "ASC" if order == "asc" else "DESC"
+    where_sql = " AND ".join(where) or "1 = 1"
+
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT {post_query.select_sql(CARD_COLUMNS)}, COUNT(*) OVER()"
+            f" FROM {CARD_TABLE} p WHERE {where_sql}"
+            f" ORDER BY {col} {direction}, p.id {direction}"
+            " LIMIT %s OFFSET %s",
+            params + [page_size, (page - 1) * page_size],
+        )
+        rows = cur.fetchall()
+        if rows:
+            total = int(rows[0][-1])
+        elif page > 1:
+            cur.execute(f"SELECT COUNT(*) FROM {CARD_TABLE} p WHERE {where_sql}", params)
+            total = int(cur.fetchone()[0])
+        else:
+            total = 0
+
+    n = len(CARD_COLUMNS)
+    return [post_query.row_to_json(r[:n], CARD_COLUMNS) for r in rows], total
+
+
+def search_page(
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+    **filters,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Trang card + tổng trong 1 query trên listings_postcard.
+    """
+    sort, order = post_query.normalize_sort(sort, order, post_query.DEFAULT_SORT)
+    where, params = _card_filters(**filters)
+    return _page(where, params, sort, order, page, page_size)
+
+
+def search_keyset(
+    cursor: Optional[str],
+    page_size: int,
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    **filters,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    sort, order = post_query.normalize_sort(sort, order, post_query.DEFAULT_SORT)
+    where, params = _card_filters(**filters)
+    return post_query.keyset_page(
+        where, params, sort, order, cursor, page_size,
+        table=CARD_TABLE, columns=CARD_COLUMNS,
+    )
+
+
+def owner_page(owner_id: str, page: int, page_size: int) -> Tuple[List[Dict[str, Any]], int]:
+    return _page(
+        ["p.owner_id = %s"], [owner_id],
+        post_query.DEFAULT_OWNER_SORT, "desc", page, page_size,
+    )
+
+
+def owner_keyset(
+    owner_id: str, cursor: Optional[str], page_size: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    return post_query.keyset_page(
+        ["p.owner_id = %s"], [owner_id],
+        post_query.DEFAULT_OWNER_SORT, "desc", cursor, page_size,
+        table=CARD_TABLE, columns=CARD_COLUMNS,
+    )
+
+
+def fetch_by_ids(post_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Card của các id (giữ thứ tự đầu vào), dùng cho kết quả của text index.
+    """
+    if not post_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(post_ids))
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT {post_query.select_sql(CARD_COLUMNS)} FROM {CARD_TABLE} p"
+            f" WHERE p.id IN ({placeholders})",
+            list(post_ids),
+        )
+        cards = {r[0]: post_query.row_to_json(r, CARD_COLUMNS) for r in cur.fetchall()}
+    return [cards[pid] for pid in post_ids if pid in cards]
+
+
+def absolutize(cards: List[Dict[str, Any]], request) -> List[Dict[str, Any]]:
+    """
+    cover_image_url / url của cover_variants tương đối (storage local)
+    -> gắn scheme://host của request.
+    """
+    base = post_images.absolute_base(request)
+
+    def _abs(url):
+        if not url:
+            return None
+        if base and not url.startswith("http"):
+            return f"{base}{url}" if url.startswith("/") else f"{base}/{url}"
+        return url
+
+    for card in cards:
+        card["cover_image_url"] = _abs(card.get("cover_image_url"))
+        for variant in (card.get("cover_variants") or {}).values():
+            variant["url"] = _abs(variant.get("url"))
+    return cards
@@ -0,0 +1,354 @@
+# listings/services/post_counters.py
+
+from collections import Counter
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.dispatch import receiver
+
+from listings.models import Post, PostCounter, PostCounterLedger
+from listings.services import masters
+from listings.signals import post_changed
+
+SCOPE_ALL = "*"
+FACET_TOTAL = "total"
+
+FACET_CATEGORY = "category"
+FACET_POST_TYPE = "post_type"
+FACET_PROVINCE = "province"
+FACET_DISTRICT = "district"
+FACET_PRICE_BAND = "price_band"
+FACET_APPROVAL_STATUS = "approval_status"
+FACET_POST_STATUS = "post_status"
+
+# Các filter "rộng" được tính sẵn bộ đếm: mỗi bài đóng góp vào mọi tổ hợp con
+# của 3 chiều này (2^3 = 8 scope).
+SCOPE_DIMS = ("province", "category_id", "post_type_id")
+# Tìm kiếm tra được mã tỉnh (admin_units) thì filter chỉ còn province_code
+# (tên bị bỏ) -> tỉnh còn được đếm theo mã, thay cho chiều "province"
+# (chỉ total, facet vẫn theo tên).
+PROVINCE_CODE_DIM = "province_code"
+
+# facet -> chiều filter của chính nó (bị bỏ khỏi scope khi đếm facet đó,
+# để người dùng thấy số lượng của các lựa chọn khác cùng nhóm).
+FACET_DIMS = {
+    FACET_CATEGORY: "category_id",
+    FACET_POST_TYPE: "post_type_id",
+    FACET_PROVINCE: "province",
+    FACET_DISTRICT: "district",
+    FACET_PRICE_BAND: None,
+}
+
+# Khoảng giá (VND), cận dưới tính, cận trên không tính.
+PRICE_BANDS = (
+    ("lt-500m", None, 500_000_000),
+    ("500m-1b", 500_000_000, 1_000_000_000),
+    ("1b-3b", 1_000_000_000, 3_000_000_000),
+    ("3b-5b", 3_000_000_000, 5_000_000_000),
+    ("5b-10b", 5_000_000_000, 10_000_000_000),
+    ("gte-10b", 10_000_000_000, None),
+)
+
+CounterKey = Tuple[str, str, str]
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """
+    Chuẩn hoá chuỗi địa chỉ để làm key bộ đếm: bỏ khoảng trắng thừa + casefold.
+    """
+    if value is None:
+        return ""
+    return " ".join(str(value).split()).casefold()
+
+
+def scope_key(**dims) -> str:
+    """
+    Ghép các filter rộng thành 1 key ổn định, ví dụ
+    "category_id=2|province=hồ chí minh". Không có filter nào -> "*".
+    """
+    parts = [f"{k}={v}" for k, v in sorted(dims.items()) if v not in (None, "")]
+    return "|".join(parts) if parts else SCOPE_ALL
+
+
+def price_band(price) -> str:
+    if price is None:
+        return ""
+    price = float(price)
+    for key, low, high in PRICE_BANDS:
+        if (low is None or price >= low) and (high is None or price < high):
+            return key
+    return ""
+
+
+def public_status_ids() -> Tuple[Optional[int], Optional[int]]:
+    return (
+        masters.approval_status_id(masters.APPROVAL_APPROVED),
+        masters.post_status_id(masters.POST_PUBLISHED),
+    )
+
+
+def is_public_row(row: Dict[str, Any], approved_id, published_id) -> bool:
+    return (
+        not row.get("is_deleted")
+        and row.get("approval_status_id") == approved_id
+        and row.get("post_status_id") == published_id
+    )
+
+
+def counter_keys(row: Dict[str, Any], approved_id, published_id) -> List[CounterKey]:
+    """
+    Danh sách key mà 1 bài (dạng dict từ .values()) đang đóng góp +1.
+    - Mọi bài chưa xoá: đếm theo approval_status / post_status (scope "*").
+    - Bài public (Approved + Published): total + các facet trên mọi scope
+      tổ hợp từ SCOPE_DIMS.
+    """
+    if row.get("is_deleted"):
+        return []
+
+    keys: List[CounterKey] = []
+    for facet, field in (
+        (FACET_APPROVAL_STATUS, "approval_status_id"),
+        (FACET_POST_STATUS, "post_status_id"),
+    ):
+        if row.get(field) is not None:
+            keys.append((SCOPE_ALL, facet, str(row[field])))
+
+    if not is_public_row(row, approved_id, published_id):
+        return keys
+
+    address = row.get("address")
+    if not isinstance(address, dict):
+        address = {}
+
+    dims = {
+        "province": normalize_text(address.get("province")),
+        "category_id": row.get("category_id"),
+        "post_type_id": row.get("post_type_id"),
+    }
+    values = {
+        FACET_CATEGORY: row.get("category_id"),
+        FACET_POST_TYPE: row.get("post_type_id"),
+        FACET_PROVINCE: dims["province"],
+        FACET_DISTRICT: normalize_text(address.get("district")),
+        FACET_PRICE_BAND: price_band(row.get("price")),
+    }
+
+    for size in range(len(SCOPE_DIMS) + 1):
+        for subset in combinations(SCOPE_DIMS, size):
+            if any(dims[d] in (None, "") for d in subset):
+                continue
+            scope = scope_key(**{d: dims[d] for d in subset})
+            keys.append((scope, FACET_TOTAL, ""))
+            for facet, dim in FACET_DIMS.items():
+                if dim in subset or values[facet] in (None, ""):
+                    continue
+                # quận/huyện chỉ có nghĩa khi đã chọn tỉnh/thành
+                if facet == FACET_DISTRICT and "province" not in subset:
+                    continue
+                keys.append((scope, facet, str(values[facet])))
+
+    if row.get("province_code") is not None:
+        rest = [d for d in SCOPE_DIMS if d != "province"]
+        for size in range(len(rest) + 1):
+            for subset in combinations(rest, size):
+                if any(dims[d] in (None, "") for d in subset):
+                    continue
+                scope = scope_key(
+                    **{d: dims[d] for d in subset}, **{PROVINCE_CODE_DIM: row["province_code"]}
+                )
+                keys.append((scope, FACET_TOTAL, ""))
+    return keys
+
+
+_ROW_FIELDS = (
+    "id",
+    "is_deleted",
+    "approval_status_id",
+    "post_status_id",
+    "address",
+    "province_code",
+    "category_id",
+    "post_type_id",
+    "price",
+)
+
+
+def _apply_deltas(deltas: Dict[CounterKey, int]) -> None:
+    """
+    Cộng dồn delta vào bảng bộ đếm trong 1 câu INSERT ... ON DUPLICATE KEY UPDATE.
+    """
+    rows = [(k, d) for k, d in deltas.items() if d]
+    if not rows:
+        return
+
+    table = PostCounter._meta.db_table
+    placeholders = ", ".join(["(%s, %s, %s, %s, NOW(6))"] * len(rows))
+    params: List[Any] = []
+    for (scope, facet, value), delta in rows:
+        params.extend([scope, facet, value, delta])
+
+    sql = (
+        f"INSERT INTO {table} (scope, facet, value, count, updated_at) "
+        f"VALUES {placeholders} "
+        "ON DUPLICATE KEY UPDATE count = count + VALUES(count), updated_at = NOW(6)"
+    )
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+
+
+@transaction.atomic
+def refresh_posts(post_ids: Iterable[str]) -> None:
+    """
+    Tính lại phần đóng góp của các bài vào bộ đếm (so với ledger đã lưu)
+    và cộng/trừ chênh lệch.
+    """
+    ids = list(dict.fromkeys(str(pid) for pid in post_ids))
+    if not ids:
+        return
+
+    approved_id, published_id = public_status_ids()
+
+    rows = {
+        r["id"]: r
+        for r in Post.objects.filter(id__in=ids).values(*_ROW_FIELDS)
+    }
+    ledgers = {
+        l.post_id: l
+        for l in PostCounterLedger.objects.select_for_update().filter(post_id__in=ids)
+    }
+
+    deltas: Counter = Counter()
+    to_create, to_update, to_delete = [], [], []
+
+    for pid in ids:
+        row = rows.get(pid)
+        new_keys = set(counter_keys(row, approved_id, published_id)) if row else set()
+        ledger = ledgers.get(pid)
+        old_keys = {tuple(k) for k in ledger.keys} if ledger else set()
+
+        for k in new_keys - old_keys:
+            deltas[k] += 1
+        for k in old_keys - new_keys:
+            deltas[k] -= 1
+
+        if new_keys == old_keys:
+            continue
+        if not new_keys:
+            to_delete.append(pid)
+        elif ledger:
+            ledger.keys = sorted(new_keys)
+            to_update.append(ledger)
+        else:
+            to_create.append(PostCounterLedger(post_id=pid, keys=sorted(new_keys)))
+
+    if to_create:
+        PostCounterLedger.objects.bulk_create(to_create)
+    if to_update:
+        PostCounterLedger.objects.bulk_update(to_update, ["keys"])
+    if to_delete:
+        PostCounterLedger.objects.filter(post_id__in=to_delete).delete()
+
+    _apply_deltas(deltas)
+
+
+@transaction.atomic
+def rebuild_all(batch_size: int = 1000) -> int:
+    """
+    Đếm lại toàn bộ từ đầu (dùng cho lần khởi tạo / khi nghi ngờ lệch số).
+    Trả về số bài public đã đếm.
+    """
+    approved_id, published_id = public_status_ids()
+
+    PostCounter.objects.all().delete()
+    PostCounterLedger.objects.all().delete()
+
+    totals: Counter = Counter()
+    ledgers: List[PostCounterLedger] = []
+    counted = 0
+
+    qs = Post.objects.values(*_ROW_FIELDS).order_by()
+    for row in qs.iterator(chunk_size=batch_size):
+        keys = counter_keys(row, approved_id, published_id)
+        if not keys:
+            continue
+        if (SCOPE_ALL, FACET_TOTAL, "") in keys:
+            counted += 1
+        totals.update(keys)
+        ledgers.append(PostCounterLedger(post_id=row["id"], keys=sorted(keys)))
+        if len(ledgers) >= batch_size:
+            PostCounterLedger.objects.bulk_create(ledgers)
+            ledgers = []
+
+    if ledgers:
+        PostCounterLedger.objects.bulk_create(ledgers)
+
+    PostCounter.objects.bulk_create(
+        [
+            PostCounter(scope=scope, facet=facet, value=value, count=count)
+            for (scope, facet, value), count in totals.items()
+        ],
+        batch_size=batch_size,
+    )
+    return counted
+
+
+def get_count(scope: str, facet: str = FACET_TOTAL, value: str = "") -> int:
+    count = (
+        PostCounter.objects.filter(scope=scope, facet=facet, value=value)
+        .values_list("count", flat=True)
+        .first()
+    )
+    return max(int(count or 0), 0)
+
+
+def get_facet_counts(scope: str, facet: str) -> Dict[str, int]:
+    return {
+        value: count
+        for value, count in PostCounter.objects.filter(
+            scope=scope, facet=facet, count__gt=0
+        ).values_list("value", "count")
+    }
+
+
+def counter_scope(filters: Dict[str, Any], exclude: Optional[str] = None) -> Optional[str]:
+    """
+    Scope tương ứng với bộ filter, bỏ chiều `exclude`.
+    Trả None nếu có filter ngoài SCOPE_DIMS / province_code (q, giá, diện tích,
+    quận, phường) -> không có bộ đếm sẵn, caller phải đếm thật.
+    """
+    allowed = set(SCOPE_DIMS) | {PROVINCE_CODE_DIM}
+    for key, val in filters.items():
+        if key not in allowed and key != exclude and val not in (None, ""):
+            return None
+    code = filters.get(PROVINCE_CODE_DIM)
+    if code is not None and exclude != "province":
+        if filters.get("province") not in (None, ""):
+            return None  # cả tên lẫn mã -> không có scope tương ứng
+        dims = {d: filters.get(d) for d in SCOPE_DIMS if d not in ("province", exclude)}
+        return scope_key(**dims, **{PROVINCE_CODE_DIM: code})
+    dims = {
+        d: normalize_text(filters.get(d)) if d == "province" else filters.get(d)
+        for d in SCOPE_DIMS
+        if d != exclude
+    }
+    return scope_key(**dims)
+
+
+def estimate_total(**filters) -> Optional[int]:
+    """
+    Tổng gần đúng lấy từ bộ đếm cho các filter "rộng"
+    (không q, chỉ province | province_code / category_id / post_type_id).
+    Trả None nếu bộ filter không có bộ đếm tương ứng -> caller phải đếm thật;
+    bộ đếm = 0 cũng trả None (scope chưa dựng, vd. trước khi chạy
+    rebuild_post_counters; đếm thật tập rỗng thì rẻ).
+    """
+    scope = counter_scope(filters)
+    if scope is None:
+        return None
+    return get_count(scope) or None
+
+
+@receiver(post_changed)
+def _on_post_changed(sender, post_ids, action, **kwargs):
+    refresh_posts(post_ids)
@@ -0,0 +1,161 @@
+# listings/services/post_facets.py
+
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from django.db import connection
+
+from listings.services import masters, post_counters
+from listings.services.post_counters import (
+    FACET_APPROVAL_STATUS,
+    FACET_CATEGORY,
+    FACET_DISTRICT,
+    FACET_DIMS,
+    FACET_POST_STATUS,
+    FACET_POST_TYPE,
+    FACET_PRICE_BAND,
+    FACET_PROVINCE,
+    PRICE_BANDS,
+    SCOPE_ALL,
+)
+from listings.services.post_query import PUBLIC_SQL, build_filters
+
+# facet -> biểu thức GROUP BY khi phải đếm trực tiếp trên listings_post
+_LIVE_GROUP_SQL = {
+    FACET_CATEGORY: "p.category_id",
+    FACET_POST_TYPE: "p.post_type_id",
+    FACET_PROVINCE: "JSON_UNQUOTE(JSON_EXTRACT(p.address, '$.province'))",
+    FACET_DISTRICT: "JSON_UNQUOTE(JSON_EXTRACT(p.address, '$.district'))",
+    FACET_PRICE_BAND: "p.price",
+}
+
+
+def _visible_facets(filters: Dict[str, Any]) -> List[str]:
+    # quận/huyện chỉ trả khi đã chọn tỉnh/thành
+    return [
+        facet
+        for facet in FACET_DIMS
+        if facet != FACET_DISTRICT or filters.get("province")
+    ]
+
+
+# ========== ĐẾM TỪ BỘ ĐẾM ==========
+def _from_counters(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    total_scope = post_counters.counter_scope(filters)
+    if total_scope is None:
+        return None
+
+    facets = {}
+    for facet in _visible_facets(filters):
+        scope = post_counters.counter_scope(filters, exclude=FACET_DIMS[facet])
+        facets[facet] = post_counters.get_facet_counts(scope, facet)
+
+    return {
+        "total": post_counters.get_count(total_scope),
+        "facets": facets,
+    }
+
+
+# ========== ĐẾM TRỰC TIẾP (filter hẹp) ==========
+def _live_counts(filters: Dict[str, Any], facet: str) -> Dict[str, int]:
+    own_dim = FACET_DIMS[facet]
+    clauses, params = build_filters(
+        **{k: v for k, v in filters.items() if k != own_dim}
+    )
+    expr = _LIVE_GROUP_SQL[facet]
+    sql = (
+        f"SELECT {expr}, COUNT(*) FROM listings_post p"
+        f" WHERE {' AND '.join([PUBLIC_SQL] + clauses)}"
+        f" GROUP BY {expr}"
+    )
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+
+    counts: Counter = Counter()
+    for value, count in rows:
+        if facet == FACET_PRICE_BAND:
+            value = post_counters.price_band(value)
+        elif facet in (FACET_PROVINCE, FACET_DISTRICT):
+            value = post_counters.normalize_text(value)
+        if value not in (None, ""):
+            counts[str(value)] += count
+    return dict(counts)
+
+
+def _live(filters: Dict[str, Any]) -> Dict[str, Any]:
+    clauses, params = build_filters(**filters)
+    sql = (
+        "SELECT COUNT(*) FROM listings_post p"
+        f" WHERE {' AND '.join([PUBLIC_SQL] + clauses)}"
+    )
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        total = cur.fetchone()[0]
+
+    return {
+        "total": int(total or 0),
+        "facets": {f: _live_counts(filters, f) for f in _visible_facets(filters)},
+    }
+
+
+# ========== FORMAT ==========
+def _labelled(counts: Dict[str, int], names: Dict[int, str]) -> List[Dict[str, Any]]:
+    return [
+        {"id": int(v), "name": names.get(int(v)), "count": c}
+        for v, c in sorted(counts.items(), key=lambda kv: (-kv[1], int(kv[0])))
+    ]
+
+
+def _format(facet: str, counts: Dict[str, int]) -> List[Dict[str, Any]]:
+    if facet == FACET_CATEGORY:
+        return _labelled(counts, masters.category_names())
+    if facet == FACET_POST_TYPE:
+        return _labelled(counts, masters.post_type_names())
+    if facet == FACET_PRICE_BAND:
+        # giữ thứ tự khoảng giá, kể cả khoảng = 0
+        return [
+            {"key": key, "min": low, "max": high, "count": counts.get(key, 0)}
+            for key, low, high in PRICE_BANDS
+        ]
+    return [
+        {"value": v, "count": c}
+        for v, c in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    ]
+
+
+def status_counts() -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Số bài (chưa xoá) theo trạng thái duyệt / trạng thái hiển thị – cho admin.
+    """
+    return {
+        FACET_APPROVAL_STATUS: _labelled(
+            post_counters.get_facet_counts(SCOPE_ALL, FACET_APPROVAL_STATUS),
+            masters.get_registry().names("approval_statuses"),
+        ),
+        FACET_POST_STATUS: _labelled(
+            post_counters.get_facet_counts(SCOPE_ALL, FACET_POST_STATUS),
+            masters.get_registry().names("post_statuses"),
+        ),
+    }
+
+
+def facet_counts(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Số bài public theo từng facet cho bộ filter hiện tại.
+    Mỗi facet được đếm với bộ filter đã bỏ filter của chính nó
+    (chọn category=2 vẫn thấy số lượng của các category khác).
+    Filter rộng -> đọc bộ đếm sẵn; có q / giá / diện tích / quận / phường
+    -> GROUP BY trực tiếp (tập kết quả đã hẹp).
+    """
+    data = _from_counters(filters)
+    source = "counters"
+    if data is None:
+        data = _live(filters)
+        source = "live"
+
+    return {
+        "total": data["total"],
+        "source": source,
+        "facets": {f: _format(f, c) for f, c in data["facets"].items()},
+    }
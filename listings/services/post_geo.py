@@ -0,0 +1,148 @@
+# listings/services/post_geo.py
+
+import math
+from typing import Any, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.dispatch import receiver
+
+from listings.models import Post, PostGeo
+from listings.signals import post_changed
+
+EARTH_RADIUS_KM = 6371.0
+
+# Cạnh ô lưới (độ). 0.01° ~ 1.1 km -> bán kính 2 km chỉ chạm ~5 dải ô.
+CELL_DEG = 0.01
+_LNG_CELLS = int(round(360 / CELL_DEG)) + 1
+
+# Khung quá rộng (zoom xa) -> quá nhiều dải ô, lọc thẳng theo index (lat, lng).
+MAX_CELL_ROWS = 64
+
+MAX_RADIUS_KM = 50.0
+DEFAULT_RADIUS_KM = 2.0
+
+BBox = Tuple[float, float, float, float]  # (min_lat, min_lng, max_lat, max_lng)
+
+
+# ========== TOẠ ĐỘ / Ô LƯỚI ==========
+def parse_point(location: Any) -> Optional[Tuple[float, float]]:
+    """
+    Lấy (lat, lng) từ Post.location; sai định dạng / ngoài phạm vi -> None.
+    """
+    if not isinstance(location, dict):
+        return None
+    lat = location.get("lat")
+    lng = location.get("lng", location.get("lon"))
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    if math.isnan(lat) or math.isnan(lng):
+        return None
+    return lat, lng
+
+
+def _cell_row(lat: float) -> int:
+    return int(math.floor((lat + 90) / CELL_DEG))
+
+
+def _cell_col(lng: float) -> int:
+    return int(math.floor((lng + 180) / CELL_DEG))
+
+
+def cell_of(lat: float, lng: float) -> int:
+    return _cell_row(lat) * _LNG_CELLS + _cell_col(lng)
+
+
+def bbox_around(lat: float, lng: float, radius_km: float) -> BBox:
+    """
+    Khung bao hình tròn bán kính radius_km (hơi rộng hơn, lọc lại bằng khoảng cách).
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return (
+        max(lat - dlat, -90.0),
+        max(lng - dlng, -180.0),
+        min(lat + dlat, 90.0),
+        min(lng + dlng, 180.0),
+    )
+
+
+def cell_ranges(bbox: BBox) -> Optional[List[Tuple[int, int]]]:
+    """
+    Các khoảng mã ô (cell BETWEEN lo AND hi) phủ khung, mỗi dải vĩ độ 1 khoảng.
+    None nếu khung phủ quá nhiều dải (caller lọc theo lat/lng).
+    """
+    min_lat, min_lng, max_lat, max_lng = bbox
+    row_lo, row_hi = _cell_row(min_lat), _cell_row(max_lat)
+    if row_hi - row_lo + 1 > MAX_CELL_ROWS:
+        return None
+    col_lo, col_hi = _cell_col(min_lng), _cell_col(max_lng)
+    return [
+        (row * _LNG_CELLS + col_lo, row * _LNG_CELLS + col_hi)
+        for row in range(row_lo, row_hi + 1)
+    ]
+
+
+# ========== DUY TRÌ INDEX ==========
+def _geo_row(post_id: str, location: Any) -> Optional[PostGeo]:
+    point = parse_point(location)
+    if point is None:
+        return None
+    lat, lng = point
+    return PostGeo(post_id=post_id, lat=lat, lng=lng, cell=cell_of(lat, lng))
+
+
+@transaction.atomic
+def refresh_posts(post_ids: Iterable[str]) -> None:
+    """
+    Đồng bộ PostGeo theo Post.location của các bài.
+    Bài đã xoá / không có toạ độ hợp lệ -> gỡ khỏi index.
+    (Lọc public làm lúc truy vấn bằng JOIN với listings_post.)
+    """
+    ids = list(dict.fromkeys(str(pid) for pid in post_ids))
+    if not ids:
+        return
+
+    rows = Post.objects.filter(id__in=ids, is_deleted=False).values_list(
+        "id", "location"
+    )
+    geos = [g for g in (_geo_row(pid, loc) for pid, loc in rows) if g is not None]
+
+    PostGeo.objects.filter(post_id__in=ids).delete()
+    if geos:
+        PostGeo.objects.bulk_create(geos)
+
+
+@transaction.atomic
+def rebuild_all(batch_size: int = 2000) -> int:
+    PostGeo.objects.all().delete()
+
+    indexed = 0
+    batch: List[PostGeo] = []
+    qs = Post.objects.filter(is_deleted=False).values_list("id", "location").order_by()
+    for pid, location in qs.iterator(chunk_size=batch_size):
+        geo = _geo_row(pid, location)
+        if geo is None:
+            continue
+        batch.append(geo)
+        if len(batch) >= batch_size:
+            PostGeo.objects.bulk_create(batch)
+            indexed += len(batch)
+            batch = []
+
+    if batch:
+        PostGeo.objects.bulk_create(batch)
+        indexed += len(batch)
+    return indexed
+
+
+@receiver(post_changed)
+def _on_post_changed(sender, post_ids, action, **kwargs):
+    if action in ("images", "bump"):
+        return
+    refresh_posts(post_ids)
+
@@ -0,0 +1,341 @@
+# listings/services/post_history.py
+
+import base64
+import binascii
+import gzip
+import hashlib
+import json
+import os
+from datetime import date, datetime, time as dt_time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from listings.models import PostHistory, PostHistoryArchive
+from listings.services.buffered_writer import BufferedBulkWriter
+from listings.services.post_query import InvalidCursor
+
+CHANGE_BUMP = "bump"
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_HISTORY_BUFFER", {}) or {}
+
+
+def _archive_config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_HISTORY_ARCHIVE", {}) or {}
+
+
+history_writer = BufferedBulkWriter(
+    PostHistory,
+    max_batch=int(_config().get("MAX_BATCH", 500)),
+    flush_interval=float(_config().get("FLUSH_INTERVAL", 5)),
+)
+
+
+def record_change(
+    post_id: str,
+    actor_id: str,
+    old_content: Dict[str, Any],
+    new_content: Dict[str, Any],
+    change_type: str = "update",
+    buffered: bool = False,
+) -> None:
+    """
+    Ghi 1 dòng PostHistory (diff dạng JSON).
+    buffered=True (thay đổi tần suất cao như bump): chỉ đưa vào buffer
+    sau khi transaction commit, thread nền ghi theo lô.
+    """
+    entry = PostHistory(
+        post_id=post_id,
+        actor_id=actor_id,
+        old_content=old_content,
+        new_content=new_content,
+        change_type=change_type,
+    )
+    if buffered and _config().get("ENABLED", True):
+        # timestamp (default=now) đã gán lúc tạo object, không phải lúc flush
+        transaction.on_commit(lambda: history_writer.add(entry))
+    else:
+        entry.save()
+
+
+# ========== ĐỌC LỊCH SỬ 1 BÀI ==========
+def _encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        timestamp = parse_datetime(value)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor("cursor không hợp lệ")
+    if timestamp is None or not isinstance(row_id, int):
+        raise InvalidCursor("cursor không hợp lệ")
+    return timestamp, row_id
+
+
+def history_page(post_id: str, cursor: Optional[str], page_size: int = 20) -> Dict[str, Any]:
+    """
+    Lịch sử 1 bài, mới nhất trước, phân trang keyset (timestamp, id) trên index
+    (post, timestamp) -> trang sau nhanh như trang đầu. Kèm mốc lưu trữ gần nhất:
+    lịch sử cũ hơn mốc đó nằm trong file lưu trữ, không còn trong bảng.
+    """
+    page_size = max(1, min(int(page_size or 20), 100))
+    qs = PostHistory.objects.filter(post_id=post_id)
+    if cursor:
+        timestamp, row_id = _decode_cursor(cursor)
+        qs = qs.filter(timestamp__lte=timestamp).exclude(timestamp=timestamp, id__gte=row_id)
+    rows = list(
+        qs.order_by("-timestamp", "-id").values(
+            "id", "actor_id", "change_type", "old_content", "new_content", "timestamp"
+        )[: page_size + 1]
+    )
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    archived = PostHistoryArchive.objects.order_by("-before").values_list("before", flat=True).first()
+    return {
+        "results": rows,
+        "next_cursor": _encode_cursor(rows[-1]["timestamp"], rows[-1]["id"]) if has_more else None,
+        "archived_before": archived,
+    }
+
+
+# ========== GOM BUMP LIÊN TIẾP ==========
+def _bump_runs(rows: List[Tuple[int, str, str]]) -> List[List[int]]:
+    """
+    rows: (id, post_id, change_type) đã sắp theo (post_id, timestamp, id).
+    Trả các chuỗi >= 2 dòng bump liên tiếp của cùng 1 bài (list id).
+    """
+    runs: List[List[int]] = []
+    current: List[int] = []
+    current_post = None
+    for row_id, post_id, change_type in rows:
+        if change_type != CHANGE_BUMP or post_id != current_post:
+            if len(current) > 1:
+                runs.append(current)
+            current = []
+        current_post = post_id
+        if change_type == CHANGE_BUMP:
+            current.append(row_id)
+    if len(current) > 1:
+        runs.append(current)
+    return runs
+
+
+def _collapse(runs: List[List[int]]) -> int:
+    """
+    Mỗi chuỗi giữ lại dòng bump cuối: old_content của dòng đầu, new_content của
+    dòng cuối + bump_count (tổng, tính cả dòng đã gom trước đó) + first_bumped_at.
+    1 query đọc nội dung, 1 bulk_update, 1 DELETE cho cả nhóm. Trả số dòng đã xoá.
+    """
+    ends = {row_id for run in runs for row_id in (run[0], run[-1])}
+    content = {
+        r["id"]: r
+        for r in PostHistory.objects.filter(id__in=ends).values(
+            "id", "old_content", "new_content", "timestamp"
+        )
+    }
+    counts = {
+        r["id"]: (r["new_content"] or {}).get("bump_count", 1)
+        for r in PostHistory.objects.filter(id__in=[i for run in runs for i in run[1:-1]]).values(
+            "id", "new_content"
+        )
+    }
+    keepers: List[PostHistory] = []
+    doomed: List[int] = []
+    for run in runs:
+        first, last = content[run[0]], content[run[-1]]
+        first_new = first["new_content"] or {}
+        total = (
+            first_new.get("bump_count", 1)
+            + sum(counts.get(i, 1) for i in run[1:-1])
+            + (last["new_content"] or {}).get("bump_count", 1)
+        )
+        keepers.append(
+            PostHistory(
+                id=run[-1],
+                old_content=first["old_content"],
+                new_content={
+                    **(last["new_content"] or {}),
+                    "bump_count": total,
+                    "first_bumped_at": first_new.get("first_bumped_at")
+                    or first["timestamp"].isoformat(),
+                },
+            )
+        )
+        doomed.extend(run[:-1])
+    with transaction.atomic():
+        PostHistory.objects.bulk_update(keepers, ["old_content", "new_content"])
+        PostHistory.objects.filter(id__in=doomed).delete()
+    return len(doomed)
+
+
+def compact_bumps(
+    before: datetime,
+    since: Optional[datetime] = None,
+    post_batch: int = 500,
+) -> Dict[str, int]:
+    """
+    Gom các dòng bump liên tiếp (không xen thay đổi khác) của mỗi bài thành 1 dòng,
+    chỉ xét dòng cũ hơn `before` (không đụng bản ghi buffer vừa ghi).
+    Duyệt theo lô `post_batch` bài (keyset theo post_id), mỗi lô 1 query đọc
+    (id, post_id, change_type) trên index (post, timestamp).
+    """
+    stats = {"posts": 0, "runs": 0, "deleted": 0}
+    window = PostHistory.objects.filter(timestamp__lt=before)
+    if since is not None:
+        window = window.filter(timestamp__gte=since)
+    last_post = ""
+    while True:
+        post_ids = list(
+            window.filter(change_type=CHANGE_BUMP, post_id__gt=last_post)
+            .order_by("post_id")
+            .values_list("post_id", flat=True)
+            .distinct()[:post_batch]
+        )
+        if not post_ids:
+            break
+        last_post = post_ids[-1]
+        rows = list(
+            window.filter(post_id__in=post_ids)
+            .order_by("post_id", "timestamp", "id")
+            .values_list("id", "post_id", "change_type")
+        )
+        runs = _bump_runs(rows)
+        stats["posts"] += len(post_ids)
+        if runs:
+            stats["runs"] += len(runs)
+            stats["deleted"] += _collapse(runs)
+    return stats
+
+
+# ========== LƯU TRỮ (HOT / COLD) ==========
+def keep_months() -> int:
+    return int(_archive_config().get("MONTHS", 6))
+
+
+def archive_dir() -> Path:
+    default = Path(settings.BASE_DIR) / "var" / "history_archive"
+    return Path(_archive_config().get("DIR") or default)
+
+
+def cutoff_for(months: int, today: Optional[date] = None) -> datetime:
+    """
+    Đầu tháng (theo TIME_ZONE) của `months` tháng trước: giữ nguyên các tháng gần nhất.
+    """
+    today = today or timezone.localdate()
+    month_index = today.year * 12 + (today.month - 1) - max(0, int(months))
+    first = date(month_index // 12, month_index % 12 + 1, 1)
+    return timezone.make_aware(datetime.combine(first, dt_time.min))
+
+
+def _iter_old_rows(before: datetime, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    """
+    Đọc lần lượt các dòng cũ hơn `before` theo lô keyset trên id: mỗi lô 1 query
+    ngắn, bộ nhớ chỉ giữ 1 lô (driver MySQL đọc hết kết quả 1 query vào bộ nhớ,
+    nên không dựa vào 1 cursor dài).
+    """
+    last_id = 0
+    while True:
+        chunk = list(
+            PostHistory.objects.filter(timestamp__lt=before, id__gt=last_id)
+            .order_by("id")
+            .values("id", "post_id", "actor_id", "change_type", "old_content", "new_content", "timestamp")[
+                :chunk_size
+            ]
+        )
+        if not chunk:
+            return
+        yield from chunk
+        last_id = chunk[-1]["id"]
+
+
+def archive_before(
+    before: datetime,
+    chunk_size: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Ghi các dòng PostHistory cũ hơn `before` ra 1 file JSONL gzip (ghi xong,
+    fsync, đổi tên file tạm -> file thật), lưu 1 dòng PostHistoryArchive, rồi mới
+    xoá các dòng đó theo lô `chunk_size` (mỗi lô 1 transaction ngắn, không khoá
+    bảng lâu). dry_run: chỉ đếm.
+    """
+    chunk_size = max(1, int(chunk_size or _archive_config().get("CHUNK_SIZE", 5000)))
+    if dry_run:
+        return {"rows": PostHistory.objects.filter(timestamp__lt=before).count(), "dry_run": True}
+
+    directory = archive_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.localtime().strftime("%Y%m%d%H%M%S")
+    path = directory / f"post_history_before_{timezone.localtime(before):%Y%m%d}_{stamp}.jsonl.gz"
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    rows = 0
+    max_id = 0
+    first_ts = last_ts = None
+    encoder = DjangoJSONEncoder()
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as gz:
+            for row in _iter_old_rows(before, chunk_size):
+                gz.write(encoder.encode(row).encode("utf-8") + b"\n")
+                rows += 1
+                max_id = max(max_id, row["id"])
+                ts = row["timestamp"]
+                first_ts = ts if first_ts is None or ts < first_ts else first_ts
+                last_ts = ts if last_ts is None or ts > last_ts else last_ts
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    if not rows:
+        tmp_path.unlink()
+        return {"rows": 0, "deleted": 0, "path": None}
+
+    os.replace(tmp_path, path)
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    PostHistoryArchive.objects.create(
+        path=str(path),
+        before=before,
+        first_timestamp=first_ts,
+        last_timestamp=last_ts,
+        rows=rows,
+        size_bytes=path.stat().st_size,
+        sha256=digest.hexdigest(),
+    )
+
+    # chỉ xoá đúng phần đã ghi ra file (id <= max_id đã đọc)
+    deleted = 0
+    while True:
+        ids = list(
+            PostHistory.objects.filter(timestamp__lt=before, id__lte=max_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            deleted += PostHistory.objects.filter(id__in=ids).delete()[0]
+    return {"rows": rows, "deleted": deleted, "path": str(path)}
+
+
+def read_archive(path: str, post_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Đọc lại 1 file lưu trữ (tuỳ chọn lọc theo bài), từng dòng một.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            row = json.loads(line)
+            if post_id is None or row.get("post_id") == post_id:
+                yield row
@@ -0,0 +1,150 @@
+# listings/services/post_images.py
+
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.core.files.storage import default_storage
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from rest_framework import serializers
+
+from listings.models import PostImage
+
+# Tên file "an toàn" (không cần quote trong URL) -> ghép thẳng vào template.
+_SAFE_NAME_RE = re.compile(r"^[A-Za-z0-9/_.\-]+$")
+_PROBES = ("posts/__url_probe_a__.jpg", "posts/__url_probe_b__.jpg")
+
+_lock = threading.Lock()
+_template: Optional[Tuple[str, str]] = None
+_template_ready = False
+
+# Cùng format created_at với PostImageSerializer
+_created_at_field = serializers.DateTimeField()
+
+
+def _probe_template() -> Optional[Tuple[str, str]]:
+    """
+    Dò URL của storage 1 lần: url(name) == prefix + name + suffix ?
+    Storage nào không theo quy luật này (đổi đuôi file, ký url...) -> None,
+    khi đó mỗi name sẽ gọi storage.url() (vẫn có cache theo name).
+    """
+    try:
+        urls = [default_storage.url(name) for name in _PROBES]
+    except Exception:
+        return None
+    idx = urls[0].find(_PROBES[0])
+    if idx < 0:
+        return None
+    prefix, suffix = urls[0][:idx], urls[0][idx + len(_PROBES[0]):]
+    if urls[1] != f"{prefix}{_PROBES[1]}{suffix}":
+        return None
+    return prefix, suffix
+
+
+def _get_template() -> Optional[Tuple[str, str]]:
+    global _template, _template_ready
+    if not _template_ready:
+        with _lock:
+            if not _template_ready:
+                _template = _probe_template()
+                _template_ready = True
+    return _template
+
+
+@lru_cache(maxsize=4096)
+def _storage_url(name: str) -> str:
+    return default_storage.url(name)
+
+
+def image_url(name: Optional[str], absolute_base: Optional[str] = None) -> Optional[str]:
+    """
+    URL của 1 file ảnh theo name lưu trong PostImage.image.
+    URL tương đối (local: /media/...) -> ghép absolute_base (scheme://host).
+    """
+    if not name:
+        return None
+    template = _get_template()
+    if template is not None and _SAFE_NAME_RE.match(name):
+        url = f"{template[0]}{name}{template[1]}"
+    else:
+        url = _storage_url(name)
+
+    if absolute_base and url and not url.startswith("http"):
+        return f"{absolute_base}{url}" if url.startswith("/") else f"{absolute_base}/{url}"
+    return url
+
+
+def variant_urls(variants: Any, base: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    PostImage.variants -> {"thumb": {"url", "width", "height"}, ...}
+    (client ghép srcset: "<url> <width>w"). Chưa sinh derivative -> {}.
+    """
+    if not isinstance(variants, dict):
+        return {}
+    return {
+        name: {
+            "url": image_url(data.get("name"), base),
+            "width": data.get("width"),
+            "height": data.get("height"),
+        }
+        for name, data in variants.items()
+        if isinstance(data, dict) and data.get("name")
+    }
+
+
+def absolute_base(request) -> Optional[str]:
+    if request is None:
+        return None
+    return request.build_absolute_uri("/").rstrip("/")
+
+
+def images_for_posts(
+    post_ids: Iterable[str],
+    limit: Optional[int] = None,
+    request=None,
+    base: Optional[str] = None,
+) -> Dict[str, List[dict]]:
+    """
+    post_id -> [{"id", "image_url", "variants", "width", "height", "blurhash",
+    "status", "created_at"}, ...] (cũ trước mới sau),
+    cùng shape với PostImageSerializer nhưng chỉ 1 query values_list và
+    không khởi tạo serializer / gọi storage cho từng ảnh.
+    limit=N -> mỗi bài chỉ lấy N ảnh đầu (ROW_NUMBER() theo post_id).
+    base: gốc URL tuyệt đối có sẵn (thay cho request, vd. khi chạy ở thread nền).
+    """
+    ids = list(dict.fromkeys(str(pid) for pid in post_ids if pid))
+    if not ids:
+        return {}
+
+    # chỉ ảnh đã upload xong (pending / failed chưa có URL)
+    qs = PostImage.objects.filter(post_id__in=ids, status=PostImage.STATUS_READY)
+    if limit is not None and limit > 0:
+        qs = qs.annotate(
+            rn=Window(
+                RowNumber(),
+                partition_by=[F("post_id")],
+                order_by=[F("created_at").asc(), F("id").asc()],
+            )
+        ).filter(rn__lte=limit)
+    rows = qs.order_by("post_id", "created_at", "id").values_list(
+        "id", "post_id", "image", "variants", "width", "height", "blurhash", "created_at"
+    )
+
+    base = base or absolute_base(request)
+    result: Dict[str, List[dict]] = {}
+    for image_id, post_id, name, variants, width, height, blurhash, created_at in rows:
+        result.setdefault(str(post_id), []).append(
+            {
+                "id": image_id,
+                "image_url": image_url(name, base),
+                "variants": variant_urls(variants, base),
+                "width": width,
+                "height": height,
+                "blurhash": blurhash,
+                "status": PostImage.STATUS_READY,
+                "created_at": _created_at_field.to_representation(created_at),
+            }
+        )
+    return result
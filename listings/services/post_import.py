@@ -0,0 +1,235 @@
+# listings/services/post_import.py
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from accounts.services.id_allocator import allocate_ids
+from listings.models import Post
+from listings.serializers import PostCreateUpdateSerializer
+from listings.services import admin_units, masters, quotas
+from listings.signals import notify_post_changed
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+JSON_FIELDS = ("address", "location", "details", "other_info")
+# trường JSON phải là object (other_info được phép null)
+_OBJECT_FIELDS = ("address", "location", "details")
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_IMPORT", {}) or {}
+
+
+def batch_size() -> int:
+    return int(_config().get("BATCH_SIZE", 500))
+
+
+def detect_format(filename: str) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return FORMAT_CSV
+    if name.endswith((".jsonl", ".ndjson")):
+        return FORMAT_JSONL
+    return None
+
+
+# ========== ĐỌC FILE (STREAM) ==========
+def _text_stream(stream) -> io.TextIOBase:
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    # utf-8-sig: bỏ BOM của file CSV xuất từ Excel
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def _nest_csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cột CSV: trường JSON ghi dạng chuỗi JSON ("address") hoặc tách cột
+    theo dấu chấm ("address.province", "details.bedrooms").
+    """
+    out: Dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None:
+            continue  # dư cột so với header
+        key = key.strip()
+        if value is None or value == "":
+            continue
+        if "." in key:
+            parent, child = key.split(".", 1)
+            nested = out.setdefault(parent, {})
+            if isinstance(nested, dict):
+                nested[child] = value
+            continue
+        if key in JSON_FIELDS:
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass  # để serializer / kiểm tra object báo lỗi
+        out[key] = value
+    return out
+
+
+def iter_rows(stream, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    (số dòng, dữ liệu thô) cho từng bản ghi, đọc lần lượt (không nạp cả file).
+    Dòng JSONL hỏng -> dữ liệu là ValueError để báo lỗi đúng dòng.
+    """
+    text = _text_stream(stream)
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, _nest_csv_row(row)
+    elif fmt == FORMAT_JSONL:
+        for line_no, line in enumerate(text, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, ValueError(f"JSON không hợp lệ: {e}")
+    else:
+        raise ValueError(f"Định dạng không hỗ trợ: {fmt}")
+
+
+# ========== KIỂM TRA ==========
+def validate_row(
+    raw: Any, serializer: Optional[PostCreateUpdateSerializer] = None
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Kiểm tra 1 bản ghi như khi tạo bài qua API (PostCreateUpdateSerializer)
+    + danh mục tồn tại, diện tích > 0, giá >= 0. Trả (data, None) hoặc (None, lỗi).
+    Truyền sẵn `serializer` để dùng lại cho nhiều dòng (khởi tạo field của
+    serializer là deepcopy, tốn hơn cả việc kiểm tra).
+    """
+    if isinstance(raw, Exception):
+        return None, {"row": [str(raw)]}
+    if not isinstance(raw, dict):
+        return None, {"row": ["Mỗi bản ghi phải là 1 object"]}
+
+    serializer = serializer or PostCreateUpdateSerializer()
+    try:
+        data = dict(serializer.run_validation(raw))
+    except serializers.ValidationError as e:
+        return None, e.detail
+
+    errors: Dict[str, List[str]] = {}
+    for field in _OBJECT_FIELDS:
+        if not isinstance(data.get(field), dict):
+            errors.setdefault(field, []).append("Phải là JSON object")
+    if data.get("other_info") is not None and not isinstance(data["other_info"], dict):
+        errors.setdefault("other_info", []).append("Phải là JSON object hoặc null")
+    if data["area"] < 0.01:
+        errors.setdefault("area", []).append("Diện tích phải > 0")
+    if data["price"] < 0:
+        errors.setdefault("price", []).append("Giá phải >= 0")
+    if data["category_id"] not in masters.category_names():
+        errors.setdefault("category_id", []).append("Category không tồn tại")
+    if data["post_type_id"] not in masters.post_type_names():
+        errors.setdefault("post_type_id", []).append("Loại tin không tồn tại")
+    if errors:
+        return None, errors
+    return data, None
+
+
+# ========== IMPORT ==========
+class PostImporter:
+    """
+    Import bài đăng theo lô cho 1 người đăng:
+      - mỗi lô `batch_size` dòng hợp lệ = 1 transaction, 1 lần cấp id,
+        1 bulk_create, 1 post_changed("create");
+      - hạn mức bài / ngày (quota engine, chung với tạo bài qua API) trừ 1 lần cho cả lô;
+      - run() yield kết quả từng dòng ngay khi xử lý xong -> bộ nhớ chỉ giữ 1 lô.
+    """
+
+    def __init__(self, owner_id: str, is_agent_flag, batch_size_: Optional[int] = None, dry_run: bool = False):
+        self.owner_id = str(owner_id)
+        self.is_agent_flag = 1 if is_agent_flag else 0
+        self.batch_size = max(1, int(batch_size_ or batch_size()))
+        self.dry_run = dry_run
+        self.limits = quotas.limits_for_user(self.owner_id, self.is_agent_flag)
+        self.limit = self.limits[quotas.KIND_POST]
+        self.stats = {"total": 0, "created": 0, "invalid": 0, "quota_exceeded": 0}
+        self._serializer = PostCreateUpdateSerializer()
+
+    def run(self, rows: Iterable[Tuple[int, Any]]) -> Iterator[Dict[str, Any]]:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        for line_no, raw in rows:
+            self.stats["total"] += 1
+            data, errors = validate_row(raw, self._serializer)
+            if errors:
+                self.stats["invalid"] += 1
+                yield {"row": line_no, "status": "invalid", "errors": errors}
+                continue
+            batch.append((line_no, data))
+            if len(batch) >= self.batch_size:
+                yield from self._flush(batch)
+                batch = []
+        if batch:
+            yield from self._flush(batch)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"summary": dict(self.stats), "dry_run": self.dry_run}
+
+    def _grant(self, wanted: int) -> int:
+        if self.dry_run:
+            # chạy thử: chỉ xem còn bao nhiêu, không trừ hạn mức
+            left = quotas.remaining(quotas.KIND_POST, self.limits, user_id=self.owner_id)
+            return min(wanted, max(0, left - self.stats["created"]))
+        return quotas.consume_upto(quotas.KIND_POST, wanted, self.owner_id, self.limits)
+
+    def _flush(self, batch: List[Tuple[int, Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        with transaction.atomic():
+            # backend db: hạn mức trừ trong transaction của lô -> lỗi insert thì trả lại
+            granted = self._grant(len(batch))
+            accepted, rejected = batch[:granted], batch[granted:]
+
+            ids = allocate_ids(Post, len(accepted)) if accepted and not self.dry_run else []
+            if ids:
+                approval_id = masters.approval_status_id(masters.APPROVAL_PENDING)
+                post_status_id = masters.post_status_id(masters.POST_HIDDEN)
+                Post.objects.bulk_create(
+                    [
+                        Post(
+                            id=post_id,
+                            owner_id=self.owner_id,
+                            title=data["title"],
+                            description=data["description"],
+                            address=data["address"],
+                            location=data["location"],
+                            details=data["details"],
+                            other_info=data.get("other_info"),
+                            area=data["area"],
+                            price=data["price"],
+                            post_type_id=data["post_type_id"],
+                            category_id=data["category_id"],
+                            approval_status_id=approval_id,
+                            post_status_id=post_status_id,
+                            **admin_units.address_codes(data["address"]),
+                        )
+                        for post_id, (_, data) in zip(ids, accepted)
+                    ],
+                    batch_size=self.batch_size,
+                )
+                notify_post_changed(ids, "create")
+
+        self.stats["created"] += len(accepted)
+        self.stats["quota_exceeded"] += len(rejected)
+        for i, (line_no, _) in enumerate(accepted):
+            result = {"row": line_no, "status": "valid" if self.dry_run else "created"}
+            if ids:
+                result["id"] = ids[i]
+            yield result
+        for line_no, _ in rejected:
+            yield {
+                "row": line_no,
+                "status": "quota_exceeded",
+                "errors": {"quota": [f"Vượt hạn mức {self.limit} bài / ngày"]},
+            }
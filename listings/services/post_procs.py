@@ -1,10 +1,12 @@
 # listings/services/post_procs.py
 
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from django.db import connection
 
+from listings.signals import notify_post_changed
+
 
 def _fetch_all_json(cursor) -> List[Dict[str, Any]]:
     rows = cursor.fetchall()
@@ -20,6 +22,21 @@ def _fetch_all_json(cursor) -> List[Dict[str, Any]]:
     return results
 
 
+def _fetch_result_sets(cursor) -> List[List[Dict[str, Any]]]:
+    """
+    Đọc lần lượt TẤT CẢ result set của 1 lần CALL (SP có nhiều SELECT).
+    Mỗi result set được parse như _fetch_all_json.
+    Result set "trạng thái" cuối cùng của CALL (không có cột) bị bỏ qua.
+    """
+    result_sets: List[List[Dict[str, Any]]] = []
+    while True:
+        if cursor.description is not None:
+            result_sets.append(_fetch_all_json(cursor))
+        if not cursor.nextset():
+            break
+    return result_sets
+
+
 def _fetch_one_json(cursor) -> Optional[Dict[str, Any]]:
     row = cursor.fetchone()
     if not row:
@@ -30,6 +47,17 @@ def _fetch_one_json(cursor) -> Optional[Dict[str, Any]]:
     return val
 
 
+def _notify_if_ok(post_id: Optional[str], result: Any, action: str) -> None:
+    """
+    SP ghi thành công (không trả ok=0 / error) -> báo cho các service nghe post_changed.
+    """
+    if not post_id or not isinstance(result, dict):
+        return
+    if result.get("ok") == 0 or result.get("error"):
+        return
+    notify_post_changed([post_id], action)
+
+
 # ========== CREATE ==========
 def sp_post_create(
     actor_id: str,
@@ -68,7 +96,10 @@ def sp_post_create(
                 category_id,
             ],
         )
-        return _fetch_one_json(cur)
+        result = _fetch_one_json(cur)
+
+    _notify_if_ok(result.get("id") if isinstance(result, dict) else None, result, "create")
+    return result
 
 
 # ========== GET DETAIL ==========
@@ -113,7 +144,10 @@ def sp_post_update(
                 category_id,
             ],
         )
-        return _fetch_one_json(cur)
+        result = _fetch_one_json(cur)
+
+    _notify_if_ok(post_id, result, "update")
+    return result
 
 
 # ========== CHANGE STATUS ==========
@@ -135,7 +169,10 @@ def sp_post_change_status(
                 post_status_id,
             ],
         )
-        return _fetch_one_json(cur)
+        result = _fetch_one_json(cur)
+
+    _notify_if_ok(post_id, result, "status")
+    return result
 
 
 # ========== SOFT DELETE ==========
@@ -153,7 +190,10 @@ def sp_post_soft_delete(
                 1 if is_admin else 0,
             ],
         )
-        return _fetch_one_json(cur)
+        result = _fetch_one_json(cur)
+
+    _notify_if_ok(post_id, result, "delete")
+    return result
 
 
 # ========== SEARCH + COUNT ==========
@@ -230,6 +270,58 @@ def sp_posts_count(
         return int(data.get("total", 0))
 
 
+def sp_posts_search_page(
+    q: Optional[str],
+    category_id: Optional[int],
+    post_type_id: Optional[int],
+    price_min: Optional[float],
+    price_max: Optional[float],
+    area_min: Optional[float],
+    area_max: Optional[float],
+    province: Optional[str],
+    district: Optional[str],
+    ward: Optional[str],
+    sort: Optional[str],
+    order: Optional[str],
+    page: Optional[int],
+    page_size: Optional[int],
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Trang kết quả + tổng số bài trong 1 lần gọi DB.
+    SP sp_posts_search_page trả 2 result set:
+        1) các dòng JSON của trang (giống sp_posts_search)
+        2) 1 dòng {"total": n} (giống sp_posts_count)
+    """
+    with connection.cursor() as cur:
+        cur.callproc(
+            "sp_posts_search_page",
+            [
+                q,
+                category_id,
+                post_type_id,
+                price_min,
+                price_max,
+                area_min,
+                area_max,
+                province,
+                district,
+                ward,
+                sort,
+                order,
+                page,
+                page_size,
+            ],
+        )
+        result_sets = _fetch_result_sets(cur)
+
+    items = result_sets[0] if result_sets else []
+    total = 0
+    if len(result_sets) > 1 and result_sets[1]:
+        total_row = result_sets[1][0] or {}
+        total = int(total_row.get("total", 0))
+    return items, total
+
+
 def sp_posts_by_owner(
     owner_id: str,
     only_public: int = 1,
@@ -0,0 +1,590 @@
+# listings/services/post_query.py
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import connection
+from django.utils.dateparse import parse_datetime
+
+from listings.services import post_geo
+
+# Các cột trả về cho mỗi bài – cùng shape với JSON_OBJECT của các SP search.
+POST_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "address",
+    "location",
+    "details",
+    "other_info",
+    "area",
+    "price",
+    "post_type_id",
+    "category_id",
+    "owner_id",
+    "approval_status_id",
+    "post_status_id",
+    "created_at",
+    "updated_at",
+    "bumped_at",
+]
+_JSON_COLUMNS = {"address", "location", "details", "other_info", "cover_variants"}
+
+# sort param -> (cột SQL, kiểu giá trị, có NULL hay không)
+SORT_COLUMNS = {
+    "bumped_at": ("p.bumped_at", "datetime", True),
+    "created_at": ("p.created_at", "datetime", False),
+    "price": ("p.price", "decimal", False),
+    "area": ("p.area", "float", False),
+}
+DEFAULT_SORT = "bumped_at"
+DEFAULT_OWNER_SORT = "created_at"
+MAX_PAGE_SIZE = 100
+
+PUBLIC_SQL = (
+    "p.is_deleted = 0"
+    " AND p.approval_status_id = ("
+    "SELECT id FROM listings_approvalstatus WHERE name = 'Approved')"
+    " AND p.post_status_id = ("
+    "SELECT id FROM listings_poststatus WHERE name = 'Published')"
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# ========== ROW -> JSON ==========
+def _json_value(col: str, val: Any) -> Any:
+    if val is None:
+        return None
+    if col in _JSON_COLUMNS and isinstance(val, (str, bytes)):
+        return json.loads(val)
+    if isinstance(val, Decimal):
+        return float(val)
+    if isinstance(val, datetime):
+        return val.isoformat()
+    return val
+
+
+def row_to_json(row, columns: List[str] = POST_COLUMNS) -> Dict[str, Any]:
+    return {col: _json_value(col, val) for col, val in zip(columns, row)}
+
+
+def select_sql(columns: List[str] = POST_COLUMNS) -> str:
+    return ", ".join(f"p.{col}" for col in columns)
+
+
+def fetch_by_ids(post_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Lấy đủ dữ liệu cho 1 trang id (đã được xếp hạng ở nơi khác),
+    giữ nguyên thứ tự đầu vào.
+    """
+    if not post_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(post_ids))
+    sql = f"SELECT {select_sql()} FROM listings_post p WHERE p.id IN ({placeholders})"
+    with connection.cursor() as cur:
+        cur.execute(sql, list(post_ids))
+        rows = {r[0]: row_to_json(r) for r in cur.fetchall()}
+    return [rows[pid] for pid in post_ids if pid in rows]
+
+
+# ========== WHERE BUILDER ==========
+def build_filters(
+    q: Optional[str] = None,
+    category_id: Optional[int] = None,
+    post_type_id: Optional[int] = None,
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+    area_min: Optional[float] = None,
+    area_max: Optional[float] = None,
+    province: Optional[str] = None,
+    district: Optional[str] = None,
+    ward: Optional[str] = None,
+    province_code: Optional[int] = None,
+    district_code: Optional[int] = None,
+    ward_code: Optional[int] = None,
+) -> Tuple[List[str], List[Any]]:
+    """
+    Chỉ sinh điều kiện cho những filter có giá trị
+    (không dùng kiểu (p IS NULL OR col = p) như SP).
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+
+    if q:
+        like = f"%{q}%"
+        clauses.append("(p.title LIKE %s OR p.description LIKE %s)")
+        params.extend([like, like])
+    if category_id is not None:
+        clauses.append("p.category_id = %s")
+        params.append(category_id)
+    if post_type_id is not None:
+        clauses.append("p.post_type_id = %s")
+        params.append(post_type_id)
+    if price_min is not None:
+        clauses.append("p.price >= %s")
+        params.append(price_min)
+    if price_max is not None:
+        clauses.append("p.price <= %s")
+        params.append(price_max)
+    if area_min is not None:
+        clauses.append("p.area >= %s")
+        params.append(area_min)
+    if area_max is not None:
+        clauses.append("p.area <= %s")
+        params.append(area_max)
+    for key, val in (("province", province), ("district", district), ("ward", ward)):
+        if val:
+            clauses.append(
+                f"JSON_UNQUOTE(JSON_EXTRACT(p.address, '$.{key}')) = %s"
+            )
+            params.append(val)
+    # mã đơn vị hành chính (admin_units): so sánh số nguyên, có index
+    for key, val in (
+        ("province_code", province_code),
+        ("district_code", district_code),
+        ("ward_code", ward_code),
+    ):
+        if val is not None:
+            clauses.append(f"p.{key} = %s")
+            params.append(val)
+
+    return clauses, params
+
+
+def search_sql(
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    **filters,
+) -> Tuple[str, List[Any]]:
+    """
+    SQL 1 trang tìm kiếm bài public theo OFFSET – tương đương sp_posts_search
+    (dùng cho audit EXPLAIN).
+    """
+    sort, order = normalize_sort(sort, order, DEFAULT_SORT)
+    clauses, params = build_filters(**filters)
+    col = SORT_COLUMNS[sort][0]
+    direction = "ASC" if order == "asc" else "DESC"
+    sql = (
+        f"SELECT {select_sql()} FROM listings_post p"
+        f" WHERE {' AND '.join([PUBLIC_SQL] + clauses)}"
+        f" ORDER BY {col} {direction}, p.id {direction}"
+        " LIMIT %s OFFSET %s"
+    )
+    return sql, params + [limit, offset]
+
+
+def count_sql(**filters) -> Tuple[str, List[Any]]:
+    """
+    SQL đếm bài public theo filter – tương đương sp_posts_count.
+    """
+    clauses, params = build_filters(**filters)
+    sql = (
+        "SELECT COUNT(*) FROM listings_post p"
+        f" WHERE {' AND '.join([PUBLIC_SQL] + clauses)}"
+    )
+    return sql, params
+
+
+# ========== CURSOR ==========
+def _dump_sort_value(val: Any) -> Any:
+    if val is None:
+        return None
+    if isinstance(val, datetime):
+        return val.isoformat()
+    return str(val)
+
+
+def _load_sort_value(kind: str, raw: Any) -> Any:
+    if raw is None:
+        return None
+    if kind == "datetime":
+        try:
+            val = parse_datetime(raw)
+        except (TypeError, ValueError):
+            # v không phải chuỗi / ngày giờ sai (tháng 13...)
+            raise InvalidCursor("cursor không hợp lệ")
+        if val is None:
+            raise InvalidCursor("cursor không hợp lệ")
+        return val
+    try:
+        return Decimal(raw) if kind == "decimal" else float(raw)
+    except (InvalidOperation, TypeError, ValueError):
+        raise InvalidCursor("cursor không hợp lệ")
+
+
+def encode_cursor(sort: str, order: str, value: Any, post_id: str) -> str:
+    payload = json.dumps(
+        {"s": sort, "o": order, "v": _dump_sort_value(value), "id": post_id},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, str]:
+    """
+    Trả (sort_value, post_id). Cursor phải được sinh với cùng sort/order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor("cursor không hợp lệ")
+
+    if not isinstance(data, dict) or data.get("s") != sort or data.get("o") != order:
+        raise InvalidCursor("cursor không khớp sort/order hiện tại")
+    if not data.get("id"):
+        raise InvalidCursor("cursor không hợp lệ")
+
+    kind = SORT_COLUMNS[sort][1]
+    return _load_sort_value(kind, data.get("v")), str(data["id"])
+
+
+def normalize_sort(sort: Optional[str], order: Optional[str], default: str):
+    sort = sort if sort in SORT_COLUMNS else default
+    order = "asc" if (order or "").lower() == "asc" else "desc"
+    return sort, order
+
+
+def _keyset_clause(sort: str, order: str, value: Any, last_id: str):
+    """
+    Điều kiện "đứng sau dòng (value, last_id)" theo ORDER BY col {order}, id {order}.
+    MySQL xếp NULL đầu tiên khi ASC, cuối cùng khi DESC.
+    """
+    col, _, nullable = SORT_COLUMNS[sort]
+    cmp = ">" if order == "asc" else "<"
+
+    if value is None:
+        # đang ở vùng NULL
+        clause = f"({col} IS NULL AND p.id {cmp} %s)"
+        params: List[Any] = [last_id]
+        if order == "asc":
+            clause = f"({clause} OR {col} IS NOT NULL)"
+        return clause, params
+
+    clause = f"({col} {cmp} %s OR ({col} = %s AND p.id {cmp} %s))"
+    params = [value, value, last_id]
+    if nullable and order == "desc":
+        clause = f"({clause} OR {col} IS NULL)"
+    return clause, params
+
+
+def keyset_page(
+    where: List[str],
+    params: List[Any],
+    sort: str,
+    order: str,
+    cursor: Optional[str],
+    page_size: int,
+    table: str = "listings_post",
+    columns: List[str] = POST_COLUMNS,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    1 trang keyset trên `table` (alias p, cần cột id + cột sort).
+    """
+    page_size = max(1, min(page_size or 20, MAX_PAGE_SIZE))
+    where = list(where)
+    params = list(params)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort, order)
+        clause, extra = _keyset_clause(sort, order, value, last_id)
+        where.append(clause)
+        params.extend(extra)
+
+    col = SORT_COLUMNS[sort][0]
+    direction = "ASC" if order == "asc" else "DESC"
+    sql = (
+        f"SELECT {select_sql(columns)} FROM {table} p"
+        f" WHERE {' AND '.join(where) or '1 = 1'}"
+        f" ORDER BY {col} {direction}, p.id {direction}"
+        " LIMIT %s"
+    )
+    params.append(page_size + 1)
+
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    items = [row_to_json(r, columns) for r in rows]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        sort_value = last[columns.index(col.split(".", 1)[1])]
+        next_cursor = encode_cursor(sort, order, sort_value, last[0])
+
+    return items, next_cursor
+
+
+# ========== KEYSET SEARCH ==========
+def search_keyset(
+    cursor: Optional[str],
+    page_size: int,
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    **filters,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Tìm kiếm bài public theo keyset: WHERE (sort_key, id) đứng sau cursor.
+    Chi phí mỗi trang như nhau dù cuộn sâu tới đâu (không OFFSET).
+    """
+    sort, order = normalize_sort(sort, order, DEFAULT_SORT)
+    clauses, params = build_filters(**filters)
+    return keyset_page(
+        [PUBLIC_SQL] + clauses, params, sort, order, cursor, page_size
+    )
+
+
+def owner_posts_keyset(
+    owner_id: str,
+    only_public: int,
+    cursor: Optional[str],
+    page_size: int,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Danh sách bài của 1 owner theo keyset (created_at DESC, id DESC),
+    dùng index (owner_id, created_at).
+    """
+    where = ["p.owner_id = %s", "p.is_deleted = 0"]
+    if only_public:
+        where.append(PUBLIC_SQL)
+    return keyset_page(
+        where, [owner_id], DEFAULT_OWNER_SORT, "desc", cursor, page_size
+    )
+
+
+def moderation_queue_keyset(
+    approval_status_id: int,
+    cursor: Optional[str],
+    page_size: int,
+    category_id: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Hàng đợi duyệt: bài theo trạng thái duyệt, cũ nhất trước
+    (created_at ASC, id ASC), dùng index (approval_status, is_deleted, created_at).
+    """
+    where = ["p.approval_status_id = %s", "p.is_deleted = 0"]
+    params: List[Any] = [approval_status_id]
+    if category_id is not None:
+        where.append("p.category_id = %s")
+        params.append(category_id)
+    return keyset_page(where, params, "created_at", "asc", cursor, page_size)
+
+
+# ========== GEO SEARCH ==========
+def _haversine_sql() -> str:
+    # khoảng cách (km) từ (%s lat, %s lng) tới toạ độ của bài
+    return (
+        "2 * 6371 * ASIN(SQRT("
+        "POWER(SIN(RADIANS(g.lat - %s) / 2), 2)"
+        " + COS(RADIANS(%s)) * COS(RADIANS(g.lat))"
+        " * POWER(SIN(RADIANS(g.lng - %s) / 2), 2)))"
+    )
+
+
+def search_geo(
+    near: Optional[Tuple[float, float]] = None,
+    radius_km: Optional[float] = None,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+    **filters,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Tìm bài public quanh 1 điểm (near + radius_km) và/hoặc trong 1 khung bản đồ
+    (bbox = (min_lat, min_lng, max_lat, max_lng)), kèm các filter thường.
+    Lọc thô theo ô lưới của listings_postgeo rồi lọc chính xác theo
+    toạ độ / khoảng cách. Có near -> mặc định sắp theo khoảng cách tăng dần.
+    Trả (items, total) trong 1 câu query (COUNT(*) OVER()).
+    """
+    page = max(page or 1, 1)
+    page_size = max(1, min(page_size or 20, MAX_PAGE_SIZE))
+
+    clauses, params = build_filters(**filters)
+    where: List[str] = [PUBLIC_SQL] + clauses
+    where_params: List[Any] = list(params)
+
+    boxes = []
+    if bbox:
+        boxes.append(bbox)
+    if near:
+        radius_km = min(radius_km or post_geo.DEFAULT_RADIUS_KM, post_geo.MAX_RADIUS_KM)
+        boxes.append(post_geo.bbox_around(near[0], near[1], radius_km))
+
+    for box in boxes:
+        ranges = post_geo.cell_ranges(box)
+        if ranges is not None:
+            where.append(
+                "(" + " OR ".join(["g.cell BETWEEN %s AND %s"] * len(ranges)) + ")"
+            )
+            for lo, hi in ranges:
+                where_params.extend([lo, hi])
+        where.append("g.lat BETWEEN %s AND %s AND g.lng BETWEEN %s AND %s")
+        where_params.extend([box[0], box[2], box[1], box[3]])
+
+    select_params: List[Any] = []
+    if near:
+        distance_sql = _haversine_sql()
+        select_params = [near[0], near[0], near[1]]
+        where.append(f"{distance_sql} <= %s")
+        where_params.extend([near[0], near[0], near[1], radius_km])
+    else:
+        distance_sql = "NULL"
+
+    direction = "ASC" if (order or "").lower() == "asc" else "DESC"
+    if sort in SORT_COLUMNS:
+        order_by = f"{SORT_COLUMNS[sort][0]} {direction}, p.id {direction}"
+    elif near:
+        order_by = "distance_km ASC, p.id ASC"
+    else:
+        col = SORT_COLUMNS[DEFAULT_SORT][0]
+        order_by = f"{col} {direction}, p.id {direction}"
+
+    sql = (
+        f"SELECT {select_sql()}, {distance_sql} AS distance_km,"
+        " COUNT(*) OVER() AS total_count"
+        " FROM listings_post p"
+        " JOIN listings_postgeo g ON g.post_id = p.id"
+        f" WHERE {' AND '.join(where)}"
+        f" ORDER BY {order_by}"
+        " LIMIT %s OFFSET %s"
+    )
+
+    with connection.cursor() as cur:
+        cur.execute(
+            sql,
+            select_params + where_params + [page_size, (page - 1) * page_size],
+        )
+        rows = cur.fetchall()
+
+        if rows:
+            total = int(rows[0][-1])
+        elif page > 1:
+            # trang vượt quá cuối -> không có dòng nào mang total, đếm riêng
+            cur.execute(
+                "SELECT COUNT(*) FROM listings_post p"
+                " JOIN listings_postgeo g ON g.post_id = p.id"
+                f" WHERE {' AND '.join(where)}",
+                where_params,
+            )
+            total = int(cur.fetchone()[0])
+        else:
+            total = 0
+
+    items = []
+    n = len(POST_COLUMNS)
+    for r in rows:
+        item = row_to_json(r[:n])
+        distance = r[n]
+        item["distance_km"] = round(float(distance), 3) if distance is not None else None
+        items.append(item)
+    return items, total
+
+
+# ========== THUỘC TÍNH (listings_postattribute) ==========
+ATTRIBUTE_COLUMNS = ["bedrooms", "bathrooms", "direction", "legal_status", "price_per_m2"]
+ATTRIBUTE_SORTS = {"price_per_m2": "a.price_per_m2"}
+
+
+def build_attribute_filters(
+    bedrooms_min: Optional[int] = None,
+    bathrooms_min: Optional[int] = None,
+    direction: Optional[str] = None,
+    legal_status: Optional[str] = None,
+    price_per_m2_min: Optional[float] = None,
+    price_per_m2_max: Optional[float] = None,
+) -> Tuple[List[str], List[Any]]:
+    """
+    Điều kiện trên các cột có index của bảng thuộc tính (alias a).
+    direction / legal_status phải đã được chuẩn hoá (xem post_attributes).
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    for clause, val in (
+        ("a.bedrooms >= %s", bedrooms_min),
+        ("a.bathrooms >= %s", bathrooms_min),
+        ("a.direction = %s", direction or None),
+        ("a.legal_status = %s", legal_status or None),
+        ("a.price_per_m2 >= %s", price_per_m2_min),
+        ("a.price_per_m2 <= %s", price_per_m2_max),
+    ):
+        if val is not None:
+            clauses.append(clause)
+            params.append(val)
+    return clauses, params
+
+
+def search_with_attributes(
+    attributes: Dict[str, Any],
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+    **filters,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Tìm bài public có lọc theo thuộc tính (phòng ngủ, phòng tắm, hướng,
+    pháp lý, giá/m²) – quét range trên index của listings_postattribute rồi
+    JOIN theo khoá chính sang listings_post. Hỗ trợ sort=price_per_m2.
+    Mỗi item có thêm "attributes". Trả (items, total) trong 1 query.
+    """
+    page = max(page or 1, 1)
+    page_size = max(1, min(page_size or 20, MAX_PAGE_SIZE))
+
+    attr_clauses, attr_params = build_attribute_filters(**attributes)
+    clauses, params = build_filters(**filters)
+    where_sql = " AND ".join([PUBLIC_SQL] + attr_clauses + clauses)
+    where_params = attr_params + params
+
+    direction = "ASC" if (order or "").lower() == "asc" else "DESC"
+    if sort in ATTRIBUTE_SORTS:
+        col = ATTRIBUTE_SORTS[sort]
+    else:
+        sort, _ = normalize_sort(sort, order, DEFAULT_SORT)
+        col = SORT_COLUMNS[sort][0]
+
+    attr_select = ", ".join(f"a.{c}" for c in ATTRIBUTE_COLUMNS)
+    from_sql = (
+        "FROM listings_postattribute a"
+        " JOIN listings_post p ON p.id = a.post_id"
+        f" WHERE {where_sql}"
+    )
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT {select_sql()}, {attr_select}, COUNT(*) OVER() {from_sql}"
+            f" ORDER BY {col} {direction}, p.id {direction}"
+            " LIMIT %s OFFSET %s",
+            where_params + [page_size, (page - 1) * page_size],
+        )
+        rows = cur.fetchall()
+        if rows:
+            total = int(rows[0][-1])
+        elif page > 1:
+            cur.execute(f"SELECT COUNT(*) {from_sql}", where_params)
+            total = int(cur.fetchone()[0])
+        else:
+            total = 0
+
+    n = len(POST_COLUMNS)
+    items = []
+    for r in rows:
+        item = row_to_json(r[:n])
+        item["attributes"] = {
+            c: _json_value(c, v)
+            for c, v in zip(ATTRIBUTE_COLUMNS, r[n:n + len(ATTRIBUTE_COLUMNS)])
+        }
+        items.append(item)
+    return items, total
@@ -0,0 +1,558 @@
+# listings/services/quotas.py
+
+import logging
+import threading
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from listings.models import QuotaCounter
+
+logger = logging.getLogger(__name__)
+
+KIND_POST = "post"    # số bài tạo trong ngày / người đăng
+KIND_BUMP = "bump"    # số lượt đẩy tin trong ngày / người đăng
+KIND_IMAGE = "image"  # số ảnh / bài (không theo ngày)
+KINDS = (KIND_POST, KIND_BUMP, KIND_IMAGE)
+DAILY_KINDS = {KIND_POST, KIND_BUMP}
+
+ERRORS = {
+    KIND_POST: "MAX_DAILY_POSTS_REACHED",
+    KIND_BUMP: "MAX_DAILY_BUMP_REACHED",
+    KIND_IMAGE: "MAX_IMAGES_PER_POST_REACHED",
+}
+
+# period của bộ đếm không theo ngày
+LIFETIME = date(1970, 1, 1)
+# hạn mức "không giới hạn" (admin) nhưng vẫn đếm
+UNLIMITED = 2 ** 31 - 1
+
+DEFAULT_ROLES = {
+    "MEMBER": {KIND_POST: 10, KIND_BUMP: 0, KIND_IMAGE: 6},
+    "AGENT": {KIND_POST: 1000, KIND_BUMP: 10, KIND_IMAGE: 10},
+}
+# gói VIP (MembershipPlan.code) ghi đè hạn mức của role; gói chưa khai báo -> DEFAULT
+DEFAULT_PLANS = {
+    "AGENT_1M": {KIND_BUMP: 10},
+    "AGENT_3M": {KIND_BUMP: 20},
+    "DEFAULT": {KIND_BUMP: 10},
+}
+
+_COUNTER_TABLE = QuotaCounter._meta.db_table
+_lock = threading.Lock()
+_backend = None
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_QUOTAS", {}) or {}
+
+
+# ========== HẠN MỨC ==========
+def limits_for(is_agent_flag, plan_code: Optional[str] = None) -> Dict[str, int]:
+    """
+    Hạn mức theo role (AGENT / MEMBER), gói VIP (MembershipPlan.code) ghi đè từng loại.
+    """
+    roles = _config().get("ROLES") or DEFAULT_ROLES
+    plans = _config().get("PLANS") or DEFAULT_PLANS
+    limits = dict(roles.get("AGENT" if is_agent_flag else "MEMBER", {}))
+    if plan_code:
+        limits.update(plans.get(plan_code.upper(), plans.get("DEFAULT", {})))
+    return {kind: int(limits.get(kind, 0)) for kind in KINDS}
+
+
+def limits_for_user(user_id: str, is_agent_flag) -> Dict[str, int]:
+    # chỉ AGENT mới có gói VIP (kích hoạt gói = gán role AGENT)
+    plan_code = active_plan_code(user_id) if is_agent_flag else None
+    return limits_for(is_agent_flag, plan_code)
+
+
+def active_plan_code(user_id: str) -> Optional[str]:
+    from accounts.models import UserMembership
+
+    return (
+        UserMembership.objects.filter(user_id=user_id, expired_at__gt=timezone.now())
+        .values_list("plan__code", flat=True)
+        .first()
+    )
+
+
+def today() -> date:
+    # ngày theo TIME_ZONE của project (đổi ngày lúc 0h giờ địa phương)
+    return timezone.localdate()
+
+
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, dt_time.min))
+
+
+def _ttl_seconds(period: date) -> int:
+    if period == LIFETIME:
+        return 0
+    # giữ thêm 1 ngày sau khi hết ngày (Redis tự xoá key cũ)
+    end = _day_start(period + timedelta(days=1))
+    return max(60, int((end - timezone.now()).total_seconds()) + 86400)
+
+
+# ========== BỘ ĐẾM ==========
+class QuotaItem:
+    """
+    1 bộ đếm cần tăng: key, số lượng, hạn mức, period và hàm tính giá trị
+    ban đầu (chỉ gọi khi bộ đếm chưa có, vd. đếm ảnh đang có của bài).
+    """
+
+    __slots__ = ("kind", "key", "amount", "limit", "period", "seed")
+
+    def __init__(self, kind: str, key: str, amount: int, limit: int, period: date,
+                 seed: Optional[Callable[[], int]] = None):
+        self.kind = kind
+        self.key = key
+        self.amount = int(amount)
+        self.limit = int(limit)
+        self.period = period
+        self.seed = seed
+
+    def initial(self) -> int:
+        return int(self.seed()) if self.seed else 0
+
+
+def _seed_posts(user_id: str, day: date) -> Callable[[], int]:
+    def seed():
+        from listings.models import Post
+
+        return Post.objects.filter(owner_id=user_id, created_at__gte=_day_start(day)).count()
+    return seed
+
+
+def _seed_bumps(user_id: str, day: date) -> Callable[[], int]:
+    def seed():
+        # khôi phục từ PostBumpLog; bộ đếm cũ trên UserMembership cho ngày chuyển đổi
+        from accounts.models import UserMembership
+        from listings.services import bump_log
+
+        legacy = (
+            UserMembership.objects.filter(user_id=user_id, last_bump_date=day)
+            .values_list("bumps_used_today", flat=True)
+            .first()
+        ) or 0
+        return max(legacy, bump_log.count_today(user_id))
+    return seed
+
+
+def _seed_images(post_id: str) -> Callable[[], int]:
+    def seed():
+        from listings.models import PostImage
+
+        return (
+            PostImage.objects.filter(post_id=post_id)
+            .exclude(status=PostImage.STATUS_FAILED)
+            .count()
+        )
+    return seed
+
+
+def _item(kind: str, amount: int, limit: int, user_id: Optional[str], post_id: Optional[str]) -> QuotaItem:
+    if kind == KIND_IMAGE:
+        return QuotaItem(kind, f"image:{post_id}", amount, limit, LIFETIME, _seed_images(post_id))
+    day = today()
+    seed = _seed_posts(user_id, day) if kind == KIND_POST else _seed_bumps(user_id, day)
+    return QuotaItem(kind, f"{kind}:{user_id}", amount, limit, day, seed)
+
+
+# ========== BACKEND ==========
+class MemoryQuotaBackend:
+    """
+    Bộ đếm trong process (dev / test, 1 worker). Khoá chung -> kiểm + tăng nguyên tử.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[date, int]] = {}
+        self._lock = threading.Lock()
+
+    def _current(self, item: QuotaItem) -> int:
+        entry = self._data.get(item.key)
+        if entry is None:
+            entry = (item.period, item.initial())
+            self._data[item.key] = entry
+        period, used = entry
+        return used if period == item.period else 0
+
+    def consume(self, items: List[QuotaItem], return_used: bool = False) -> Tuple[bool, Any]:
+        with self._lock:
+            current = [self._current(i) for i in items]
+            for idx, (item, used) in enumerate(zip(items, current)):
+                if used + item.amount > item.limit:
+                    return False, (idx, used)
+            for item, used in zip(items, current):
+                self._data[item.key] = (item.period, used + item.amount)
+            return True, [used + i.amount for i, used in zip(items, current)]
+
+    def release(self, items: List[QuotaItem]) -> None:
+        with self._lock:
+            for item in items:
+                period, used = self._data.get(item.key, (item.period, 0))
+                if period == item.period:
+                    self._data[item.key] = (period, max(0, used - item.amount))
+
+    def peek(self, items: List[QuotaItem]) -> List[int]:
+        with self._lock:
+            return [self._current(i) for i in items]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _Shortfall(Exception):
+    pass
+
+
+class DbQuotaBackend:
+    """
+    Bộ đếm trong bảng QuotaCounter. Tăng tất cả bộ đếm trong 1 câu UPDATE:
+    mỗi dòng chỉ khớp WHERE khi (used của period hiện tại + amount) <= limit,
+    khoá dòng của UPDATE chặn request song song. Số dòng khớp < số bộ đếm
+    -> rollback savepoint (không tăng gì). Nằm trong transaction của
+    người gọi: người gọi rollback thì hạn mức cũng được trả lại.
+    """
+
+    name = "db"
+
+    @staticmethod
+    def _used_expr() -> str:
+        return "(CASE WHEN period = %s THEN used ELSE 0 END)"
+
+    def _update(self, items: List[QuotaItem]) -> int:
+        used_expr = self._used_expr()
+        set_used, set_period, where = [], [], []
+        p_used, p_period, p_where = [], [], []
+        for item in items:
+            set_used.append(f"WHEN %s THEN {used_expr} + %s")
+            p_used += [item.key, item.period, item.amount]
+            set_period.append("WHEN %s THEN %s")
+            p_period += [item.key, item.period]
+            where.append(f"(quota_key = %s AND {used_expr} + %s <= %s)")
+            p_where += [item.key, item.period, item.amount, item.limit]
+        # MySQL gán SET từ trái sang phải: used tính theo period cũ rồi mới đổi period
+        sql = (
+            f"UPDATE {_COUNTER_TABLE} SET"
+            f" used = CASE quota_key {' '.join(set_used)} ELSE used END,"
+            f" period = CASE quota_key {' '.join(set_period)} ELSE period END"
+            f" WHERE {' OR '.join(where)}"
+        )
+        with connection.cursor() as cur:
+            cur.execute(sql, p_used + p_period + p_where)
+            return cur.rowcount
+
+    def _create_missing(self, items: List[QuotaItem]) -> bool:
+        existing = set(
+            QuotaCounter.objects.filter(quota_key__in=[i.key for i in items])
+            .values_list("quota_key", flat=True)
+        )
+        missing = [i for i in items if i.key not in existing]
+        if not missing:
+            return False
+        QuotaCounter.objects.bulk_create(
+            [QuotaCounter(quota_key=i.key, period=i.period, used=i.initial()) for i in missing],
+            ignore_conflicts=True,
+        )
+        return True
+
+    def _rows(self, items: List[QuotaItem]) -> Dict[str, Tuple[date, int]]:
+        return {
+            key: (period, used)
+            for key, period, used in QuotaCounter.objects.filter(
+                quota_key__in=[i.key for i in items]
+            ).values_list("quota_key", "period", "used")
+        }
+
+    def consume(self, items: List[QuotaItem], return_used: bool = False) -> Tuple[bool, Any]:
+        with transaction.atomic():
+            for attempt in range(2):
+                try:
+                    with transaction.atomic():  # savepoint
+                        if self._update(items) != len(items):
+                            raise _Shortfall()
+                        if not return_used:
+                            return True, None
+                        # dòng đang bị khoá bởi UPDATE trên -> đọc lại đúng giá trị vừa ghi
+                        rows = self._rows(items)
+                        return True, [rows[i.key][1] for i in items]
+                except _Shortfall:
+                    pass
+                # thường chỉ gặp lần đầu của 1 key (chưa có dòng) -> tạo rồi thử lại
+                if attempt or not self._create_missing(items):
+                    break
+            rows = self._rows(items)
+            for idx, item in enumerate(items):
+                period, used = rows.get(item.key, (item.period, 0))
+                used = used if period == item.period else 0
+                if used + item.amount > item.limit:
+                    return False, (idx, used)
+            return False, (0, None)
+
+    def release(self, items: List[QuotaItem]) -> None:
+        with connection.cursor() as cur:
+            for item in items:
+                cur.execute(
+                    f"UPDATE {_COUNTER_TABLE}"
+                    " SET used = CASE WHEN used > %s THEN used - %s ELSE 0 END"
+                    " WHERE quota_key = %s AND period = %s",
+                    [item.amount, item.amount, item.key, item.period],
+                )
+
+    def peek(self, items: List[QuotaItem]) -> List[int]:
+        rows = self._rows(items)
+        out = []
+        for item in items:
+            if item.key not in rows:
+                out.append(item.initial())
+                continue
+            period, used = rows[item.key]
+            out.append(used if period == item.period else 0)
+        return out
+
+    def clear(self) -> None:
+        QuotaCounter.objects.all().delete()
+
+
+# Kiểm tất cả key trước, đủ hạn mức mới tăng -> "tất cả hoặc không" trong 1 lần gọi.
+# Trả {1, used...} | {0, idx, used} (vượt hạn mức) | {-1, idx} (key chưa có, cần seed)
+_CONSUME_LUA = """
+for i = 1, #KEYS do
+  local cur = redis.call('GET', KEYS[i])
+  if not cur then return {-1, i} end
+  if tonumber(cur) + tonumber(ARGV[3 * i - 2]) > tonumber(ARGV[3 * i - 1]) then
+    return {0, i, tonumber(cur)}
+  end
+end
+local out = {1}
+for i = 1, #KEYS do
+  out[#out + 1] = redis.call('INCRBY', KEYS[i], ARGV[3 * i - 2])
+  local ttl = tonumber(ARGV[3 * i])
+  if ttl > 0 then redis.call('EXPIRE', KEYS[i], ttl) end
+end
+return out
+"""
+
+_RELEASE_LUA = """
+for i = 1, #KEYS do
+  local cur = tonumber(redis.call('GET', KEYS[i]) or '0')
+  local left = cur - tonumber(ARGV[i])
+  if left < 0 then left = 0 end
+  if redis.call('EXISTS', KEYS[i]) == 1 then redis.call('SET', KEYS[i], left, 'KEEPTTL') end
+end
+return 1
+"""
+
+
+class RedisQuotaBackend:
+    """
+    Bộ đếm trên Redis dùng chung các worker: kiểm + tăng trong 1 script Lua
+    (nguyên tử). Key theo ngày tự hết hạn sau khi qua ngày.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "listings:quota:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._consume = self._client.register_script(_CONSUME_LUA)
+        self._release = self._client.register_script(_RELEASE_LUA)
+
+    def _k(self, item: QuotaItem) -> str:
+        if item.period == LIFETIME:
+            return f"{self.prefix}{item.key}"
+        return f"{self.prefix}{item.key}:{item.period.isoformat()}"
+
+    def consume(self, items: List[QuotaItem], return_used: bool = False) -> Tuple[bool, Any]:
+        keys = [self._k(i) for i in items]
+        args: List[Any] = []
+        for item in items:
+            args += [item.amount, item.limit, _ttl_seconds(item.period)]
+        for _ in range(len(items) + 1):
+            result = self._consume(keys=keys, args=args)
+            status = int(result[0])
+            if status == 1:
+                return True, [int(v) for v in result[1:]]
+            idx = int(result[1]) - 1
+            if status == 0:
+                return False, (idx, int(result[2]))
+            # key chưa có -> khởi tạo (NX: process khác tạo trước thì giữ của nó)
+            item = items[idx]
+            ttl = _ttl_seconds(item.period)
+            self._client.set(keys[idx], item.initial(), nx=True, ex=ttl or None)
+        return False, (0, None)
+
+    def release(self, items: List[QuotaItem]) -> None:
+        self._release(keys=[self._k(i) for i in items], args=[i.amount for i in items])
+
+    def peek(self, items: List[QuotaItem]) -> List[int]:
+        values = self._client.mget([self._k(i) for i in items])
+        return [int(v) if v is not None else i.initial() for i, v in zip(items, values)]
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                config = _config()
+                name = (config.get("BACKEND") or "db").lower()
+                if name == "redis":
+                    _backend = RedisQuotaBackend(
+                        config.get("REDIS_URL", "redis://127.0.0.1:6379/1")
+                    )
+                elif name == "memory":
+                    _backend = MemoryQuotaBackend()
+                else:
+                    _backend = DbQuotaBackend()
+    return _backend
+
+
+def reset_backend() -> None:
+    global _backend
+    with _lock:
+        _backend = None
+
+
+# ========== API ==========
+def _message(kind: str, limit: int, used: Optional[int]) -> str:
+    if kind == KIND_POST:
+        return f"Bạn đã tạo đủ {limit} bài đăng hôm nay."
+    if kind == KIND_BUMP:
+        return f"Bạn đã dùng hết {limit} lượt đẩy tin hôm nay."
+    if used:
+        return f"Bài đăng đã có {used} ảnh, chỉ được tối đa {limit} ảnh mỗi bài."
+    return f"Bạn chỉ được upload tối đa {limit} ảnh cho mỗi bài đăng."
+
+
+def consume(
+    amounts: Dict[str, int],
+    user_id: Optional[str] = None,
+    is_agent_flag=0,
+    plan_code: Optional[str] = None,
+    post_id: Optional[str] = None,
+    limits: Optional[Dict[str, int]] = None,
+    return_used: bool = False,
+) -> Dict[str, Any]:
+    """
+    Kiểm + tăng nhiều hạn mức cùng lúc, tất cả hoặc không, 1 lần gọi backend.
+      amounts: {"post": 1, "bump": 1, "image": n}
+      "image" không có post_id (bài sắp tạo) -> chỉ so n với hạn mức.
+      return_used: backend db đọc thêm số đã dùng (1 query) để trả trong "used".
+    Trả {"ok": 1, "used": {...}, "limits": {...}}
+      | {"ok": 0, "error": MAX_..., "message", "limit", "used"}.
+    """
+    if limits is None:
+        limits = limits_for(is_agent_flag, plan_code)
+    items: List[QuotaItem] = []
+    for kind, amount in amounts.items():
+        amount = int(amount or 0)
+        if amount <= 0:
+            continue
+        if kind == KIND_IMAGE and not post_id:
+            if amount > limits[kind]:
+                return _denied(kind, limits[kind], None)
+            continue
+        items.append(_item(kind, amount, limits[kind], user_id, post_id))
+
+    used: Dict[str, Optional[int]] = {}
+    if items:
+        ok, info = get_backend().consume(items, return_used=return_used)
+        if not ok:
+            idx, current = info
+            return _denied(items[idx].kind, items[idx].limit, current)
+        for i, item in enumerate(items):
+            used[item.kind] = info[i] if isinstance(info, list) else None
+    return {"ok": 1, "used": used, "limits": limits}
+
+
+def _denied(kind: str, limit: int, used: Optional[int]) -> Dict[str, Any]:
+    return {
+        "ok": 0,
+        "error": ERRORS[kind],
+        "message": _message(kind, limit, used),
+        "limit": limit,
+        "used": used,
+    }
+
+
+def consume_upto(
+    kind: str,
+    wanted: int,
+    user_id: str,
+    limits: Dict[str, int],
+) -> int:
+    """
+    Lấy tối đa `wanted` đơn vị của 1 hạn mức ngày (import theo lô: nhận phần
+    còn lại, phần dư báo vượt hạn mức). Trả số đơn vị đã lấy được.
+    """
+    return consume_upto_many(kind, {user_id: wanted}, {user_id: limits})[user_id]
+
+
+def consume_upto_many(
+    kind: str,
+    wanted: Dict[str, int],
+    limits: Dict[str, Dict[str, int]],
+) -> Dict[str, int]:
+    """
+    consume_upto cho nhiều user cùng lúc: 1 lần đọc + 1 lần tăng cho cả nhóm
+    (auto-bump theo lịch). Trả {user_id: số đơn vị lấy được}.
+    """
+    backend = get_backend()
+    granted = {user_id: 0 for user_id in wanted}
+    pending = {user_id: n for user_id, n in wanted.items() if n > 0}
+    for _ in range(3):
+        if not pending:
+            break
+        user_ids = list(pending)
+        probes = [_item(kind, pending[u], limits[u][kind], u, None) for u in user_ids]
+        items = []
+        for user_id, probe, used in zip(user_ids, probes, backend.peek(probes)):
+            probe.amount = min(pending[user_id], probe.limit - used)
+            if probe.amount > 0:
+                items.append((user_id, probe))
+        if not items:
+            break
+        ok, _ = backend.consume([probe for _, probe in items])
+        if ok:
+            for user_id, probe in items:
+                granted[user_id] = probe.amount
+            break
+        # request khác chen vào giữa lúc đọc và lúc tăng -> đọc lại rồi thử lại
+    return granted
+
+
+def release(amounts: Dict[str, int], user_id: Optional[str] = None, post_id: Optional[str] = None) -> None:
+    """
+    Trả lại hạn mức (tạo bài thất bại, xoá ảnh, ảnh upload lỗi).
+    """
+    items = []
+    for kind, amount in amounts.items():
+        amount = int(amount or 0)
+        if amount <= 0 or (kind == KIND_IMAGE and not post_id):
+            continue
+        items.append(_item(kind, amount, 0, user_id, post_id))
+    if not items:
+        return
+    try:
+        get_backend().release(items)
+    except Exception:
+        logger.exception("quotas: trả hạn mức lỗi %s", [i.key for i in items])
+
+
+def remaining(kind: str, limits: Dict[str, int], user_id: Optional[str] = None, post_id: Optional[str] = None) -> int:
+    item = _item(kind, 0, limits[kind], user_id, post_id)
+    return max(0, limits[kind] - get_backend().peek([item])[0])
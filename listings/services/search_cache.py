@@ -0,0 +1,179 @@
+# listings/services/search_cache.py
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.dispatch import receiver
+
+from listings.services.cache_backends import LocalLRUCache, build_cache
+from listings.services.post_query import MAX_PAGE_SIZE
+from listings.signals import post_changed
+
+# Key trong cache: "search:<generation>:<sha1 của bộ filter đã chuẩn hoá>".
+# Mỗi lần có ghi (tạo / sửa / đổi trạng thái / xoá / bump / ảnh) -> tăng
+# generation, toàn bộ entry cũ tự "chết" (không ai đọc tới nữa, hết TTL thì bị dọn).
+_GEN_KEY = "search:gen"
+
+_lock = threading.Lock()
+_cache = None
+_cache_built = False
+_local_generation = 0
+_stats = {"hits": 0, "misses": 0}
+
+
+def _get_cache():
+    global _cache, _cache_built
+    if not _cache_built:
+        with _lock:
+            if not _cache_built:
+                config = getattr(settings, "LISTINGS_SEARCH_CACHE", {}) or {}
+                _cache = build_cache(config, prefix="listings:")
+                _cache_built = True
+    return _cache
+
+
+def _generation(cache) -> int:
+    if isinstance(cache, LocalLRUCache):
+        return _local_generation
+    return cache.get_int(_GEN_KEY)
+
+
+def _norm_str(value: Optional[str]) -> Optional[str]:
+    # giữ nguyên giá trị gốc: province / district / ward so khớp với
+    # JSON_UNQUOTE(JSON_EXTRACT(...)) (utf8mb4_bin, phân biệt hoa thường)
+    if value is None or not str(value).strip():
+        return None
+    return str(value)
+
+
+def normalize_filters(
+    q: Optional[str] = None,
+    category_id: Optional[int] = None,
+    post_type_id: Optional[int] = None,
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+    area_min: Optional[float] = None,
+    area_max: Optional[float] = None,
+    province: Optional[str] = None,
+    district: Optional[str] = None,
+    ward: Optional[str] = None,
+    province_code: Optional[int] = None,
+    district_code: Optional[int] = None,
+    ward_code: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Chuẩn hoá bộ filter (đã parse qua _to_int/_to_float ở view):
+    chuỗi rỗng / chỉ khoảng trắng -> None, chuỗi khác giữ nguyên (không
+    casefold: so khớp JSON phân biệt hoa thường, key cache phải theo đúng
+    giá trị đưa xuống SQL). Tên tỉnh / huyện / xã tra được mã thì
+    admin_units.apply_filter_codes đổi sang *_code (tra không phân biệt hoa thường).
+    """
+    return {
+        "q": _norm_str(q),
+        "category_id": category_id,
+        "post_type_id": post_type_id,
+        "price_min": price_min,
+        "price_max": price_max,
+        "area_min": area_min,
+        "area_max": area_max,
+        "province": _norm_str(province),
+        "district": _norm_str(district),
+        "ward": _norm_str(ward),
+        "province_code": province_code,
+        "district_code": district_code,
+        "ward_code": ward_code,
+    }
+
+
+def normalize_paging(page: Optional[int], page_size: Optional[int]) -> Tuple[int, int]:
+    page = max(page or 1, 1)
+    page_size = max(1, min(page_size or 20, MAX_PAGE_SIZE))
+    return page, page_size
+
+
+def make_key(mode: str, filters: Dict[str, Any], **extra) -> Optional[str]:
+    cache = _get_cache()
+    if cache is None:
+        return None
+    raw = json.dumps(
+        [mode, sorted(filters.items()), sorted(extra.items())],
+        cls=DjangoJSONEncoder,
+        separators=(",", ":"),
+    )
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f"search:{_generation(cache)}:{digest}"
+
+
+def _count(kind: str, cache) -> None:
+    with _lock:
+        _stats[kind] += 1
+    if not isinstance(cache, LocalLRUCache):
+        cache.incr(f"search:stats:{kind}")
+
+
+def get_or_set(key: Optional[str], compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Lấy payload đã cache theo key; miss thì gọi compute() và lưu lại.
+    Lưu dạng JSON bytes để caller có sửa payload cũng không ảnh hưởng cache.
+    """
+    cache = _get_cache()
+    if cache is None or key is None:
+        return compute()
+
+    raw = cache.get(key)
+    if raw is not None:
+        _count("hits", cache)
+        return json.loads(raw)
+
+    _count("misses", cache)
+    payload = compute()
+    cache.set(key, json.dumps(payload, cls=DjangoJSONEncoder).encode())
+    return payload
+
+
+def invalidate() -> None:
+    global _local_generation
+    cache = _get_cache()
+    if cache is None:
+        return
+    if isinstance(cache, LocalLRUCache):
+        with _lock:
+            _local_generation += 1
+        cache.clear()
+    else:
+        cache.incr(_GEN_KEY)
+
+
+def stats() -> Dict[str, Any]:
+    """
+    Số hit/miss: local = của process hiện tại; redis = cộng dồn mọi worker.
+    """
+    cache = _get_cache()
+    if cache is None:
+        return {"backend": "off", "hits": 0, "misses": 0, "hit_rate": None}
+
+    if isinstance(cache, LocalLRUCache):
+        hits, misses = _stats["hits"], _stats["misses"]
+        extra = {"entries": len(cache), "generation": _local_generation}
+    else:
+        hits = cache.get_int("search:stats:hits")
+        misses = cache.get_int("search:stats:misses")
+        extra = {"generation": cache.get_int(_GEN_KEY)}
+
+    total = hits + misses
+    return {
+        "backend": cache.name,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None,
+        **extra,
+    }
+
+
+@receiver(post_changed)
+def _on_post_changed(sender, post_ids, action, **kwargs):
+    invalidate()
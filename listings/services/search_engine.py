@@ -0,0 +1,210 @@
+# listings/services/search_engine.py
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+from listings.services import post_procs, post_query
+from listings.services.post_counters import public_status_ids
+
+logger = logging.getLogger(__name__)
+
+ENGINE_PROCEDURE = "procedure"  # CALL sp_posts_search / sp_posts_search_page
+ENGINE_DYNAMIC = "dynamic"      # SQL chỉ gồm các filter đang có
+ENGINE_AB = "ab"                # chia ngẫu nhiên giữa 2 engine để so latency
+
+# SP chỉ lọc địa chỉ theo tên -> engine procedure nhận lại tên gốc của người
+# dùng thay cho mã; có mã mà không có tên (chỉ gửi *_code) mới phải chạy dynamic.
+_CODE_FILTERS = {"province": "province_code", "district": "district_code", "ward": "ward_code"}
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_SEARCH_ENGINE", {}) or {}
+
+
+def choose_engine() -> str:
+    engine = (_config().get("ENGINE") or ENGINE_PROCEDURE).lower()
+    if engine == ENGINE_AB:
+        percent = float(_config().get("AB_DYNAMIC_PERCENT", 50))
+        return ENGINE_DYNAMIC if random.random() * 100 < percent else ENGINE_PROCEDURE
+    if engine == ENGINE_DYNAMIC:
+        return ENGINE_DYNAMIC
+    return ENGINE_PROCEDURE
+
+
+def _record(engine: str, elapsed_ms: float) -> None:
+    with _lock:
+        s = _stats.setdefault(engine, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        s["calls"] += 1
+        s["total_ms"] += elapsed_ms
+        s["max_ms"] = max(s["max_ms"], elapsed_ms)
+
+
+def stats() -> Dict[str, Any]:
+    """
+    Latency theo engine của process hiện tại (để A/B procedure vs dynamic).
+    """
+    with _lock:
+        return {
+            "configured": (_config().get("ENGINE") or ENGINE_PROCEDURE).lower(),
+            **{
+                engine: {
+                    "calls": int(s["calls"]),
+                    "avg_ms": round(s["total_ms"] / s["calls"], 2) if s["calls"] else None,
+                    "max_ms": round(s["max_ms"], 2),
+                }
+                for engine, s in sorted(_stats.items())
+            },
+        }
+
+
+# ========== ENGINE "dynamic" ==========
+def _index_hint(filters: Dict[str, Any], sort: str) -> str:
+    """
+    Với sort bumped_at (mặc định), gợi ý index gộp theo dạng filter phổ biến:
+    (approval, status, is_deleted[, category | province_code | address_province], bumped_at)
+    -> đọc đúng thứ tự của index, dừng sau LIMIT, không filesort.
+    """
+    if sort != "bumped_at":
+        return ""
+    names = []
+    if filters.get("category_id") is not None:
+        names.append("post_pub_cat_bump_idx")
+    if filters.get("province_code") is not None:
+        names.append("post_pub_provcode_bump_idx")
+    elif filters.get("province"):
+        names.append("post_pub_prov_bump_idx")
+    if not names:
+        names.append("post_pub_bump_idx")
+    return f" USE INDEX ({', '.join(names)})"
+
+
+def _dynamic_where(filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    approved_id, published_id = public_status_ids()
+    # cùng thứ tự cột với index gộp
+    clauses = ["p.approval_status_id = %s", "p.post_status_id = %s", "p.is_deleted = 0"]
+    params: List[Any] = [approved_id, published_id]
+
+    if filters.get("category_id") is not None:
+        clauses.append("p.category_id = %s")
+        params.append(filters["category_id"])
+    if filters.get("province"):
+        # cột sinh từ address->province (migration 0012), có index
+        clauses.append("p.address_province = %s")
+        params.append(filters["province"])
+
+    rest = {k: v for k, v in filters.items() if k not in ("category_id", "province")}
+    extra, extra_params = post_query.build_filters(**rest)
+    return clauses + extra, params + extra_params
+
+
+def dynamic_search_page(
+    filters: Dict[str, Any],
+    sort: Optional[str],
+    order: Optional[str],
+    page: int,
+    page_size: int,
+    with_total: bool = True,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    sort, order = post_query.normalize_sort(sort, order, post_query.DEFAULT_SORT)
+    page = max(page or 1, 1)
+    page_size = max(1, min(page_size or 20, post_query.MAX_PAGE_SIZE))
+
+    where, params = _dynamic_where(filters)
+    where_sql = " AND ".join(where)
+    col = post_query.SORT_COLUMNS[sort][0]
+    direction = "ASC" if order == "asc" else "DESC"
+    # tổng đi kèm từng dòng (COUNT(*) OVER()) -> trang + tổng trong 1 lần gọi như SP
+    total_sql = ", COUNT(*) OVER()" if with_total else ""
+
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT {post_query.select_sql()}{total_sql} FROM listings_post p"
+            f"{_index_hint(filters, sort)}"
+            f" WHERE {where_sql}"
+            f" ORDER BY {col} {direction}, p.id {direction}"
+            " LIMIT %s OFFSET %s",
+            params + [page_size, (page - 1) * page_size],
+        )
+        rows = cur.fetchall()
+        items = [post_query.row_to_json(r) for r in rows]
+
+        total = None
+        if with_total:
+            if rows:
+                total = int(rows[0][-1])
+            elif page == 1:
+                total = 0
+            else:
+                # trang vượt quá cuối -> không có dòng nào mang tổng, đếm riêng
+                cur.execute(f"SELECT COUNT(*) FROM listings_post p WHERE {where_sql}", params)
+                total = int(cur.fetchone()[0])
+    return items, total
+
+
+def procedure_filters(
+    filters: Dict[str, Any], names: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Bộ filter cho SP: mã đơn vị hành chính đổi lại thành tên gốc người dùng gửi
+    (`names`, trước admin_units.apply_filter_codes). Có mã mà thiếu tên -> None.
+    """
+    out = {k: v for k, v in filters.items() if k not in _CODE_FILTERS.values()}
+    for level, code_key in _CODE_FILTERS.items():
+        if filters.get(code_key) is None:
+            continue
+        name = (names or {}).get(level)
+        if not name:
+            return None
+        out[level] = name
+    return out
+
+
+# ========== ĐIỂM VÀO ==========
+def search_page(
+    filters: Dict[str, Any],
+    sort: Optional[str],
+    order: Optional[str],
+    page: int,
+    page_size: int,
+    with_total: bool = True,
+    names: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    1 trang kết quả (+ tổng nếu with_total) theo engine cấu hình trong
+    LISTINGS_SEARCH_ENGINE. Hai engine trả cùng shape JSON.
+    names: tên tỉnh / quận / phường gốc (engine procedure lọc theo tên, xem
+    procedure_filters); dynamic lọc theo mã.
+    """
+    engine = choose_engine()
+    sp_filters = procedure_filters(filters, names) if engine == ENGINE_PROCEDURE else None
+    if sp_filters is None:
+        engine = ENGINE_DYNAMIC
+    started = time.perf_counter()
+
+    if engine == ENGINE_DYNAMIC:
+        items, total = dynamic_search_page(
+            filters, sort, order, page, page_size, with_total=with_total
+        )
+    elif with_total:
+        items, total = post_procs.sp_posts_search_page(
+            **sp_filters, sort=sort, order=order, page=page, page_size=page_size
+        )
+    else:
+        items = post_procs.sp_posts_search(
+            **sp_filters, sort=sort, order=order, page=page, page_size=page_size
+        )
+        total = None
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _record(engine, elapsed_ms)
+    logger.debug("search engine=%s %.1fms filters=%s", engine, elapsed_ms, filters)
+    return items, total
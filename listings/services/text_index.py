@@ -0,0 +1,410 @@
+# listings/services/text_index.py
+
+import logging
+import math
+import os
+import pickle
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.dispatch import receiver
+
+from listings.models import Post
+from listings.services.post_counters import is_public_row, public_status_ids
+from listings.signals import post_changed
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+
+# BM25
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2  # 1 lần xuất hiện trong title tính bằng 2 lần trong mô tả
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_ROW_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "address",
+    "category_id",
+    "post_type_id",
+    "price",
+    "area",
+    "is_deleted",
+    "approval_status_id",
+    "post_status_id",
+    "created_at",
+    "bumped_at",
+    "updated_at",
+)
+
+
+# ========== TOKENIZER ==========
+def fold_vietnamese(text: Optional[str]) -> str:
+    """
+    Bỏ dấu tiếng Việt + lowercase: "Quận 7, Đà Nẵng" -> "quan 7, da nang".
+    """
+    if not text:
+        return ""
+    text = str(text).replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFD", text)
+    stripped = "".join(ch for ch in decomposed if unicodedata.category(ch) != "Mn")
+    return stripped.lower()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(fold_vietnamese(text))
+
+
+def _address_text(address: Any) -> str:
+    if not isinstance(address, dict):
+        return ""
+    parts = [address.get(k) for k in ("street", "ward", "district", "province")]
+    return " ".join(str(p) for p in parts if p)
+
+
+# ========== INDEX ==========
+class TextIndex:
+    """
+    Inverted index BM25 trong process cho title / description / địa chỉ.
+    Chỉ chứa bài public. Mỗi doc giữ thêm vài thuộc tính nhỏ để lọc + sắp xếp
+    ngay trong bộ nhớ; DB chỉ dùng để lấy đủ dữ liệu cho các id của trang.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_terms: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.doc_attrs: Dict[str, Dict[str, Any]] = {}
+        self.total_len = 0
+        self.synced_at: Optional[datetime] = None
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    # ----- ghi -----
+    def _remove_unlocked(self, post_id: str) -> None:
+        terms = self.doc_terms.pop(post_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            bucket = self.postings.get(term)
+            if bucket is not None:
+                bucket.pop(post_id, None)
+                if not bucket:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(post_id, 0)
+        self.doc_attrs.pop(post_id, None)
+
+    def remove(self, post_id: str) -> None:
+        with self._lock:
+            self._remove_unlocked(post_id)
+
+    def add_row(self, row: Dict[str, Any]) -> None:
+        post_id = str(row["id"])
+        tf: Dict[str, int] = defaultdict(int)
+        for tok in tokenize(row.get("title")):
+            tf[tok] += TITLE_WEIGHT
+        for tok in tokenize(row.get("description")):
+            tf[tok] += 1
+        address = row.get("address") or {}
+        for tok in tokenize(_address_text(address)):
+            tf[tok] += 1
+
+        if not isinstance(address, dict):
+            address = {}
+        # import muộn: admin_units dùng fold_vietnamese của module này
+        from listings.services.admin_units import address_codes
+
+        attrs = {
+            "category_id": row.get("category_id"),
+            "post_type_id": row.get("post_type_id"),
+            "price": float(row["price"]) if row.get("price") is not None else None,
+            "area": row.get("area"),
+            "province": fold_vietnamese(address.get("province")).strip(),
+            "district": fold_vietnamese(address.get("district")).strip(),
+            "ward": fold_vietnamese(address.get("ward")).strip(),
+            **address_codes(address),
+            "created_at": row.get("created_at"),
+            "bumped_at": row.get("bumped_at"),
+        }
+
+        with self._lock:
+            self._remove_unlocked(post_id)
+            for term, count in tf.items():
+                self.postings[term][post_id] = count
+            self.doc_terms[post_id] = dict(tf)
+            length = sum(tf.values())
+            self.doc_len[post_id] = length
+            self.total_len += length
+            self.doc_attrs[post_id] = attrs
+
+    def apply_rows(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        approved_id,
+        published_id,
+        advance_sync: bool = True,
+    ) -> None:
+        """
+        Cập nhật index theo các dòng Post mới đọc: public -> (re)index, còn lại -> gỡ.
+        advance_sync=False khi chỉ refresh vài bài lẻ (theo signal): không được
+        dời mốc synced_at, nếu không sẽ bỏ sót bài do worker khác sửa.
+        """
+        for row in rows:
+            if is_public_row(row, approved_id, published_id):
+                self.add_row(row)
+            else:
+                self.remove(str(row["id"]))
+            if not advance_sync:
+                continue
+            updated_at = row.get("updated_at")
+            if updated_at and (self.synced_at is None or updated_at > self.synced_at):
+                self.synced_at = updated_at
+
+    # ----- đọc -----
+    @staticmethod
+    def _match_attrs(attrs: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        for key in ("category_id", "post_type_id", "province_code", "district_code", "ward_code"):
+            if filters.get(key) is not None and attrs[key] != filters[key]:
+                return False
+        for key, attr, cmp in (
+            ("price_min", "price", lambda a, f: a >= f),
+            ("price_max", "price", lambda a, f: a <= f),
+            ("area_min", "area", lambda a, f: a >= f),
+            ("area_max", "area", lambda a, f: a <= f),
+        ):
+            if filters.get(key) is not None:
+                if attrs[attr] is None or not cmp(attrs[attr], filters[key]):
+                    return False
+        for key in ("province", "district", "ward"):
+            if filters.get(key):
+                if attrs[key] != fold_vietnamese(filters[key]).strip():
+                    return False
+        return True
+
+    def search(
+        self,
+        q: str,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[str], int]:
+        """
+        Trả (post_ids của trang, tổng số bài khớp).
+        Mặc định xếp theo điểm BM25; sort=price/area/created_at/bumped_at
+        thì xếp theo thuộc tính tương ứng.
+        Mọi từ khoá đều phải xuất hiện (AND).
+        """
+        filters = filters or {}
+        terms = list(dict.fromkeys(tokenize(q)))
+        if not terms:
+            return [], 0
+
+        with self._lock:
+            n_docs = len(self.doc_len)
+            if not n_docs:
+                return [], 0
+            avgdl = self.total_len / n_docs
+
+            buckets = [self.postings.get(t) for t in terms]
+            if any(not b for b in buckets):
+                return [], 0
+            buckets.sort(key=len)
+            candidates = set(buckets[0])
+            for bucket in buckets[1:]:
+                candidates.intersection_update(bucket)
+
+            scored = []
+            for post_id in candidates:
+                attrs = self.doc_attrs[post_id]
+                if not self._match_attrs(attrs, filters):
+                    continue
+                dl = self.doc_len[post_id]
+                score = 0.0
+                for bucket in buckets:
+                    df = len(bucket)
+                    tf = bucket[post_id]
+                    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                    score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+                scored.append((post_id, score, attrs))
+
+        if sort in ("price", "area", "created_at", "bumped_at"):
+            reverse = (order or "desc").lower() != "asc"
+            present = [s for s in scored if s[2][sort] is not None]
+            missing = [s for s in scored if s[2][sort] is None]
+            present.sort(key=lambda s: (s[2][sort], s[0]), reverse=reverse)
+            scored = present + missing
+        else:
+            scored.sort(key=lambda s: (-s[1], s[0]))
+
+        total = len(scored)
+        page = scored[offset: offset + limit]
+        return [post_id for post_id, _, _ in page], total
+
+    # ----- snapshot -----
+    def to_snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": SNAPSHOT_VERSION,
+                "synced_at": self.synced_at,
+                "doc_terms": self.doc_terms,
+                "doc_attrs": self.doc_attrs,
+            }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "TextIndex":
+        index = cls()
+        index.synced_at = data.get("synced_at")
+        index.doc_attrs = data["doc_attrs"]
+        index.doc_terms = data["doc_terms"]
+        for post_id, terms in index.doc_terms.items():
+            for term, count in terms.items():
+                index.postings[term][post_id] = count
+            length = sum(terms.values())
+            index.doc_len[post_id] = length
+            index.total_len += length
+        return index
+
+
+# ========== INDEX CỦA PROCESS ==========
+_index: Optional[TextIndex] = None
+_index_lock = threading.Lock()
+_last_sync = 0.0
+
+
+def _config() -> Dict[str, Any]:
+    return getattr(settings, "LISTINGS_TEXT_INDEX", {}) or {}
+
+
+def is_enabled() -> bool:
+    return bool(_config().get("ENABLED", False))
+
+
+def _snapshot_path() -> Optional[str]:
+    path = _config().get("PATH")
+    return str(path) if path else None
+
+
+def build_from_db(batch_size: int = 2000) -> TextIndex:
+    approved_id, published_id = public_status_ids()
+    index = TextIndex()
+    qs = Post.objects.values(*_ROW_FIELDS).order_by()
+    index.apply_rows(qs.iterator(chunk_size=batch_size), approved_id, published_id)
+    return index
+
+
+def save_snapshot(index: TextIndex, path: Optional[str] = None) -> str:
+    path = path or _snapshot_path()
+    if not path:
+        raise ValueError("LISTINGS_TEXT_INDEX['PATH'] chưa được cấu hình")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        pickle.dump(index.to_snapshot(), fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _load_snapshot() -> Optional[TextIndex]:
+    path = _snapshot_path()
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as fh:
+            data = pickle.load(fh)
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        return TextIndex.from_snapshot(data)
+    except Exception as e:  # snapshot hỏng -> build lại từ DB
+        logger.warning("Cannot load text index snapshot %s: %s", path, e)
+        return None
+
+
+def sync_changes() -> int:
+    """
+    Kéo các bài có updated_at mới hơn lần sync trước (do worker khác / SP ghi)
+    vào index của process này. Trả số dòng đã xử lý.
+    """
+    index = _index
+    if index is None:
+        return 0
+    qs = Post.objects.values(*_ROW_FIELDS).order_by("updated_at")
+    if index.synced_at is not None:
+        qs = qs.filter(updated_at__gt=index.synced_at)
+    rows = list(qs)
+    if rows:
+        approved_id, published_id = public_status_ids()
+        index.apply_rows(rows, approved_id, published_id)
+    return len(rows)
+
+
+def get_index() -> TextIndex:
+    """
+    Index của process: nạp snapshot (nếu có) rồi sync phần chênh lệch,
+    không có snapshot thì build từ DB. Sau đó cứ SYNC_INTERVAL giây
+    lại sync các bài mới sửa.
+    """
+    global _index, _last_sync
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = _load_snapshot()
+                _index = index if index is not None else build_from_db()
+                _last_sync = 0.0
+
+    interval = float(_config().get("SYNC_INTERVAL", 30))
+    now = time.monotonic()
+    if now - _last_sync >= interval:
+        with _index_lock:
+            if now - _last_sync >= interval:
+                _last_sync = now
+                sync_changes()
+    return _index
+
+
+def refresh_posts(post_ids: Iterable[str]) -> None:
+    index = _index
+    if index is None:
+        # Process này chưa dùng index -> lần đầu dùng sẽ nạp bản mới nhất.
+        return
+    ids = [str(pid) for pid in post_ids]
+    rows = {r["id"]: r for r in Post.objects.filter(id__in=ids).values(*_ROW_FIELDS)}
+    approved_id, published_id = public_status_ids()
+    for pid in ids:
+        if pid not in rows:
+            index.remove(pid)
+    index.apply_rows(rows.values(), approved_id, published_id, advance_sync=False)
+
+
+def search(
+    q: str,
+    filters: Optional[Dict[str, Any]] = None,
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> Tuple[List[str], int]:
+    offset = (max(page, 1) - 1) * page_size
+    return get_index().search(
+        q, filters=filters, sort=sort, order=order, offset=offset, limit=page_size
+    )
+
+
+@receiver(post_changed)
+def _on_post_changed(sender, post_ids, action, **kwargs):
+    if action == "images":
+        return
+    refresh_posts(post_ids)
@@ -0,0 +1,45 @@
+# listings/signals.py
+
+import logging
+from typing import Iterable
+
+from django.db import transaction
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# Phát ra SAU KHI dữ liệu bài đăng đã thay đổi (tạo / sửa / đổi trạng thái /
+# xoá mềm / bump / thêm-xoá ảnh). Các SP ghi thẳng vào MySQL nên Django
+# không có post_save -> các service tự nghe signal này để cập nhật
+# bộ đếm, cache, index...
+#
+# kwargs:
+#   post_ids: list[str]  - các bài vừa thay đổi
+#   action:   str        - "create" | "update" | "status" | "delete" | "bump" | "images"
+post_changed = Signal()
+
+
+def notify_post_changed(post_ids: Iterable, action: str) -> None:
+    """
+    Bắn post_changed sau khi transaction hiện tại commit
+    (ngoài transaction thì bắn ngay).
+    Lỗi của receiver chỉ ghi log, không làm hỏng request đã ghi xong DB.
+    """
+    ids = [str(pid) for pid in post_ids if pid]
+    if not ids:
+        return
+
+    def _send():
+        responses = post_changed.send_robust(
+            sender=post_changed, post_ids=ids, action=action
+        )
+        for receiver, result in responses:
+            if isinstance(result, Exception):
+                logger.error(
+                    "post_changed receiver %r failed: %s",
+                    receiver,
+                    result,
+                    exc_info=(type(result), result, result.__traceback__),
+                )
+
+    transaction.on_commit(_send)
@@ -3,15 +3,32 @@ from django.urls import path
 
 from listings.views.post_api import (
     PostListCreateView,
+    PostFacetsView,
     PostDetailView,
     PostStatusChangeView,
     OwnerPostListView,
     PostBumpView,
 )
+from listings.views.bump_schedule_api import PostBumpScheduleView
+from listings.views.bump_stats_api import BumpDailyStatsView
+from listings.views.history_api import PostHistoryView
+from listings.views.import_api import PostImportView
+from listings.views.masters_api import MastersView
+from listings.views.moderation_api import ModerationBatchView, ModerationQueueView
+from listings.views.search_cache_api import SearchCacheStatsView
+from listings.views.upload_api import (
+    LocalDirectUploadView,
+    PostImageFinalizeView,
+    PostImageUploadIntentView,
+)
 
 urlpatterns = [
     # /api/listings/posts
     path("posts", PostListCreateView.as_view(), name="post-list-create"),
+    # /api/listings/posts/facets (phải đứng trước posts/<id>)
+    path("posts/facets", PostFacetsView.as_view(), name="post-facets"),
+    # /api/listings/posts/import (CSV / JSONL, trả NDJSON)
+    path("posts/import", PostImportView.as_view(), name="post-import"),
     # /api/listings/posts/<id>
     path("posts/<str:post_id>", PostDetailView.as_view(), name="post-detail"),
     # /api/listings/posts/<id>/status
@@ -26,4 +43,38 @@ urlpatterns = [
         name="owner-posts",
     ),
     path("posts/<str:post_id>/bump", PostBumpView.as_view(), name="post-bump"),
+    # /api/listings/posts/<id>/history (lịch sử thay đổi, keyset)
+    path("posts/<str:post_id>/history", PostHistoryView.as_view(), name="post-history"),
+    # /api/listings/posts/<id>/bump-schedule (hẹn giờ tự đẩy tin)
+    path(
+        "posts/<str:post_id>/bump-schedule",
+        PostBumpScheduleView.as_view(),
+        name="post-bump-schedule",
+    ),
+    # /api/listings/posts/<id>/images/intents -> upload thẳng lên storage -> finalize
+    path(
+        "posts/<str:post_id>/images/intents",
+        PostImageUploadIntentView.as_view(),
+        name="post-image-upload-intents",
+    ),
+    path(
+        "posts/<str:post_id>/images/finalize",
+        PostImageFinalizeView.as_view(),
+        name="post-image-finalize",
+    ),
+    # /api/listings/uploads/local (chỉ khi LISTINGS_DIRECT_UPLOAD["SIGNER"] = "local")
+    path("uploads/local", LocalDirectUploadView.as_view(), name="direct-upload-local"),
+    # /api/listings/moderation/queue, /api/listings/moderation/batch
+    path("moderation/queue", ModerationQueueView.as_view(), name="moderation-queue"),
+    path("moderation/batch", ModerationBatchView.as_view(), name="moderation-batch"),
+    # /api/listings/bumps/daily (thống kê đẩy tin theo ngày, admin)
+    path("bumps/daily", BumpDailyStatsView.as_view(), name="bump-daily-stats"),
+    # /api/listings/masters
+    path("masters", MastersView.as_view(), name="masters"),
+    # /api/listings/search-cache/stats
+    path(
+        "search-cache/stats",
+        SearchCacheStatsView.as_view(),
+        name="search-cache-stats",
+    ),
 ]
@@ -0,0 +1,69 @@
+# listings/views/bump_schedule_api.py
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+
+from listings.models import Post, PostBumpSchedule
+from listings.services import bump_schedules
+
+
+def _owned_post(request, post_id: str):
+    """
+    (post, None) nếu bài tồn tại và người gọi là chủ bài, ngược lại (None, Response lỗi).
+    """
+    post = Post.objects.filter(id=post_id, is_deleted=False).first()
+    if post is None:
+        return None, Response(
+            {"ok": 0, "error": "NOT_FOUND", "message": "Bài đăng không tồn tại."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    if str(post.owner_id) != str(request.user.id):
+        return None, Response(
+            {"ok": 0, "error": "NOT_OWNER", "message": "Bạn không phải chủ của bài đăng này."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return post, None
+
+
+class PostBumpScheduleView(APIView):
+    """
+    /api/listings/posts/<id>/bump-schedule  (chủ bài, VIP còn hạn)
+      GET    -> lịch hiện tại (null nếu chưa hẹn)
+      PUT    body: {"times": ["08:00", "20:30"], "is_active": true}
+             tự đẩy tin mỗi ngày vào các giờ này (theo giờ Việt Nam)
+      DELETE -> huỷ lịch
+    Lệnh run_bump_scheduler thực hiện bump theo lô mỗi phút, trừ cùng hạn mức
+    bump / ngày với bump tay.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, post_id: str, *args, **kwargs):
+        post, error = _owned_post(request, post_id)
+        if error is not None:
+            return error
+        schedule = PostBumpSchedule.objects.filter(post_id=post.id).first()
+        return Response(
+            {"ok": 1, "schedule": bump_schedules.to_dict(schedule) if schedule else None}
+        )
+
+    def put(self, request, post_id: str, *args, **kwargs):
+        post, error = _owned_post(request, post_id)
+        if error is not None:
+            return error
+        result = bump_schedules.save_schedule(
+            post,
+            request.user,
+            request.data.get("times"),
+            is_active=request.data.get("is_active", True) not in (False, "false", "0", 0),
+        )
+        if result.get("ok") == 0:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
+
+    def delete(self, request, post_id: str, *args, **kwargs):
+        post, error = _owned_post(request, post_id)
+        if error is not None:
+            return error
+        return Response(bump_schedules.delete_schedule(post, request.user))
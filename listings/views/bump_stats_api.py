@@ -0,0 +1,68 @@
+# listings/views/bump_stats_api.py
+
+from datetime import date, timedelta
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+from django.utils import timezone
+
+from listings.services import bump_log
+from listings.services.auth_helpers import get_is_admin_flag
+
+MAX_RANGE_DAYS = 366
+
+
+class BumpDailyStatsView(APIView):
+    """
+    GET /api/listings/bumps/daily?dimension=post|actor|plan&from=YYYY-MM-DD&to=YYYY-MM-DD
+        &value=<post_id | actor_id | plan_code>&limit=50
+    Số lượt đẩy tin theo ngày từ bảng tổng hợp PostBumpDaily (chỉ SUPER_ADMIN/STAFF):
+      - có value: số bump từng ngày của value đó;
+      - không có: top `limit` value theo tổng số bump trong khoảng.
+    Mặc định 7 ngày gần nhất. Kèm trạng thái writer (số lượt còn trong buffer).
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if not get_is_admin_flag(request):
+            return Response(
+                {"detail": "Chỉ SUPER_ADMIN/STAFF mới xem được thống kê đẩy tin"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        params = request.query_params
+        dimension = params.get("dimension") or bump_log.DIM_POST
+        try:
+            date_to = date.fromisoformat(params["to"]) if params.get("to") else timezone.localdate()
+            date_from = (
+                date.fromisoformat(params["from"]) if params.get("from") else date_to - timedelta(days=6)
+            )
+            limit = min(max(int(params.get("limit") or 50), 1), 500)
+        except ValueError:
+            return Response(
+                {"detail": "from/to phải dạng YYYY-MM-DD, limit là số"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if date_from > date_to or (date_to - date_from).days >= MAX_RANGE_DAYS:
+            return Response(
+                {"detail": f"Khoảng ngày không hợp lệ (tối đa {MAX_RANGE_DAYS} ngày)"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            data = bump_log.daily_rollups(
+                dimension, date_from, date_to, value=params.get("value"), limit=limit
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {
+                "dimension": dimension,
+                "from": date_from.isoformat(),
+                "to": date_to.isoformat(),
+                **data,
+                "writer": bump_log.bump_log_writer.stats(),
+            }
+        )
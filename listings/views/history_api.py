@@ -0,0 +1,39 @@
+# listings/views/history_api.py
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+
+from listings.models import Post
+from listings.services import post_history, post_query
+from listings.services.auth_helpers import get_actor_id, get_is_admin_flag
+
+
+class PostHistoryView(APIView):
+    """
+    GET /api/listings/posts/<id>/history?cursor=&page_size=20
+    Lịch sử thay đổi của 1 bài (mới nhất trước, phân trang keyset).
+    Chủ bài hoặc SUPER_ADMIN/STAFF. `archived_before`: lịch sử cũ hơn mốc này
+    đã được chuyển ra file lưu trữ.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, post_id: str, *args, **kwargs):
+        owner_id = Post.objects.filter(id=post_id).values_list("owner_id", flat=True).first()
+        if owner_id is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not get_is_admin_flag(request) and str(owner_id) != str(get_actor_id(request)):
+            return Response(
+                {"detail": "Chỉ chủ bài hoặc SUPER_ADMIN/STAFF mới xem được lịch sử"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        try:
+            page_size = int(request.query_params.get("page_size") or 20)
+            page = post_history.history_page(
+                post_id, request.query_params.get("cursor"), page_size
+            )
+        except (ValueError, post_query.InvalidCursor) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page)
@@ -0,0 +1,68 @@
+# listings/views/import_api.py
+
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+from rest_framework.parsers import MultiPartParser
+
+from listings.services import post_import
+from listings.services.auth_helpers import (
+    get_actor_id,
+    get_is_admin_flag,
+    has_perm,
+    is_agent,
+)
+
+
+class PostImportView(APIView):
+    """
+    POST /api/listings/posts/import  (multipart)
+        file:       .csv / .jsonl
+        format:     csv | jsonl (mặc định đoán theo đuôi file)
+        dry_run:    1 -> chỉ kiểm tra, không tạo bài
+    Chỉ AGENT (hoặc admin). Trả về NDJSON stream: mỗi dòng là kết quả 1 bản ghi
+    {"row", "status": created|valid|invalid|quota_exceeded, "id" | "errors"},
+    dòng cuối là {"summary": {...}}.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        if not has_perm(request, "post.create"):
+            return Response(
+                {"detail": "Bạn không có quyền tạo bài (post.create)"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        agent_flag = is_agent(request)
+        if not agent_flag and not get_is_admin_flag(request):
+            return Response(
+                {"detail": "Chỉ AGENT mới được import bài hàng loạt"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"detail": "Thiếu file"}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get("format") or post_import.detect_format(upload.name)
+        if fmt not in post_import.FORMATS:
+            return Response(
+                {"detail": "format phải là csv hoặc jsonl"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        importer = post_import.PostImporter(
+            owner_id=get_actor_id(request),
+            is_agent_flag=agent_flag,
+            dry_run=str(request.data.get("dry_run", "")).lower() in ("1", "true"),
+        )
+
+        def _lines():
+            for result in importer.run(post_import.iter_rows(upload.file, fmt)):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+            yield json.dumps(importer.summary(), ensure_ascii=False) + "\n"
+
+        return StreamingHttpResponse(_lines(), content_type="application/x-ndjson")
@@ -0,0 +1,49 @@
+# listings/views/masters_api.py
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+
+from listings.services import masters
+
+# ?v=<version> khớp bản hiện tại -> nội dung URL đó không bao giờ đổi
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# không có / sai version -> client giữ bản cũ nhưng phải hỏi lại bằng If-None-Match
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in [t.strip() for t in header.split(",")]
+
+
+class MastersView(APIView):
+    """
+    GET /api/listings/masters
+    Toàn bộ danh mục (category, loại tin, trạng thái duyệt / hiển thị) trong 1 lần gọi,
+    kèm ETag mạnh = version của bundle:
+        - If-None-Match trùng ETag -> 304, không body
+        - ?v=<version> trùng bản hiện tại -> cache vĩnh viễn (immutable)
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        payload = masters.bundle()
+        etag = f'"{payload["version"]}"'
+        cache_control = (
+            IMMUTABLE_CACHE_CONTROL
+            if request.query_params.get("v") == payload["version"]
+            else REVALIDATE_CACHE_CONTROL
+        )
+
+        if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(payload)
+        response["ETag"] = etag
+        response["Cache-Control"] = cache_control
+        return response
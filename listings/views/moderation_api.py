@@ -0,0 +1,89 @@
+# listings/views/moderation_api.py
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+
+from listings.services import moderation, post_query
+from listings.services.auth_helpers import (
+    get_actor_id,
+    get_is_admin_flag,
+    has_perm,
+)
+
+
+def _forbidden(detail: str) -> Response:
+    return Response({"detail": detail}, status=status.HTTP_403_FORBIDDEN)
+
+
+class ModerationQueueView(APIView):
+    """
+    GET /api/listings/moderation/queue?cursor=&page_size=&category_id=
+    Bài chờ duyệt, cũ nhất trước (keyset), kèm ảnh bìa + người đăng.
+    Chỉ SUPER_ADMIN/STAFF có post.view_all.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if not get_is_admin_flag(request) or not has_perm(request, "post.view_all"):
+            return _forbidden("Thiếu quyền xem & quản lý tất cả bài (post.view_all)")
+
+        params = request.query_params
+        try:
+            page_size = int(params.get("page_size") or 20)
+            category_id = int(params["category_id"]) if params.get("category_id") else None
+            page = moderation.queue_page(
+                params.get("cursor"), page_size, category_id=category_id, request=request
+            )
+        except (ValueError, post_query.InvalidCursor) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page)
+
+
+class ModerationBatchView(APIView):
+    """
+    POST /api/listings/moderation/batch
+    body:
+    {
+      "action": "approve" | "reject" | "hide",
+      "post_ids": ["ABC123XYZ", ...],   (tối đa LISTINGS_MODERATION["MAX_BATCH"])
+      "reason": "..."                  (tuỳ chọn, ghi vào lịch sử)
+    }
+    Kiểm quyền 1 lần cho cả lô (approve: post.approve, reject: post.reject,
+    hide: post.view_all), đổi trạng thái trong 1 transaction.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if not get_is_admin_flag(request):
+            return _forbidden("Chỉ SUPER_ADMIN/STAFF mới được đổi trạng thái bài")
+
+        action = request.data.get("action")
+        perm = moderation.ACTION_PERMS.get(action)
+        if perm is None:
+            return Response(
+                {"detail": "action phải là approve, reject hoặc hide"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not has_perm(request, perm):
+            return _forbidden(f"Thiếu quyền {perm}")
+
+        post_ids = request.data.get("post_ids")
+        if not isinstance(post_ids, list):
+            return Response(
+                {"detail": "post_ids phải là list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            result = moderation.moderate(
+                post_ids,
+                action,
+                actor_id=get_actor_id(request),
+                reason=str(request.data.get("reason") or "")[:500],
+            )
+        except moderation.ModerationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
@@ -1,15 +1,36 @@
 # listings/views/post_api.py
 
+from functools import partial
 from typing import Optional
 import json
+import math
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from django.http import HttpResponse
 from listings.services.bump_services import bump_post_for_request
 
-from listings.services import post_procs
+from listings.services import (
+    admin_units,
+    detail_cache,
+    image_pipeline,
+    masters,
+    post_attributes,
+    post_cards,
+    post_procs,
+    post_counters,
+    post_facets,
+    post_geo,
+    post_images,
+    post_query,
+    quotas,
+    search_cache,
+    search_engine,
+    text_index,
+)
 from listings.services.auth_helpers import (
     get_actor_id,
     get_is_admin_flag,
@@ -19,6 +40,7 @@ from listings.services.auth_helpers import (
 
 from listings.models import Post, PostImage
 from listings.serializers import PostImageSerializer
+from listings.signals import notify_post_changed
 
 
 def _to_int(value: Optional[str]):
@@ -57,9 +79,146 @@ def _parse_json_field(data, key, default=None, allow_missing=True):
         raise ValueError(f"{key} must be valid JSON")
 
 
+def _attach_images(items, request, limit=None):
+    """
+    Gắn danh sách ảnh (PostImage) vào từng item trả về từ SP / query.
+    limit=N (?images_limit=N) -> mỗi bài chỉ gắn N ảnh đầu (card).
+    """
+    post_ids = [
+        item["id"]
+        for item in items
+        if isinstance(item, dict) and "id" in item
+    ]
+
+    # 1 query cho cả trang, URL tính từ template của storage
+    image_map = post_images.images_for_posts(post_ids, limit=limit, request=request)
+
+    # gắn images vào từng item
+    for item in items:
+        if isinstance(item, dict):
+            pid = str(item.get("id"))
+            item["images"] = image_map.get(pid, [])
+
+
+def _images_limit(params):
+    limit = _to_int(params.get("images_limit"))
+    if limit is not None and limit < 0:
+        raise ValueError("images_limit phải >= 0")
+    return limit or None
+
+
+def _search_filters(params, codes=True):
+    """
+    Bộ filter tìm kiếm (đã chuẩn hoá) từ query params.
+    codes=True: province / district / ward (tên hoặc mã) và *_code
+    -> mã đơn vị hành chính khi tra được (admin_units).
+    """
+    filters = search_cache.normalize_filters(
+        q=params.get("q"),
+        category_id=_to_int(params.get("category_id")),
+        post_type_id=_to_int(params.get("post_type_id")),
+        price_min=_to_float(params.get("price_min")),
+        price_max=_to_float(params.get("price_max")),
+        area_min=_to_float(params.get("area_min")),
+        area_max=_to_float(params.get("area_max")),
+        province=params.get("province"),
+        district=params.get("district"),
+        ward=params.get("ward"),
+    )
+    if not codes:
+        return filters
+    return admin_units.apply_filter_codes(
+        filters,
+        province_code=_to_int(params.get("province_code")),
+        district_code=_to_int(params.get("district_code")),
+        ward_code=_to_int(params.get("ward_code")),
+    )
+
+
+def _location_names(params):
+    """
+    Tên tỉnh / quận / phường gốc (trước khi đổi sang mã): engine procedure
+    chỉ lọc được theo tên (search_engine.procedure_filters).
+    """
+    filters = search_cache.normalize_filters(
+        province=params.get("province"),
+        district=params.get("district"),
+        ward=params.get("ward"),
+    )
+    return {k: filters[k] for k in ("province", "district", "ward")}
+
+
+def _float_list(raw: str, size: int, name: str):
+    try:
+        values = [float(x) for x in raw.split(",")]
+    except ValueError:
+        values = []
+    if len(values) != size or any(math.isnan(v) for v in values):
+        raise ValueError(f"{name} không hợp lệ")
+    return values
+
+
+def _attribute_filters(params):
+    """
+    Filter theo thuộc tính có kiểu (listings_postattribute), chỉ giữ filter có giá trị.
+    """
+    raw_direction = params.get("direction")
+    attrs = {
+        "bedrooms_min": _to_int(params.get("bedrooms_min")),
+        "bathrooms_min": _to_int(params.get("bathrooms_min")),
+        "direction": post_attributes.normalize_direction(raw_direction),
+        "legal_status": post_attributes.normalize_legal(params.get("legal_status")),
+        "price_per_m2_min": _to_float(params.get("price_per_m2_min")),
+        "price_per_m2_max": _to_float(params.get("price_per_m2_max")),
+    }
+    if raw_direction and not attrs["direction"]:
+        raise ValueError("direction không hợp lệ (N, S, E, W, NE, NW, SE, SW)")
+    return {k: v for k, v in attrs.items() if v not in (None, "")}
+
+
+def _geo_params(params):
+    """
+    near=lat,lng&radius_km=2  và/hoặc  bbox=min_lng,min_lat,max_lng,max_lat.
+    Không có tham số nào -> None.
+    """
+    near = bbox = radius_km = None
+
+    if params.get("near"):
+        lat, lng = _float_list(params["near"], 2, "near (lat,lng)")
+        near = post_geo.parse_point({"lat": lat, "lng": lng})
+        if near is None:
+            raise ValueError("near (lat,lng) không hợp lệ")
+        radius_km = _to_float(params.get("radius_km"))
+        if radius_km is not None and radius_km <= 0:
+            raise ValueError("radius_km phải > 0")
+
+    if params.get("bbox"):
+        min_lng, min_lat, max_lng, max_lat = _float_list(
+            params["bbox"], 4, "bbox (min_lng,min_lat,max_lng,max_lat)"
+        )
+        if not (
+            -90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180
+        ):
+            raise ValueError("bbox (min_lng,min_lat,max_lng,max_lat) không hợp lệ")
+        bbox = (min_lat, min_lng, max_lat, max_lng)
+
+    if near is None and bbox is None:
+        return None
+    return {"near": near, "radius_km": radius_km, "bbox": bbox}
+
+
 class PostListCreateView(APIView):
     """
     GET: search posts (public)
+         ?total=estimate -> cho phép trả tổng gần đúng (total_is_estimate=true)
+         ?cursor=        -> phân trang keyset, trả next_cursor
+         ?near=lat,lng&radius_km= / ?bbox=min_lng,min_lat,max_lng,max_lat
+                         -> tìm theo vị trí (bản đồ)
+         ?images_limit=1 -> mỗi bài chỉ kèm ảnh đầu tiên (card)
+         ?view=card      -> trả card gọn từ read model listings_postcard
+         ?bedrooms_min= &bathrooms_min= &direction= &legal_status=
+         &price_per_m2_min= &price_per_m2_max= / ?sort=price_per_m2
+                         -> lọc theo thuộc tính có kiểu (listings_postattribute)
     POST: create post (user có perm 'post.create') + upload images
     """
 
@@ -73,87 +232,244 @@ class PostListCreateView(APIView):
     def get(self, request, *args, **kwargs):
         params = request.query_params
 
-        q = params.get("q")
-        category_id = _to_int(params.get("category_id"))
-        post_type_id = _to_int(params.get("post_type_id"))
-        price_min = _to_float(params.get("price_min"))
-        price_max = _to_float(params.get("price_max"))
-        area_min = _to_float(params.get("area_min"))
-        area_max = _to_float(params.get("area_max"))
-        province = params.get("province")
-        district = params.get("district")
-        ward = params.get("ward")
-        sort = params.get("sort")
-        order = params.get("order")
-        page = _to_int(params.get("page")) or 1
-        page_size = _to_int(params.get("page_size")) or 20
+        try:
+            filters = _search_filters(params)
+            names = _location_names(params)
+            page, page_size = search_cache.normalize_paging(
+                _to_int(params.get("page")),
+                _to_int(params.get("page_size")),
+            )
+        except ValueError:
+            return Response(
+                {"detail": "Tham số filter không hợp lệ"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        sort = (params.get("sort") or "").lower() or None
+        order = (params.get("order") or "").lower() or None
+        keyset = "cursor" in params
+        cursor = params.get("cursor") or None
+        estimate = params.get("total") == "estimate"
+        card = params.get("view") == "card"
 
-        items = post_procs.sp_posts_search(
-            q=q,
-            category_id=category_id,
-            post_type_id=post_type_id,
-            price_min=price_min,
-            price_max=price_max,
-            area_min=area_min,
-            area_max=area_max,
-            province=province,
-            district=district,
-            ward=ward,
+        try:
+            geo = _geo_params(params)
+            images_limit = _images_limit(params)
+            attributes = _attribute_filters(params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if geo and keyset:
+            return Response(
+                {"detail": "near/bbox chưa hỗ trợ phân trang cursor, dùng page"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        by_attributes = bool(attributes) or sort in post_query.ATTRIBUTE_SORTS
+        if by_attributes and (keyset or geo):
+            return Response(
+                {
+                    "detail": "Filter / sort theo thuộc tính chưa hỗ trợ cùng "
+                    "cursor hoặc near/bbox, dùng page"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Cache theo bộ filter đã chuẩn hoá; bị xoá mỗi khi có bài thay đổi.
+        key = search_cache.make_key(
+            "cursor" if keyset else "page",
+            filters,
             sort=sort,
             order=order,
-            page=page,
+            page=None if keyset else page,
             page_size=page_size,
+            cursor=cursor,
+            estimate=estimate,
+            geo=geo,
+            images_limit=images_limit,
+            card=card,
+            attributes=attributes,
+            # tên gốc: tên khác nhau cùng 1 mã vẫn ra kết quả khác nhau qua SP
+            names=names,
+            host=request.get_host(),
         )
+        if card and not geo and not by_attributes:
+            compute = partial(
+                self._card_payload,
+                request, filters, sort, order, page, page_size, keyset, cursor,
+            )
+        else:
+            compute = partial(
+                self._search_payload,
+                request, filters, sort, order, page, page_size,
+                keyset, cursor, estimate, geo, images_limit, attributes, names,
+            )
+        try:
+            payload = search_cache.get_or_set(key, compute)
+        except post_query.InvalidCursor as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # ===== GẮN ẢNH CHO TỪNG POST =====
-        post_ids = [
-            item["id"]
-            for item in items
-            if isinstance(item, dict) and "id" in item
-        ]
-
-        image_map = {}
-        if post_ids:
-            images_qs = PostImage.objects.filter(
-                post_id__in=post_ids
-            ).order_by("created_at")
-
-            # build map: post_id -> [images...]
-            for img in images_qs:
-                data = PostImageSerializer(
-                    img,
-                    context={"request": request},
-                ).data
-                key = str(img.post_id)
-                image_map.setdefault(key, []).append(data)
-
-        # gắn images vào từng item
-        for item in items:
-            if isinstance(item, dict):
-                pid = str(item.get("id"))
-                item["images"] = image_map.get(pid, [])
-
-        total = post_procs.sp_posts_count(
-            q=q,
-            category_id=category_id,
-            post_type_id=post_type_id,
-            price_min=price_min,
-            price_max=price_max,
-            area_min=area_min,
-            area_max=area_max,
-            province=province,
-            district=district,
-            ward=ward,
-        )
+        return Response(payload)
+
+    def _card_payload(
+        self, request, filters, sort, order, page, page_size, keyset, cursor,
+    ):
+        # ?view=card -> đọc thẳng từ read model listings_postcard
+        # (đã có tên category / loại tin, ảnh bìa, số ảnh), 1 query / trang.
+        if keyset:
+            cards, next_cursor = post_cards.search_keyset(
+                cursor=cursor,
+                page_size=page_size,
+                sort=sort,
+                order=order,
+                **filters,
+            )
+            return {
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "results": post_cards.absolutize(cards, request),
+            }
 
-        return Response(
-            {
+        if filters.get("q") and text_index.is_enabled():
+            post_ids, total = text_index.search(
+                filters["q"],
+                filters=filters,
+                sort=sort,
+                order=order,
+                page=page,
+                page_size=page_size,
+            )
+            cards = post_cards.fetch_by_ids(post_ids)
+        else:
+            cards, total = post_cards.search_page(
+                sort=sort,
+                order=order,
+                page=page,
+                page_size=page_size,
+                **filters,
+            )
+
+        return {
+            "total": total,
+            "total_is_estimate": False,
+            "page": page,
+            "page_size": page_size,
+            "results": post_cards.absolutize(cards, request),
+        }
+
+    def _search_payload(
+        self, request, filters, sort, order, page, page_size,
+        keyset, cursor, estimate, geo=None, images_limit=None, attributes=None, names=None,
+    ):
+        # ?near=lat,lng&radius_km= / ?bbox= -> tìm theo vị trí qua listings_postgeo
+        # (có near thì mặc định sắp theo khoảng cách, mỗi item có distance_km).
+        if geo:
+            items, total = post_query.search_geo(
+                **geo,
+                sort=sort,
+                order=order,
+                page=page,
+                page_size=page_size,
+                **filters,
+            )
+            _attach_images(items, request, images_limit)
+            return {
+                "total": total,
+                "total_is_estimate": False,
+                "page": page,
+                "page_size": page_size,
+                "results": items,
+            }
+
+        # ?cursor=... -> phân trang keyset (cursor rỗng = trang đầu),
+        # trang sâu tốn như trang 1; không có page/total.
+        if keyset:
+            items, next_cursor = post_query.search_keyset(
+                cursor=cursor,
+                page_size=page_size,
+                sort=sort,
+                order=order,
+                **filters,
+            )
+            _attach_images(items, request, images_limit)
+            return {
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "results": items,
+            }
+
+        # bedrooms_min / direction / price_per_m2_* ... hoặc sort=price_per_m2
+        # -> quét index của listings_postattribute, JOIN sang listings_post.
+        if attributes or sort in post_query.ATTRIBUTE_SORTS:
+            items, total = post_query.search_with_attributes(
+                attributes or {},
+                sort=sort,
+                order=order,
+                page=page,
+                page_size=page_size,
+                **filters,
+            )
+            _attach_images(items, request, images_limit)
+            return {
+                "total": total,
+                "total_is_estimate": False,
+                "page": page,
+                "page_size": page_size,
+                "results": items,
+            }
+
+        # Có từ khoá -> xếp hạng bằng text index trong process (BM25),
+        # DB chỉ dùng để lấy dữ liệu cho các id của trang.
+        if filters.get("q") and text_index.is_enabled():
+            post_ids, total = text_index.search(
+                filters["q"],
+                filters=filters,
+                sort=sort,
+                order=order,
+                page=page,
+                page_size=page_size,
+            )
+            items = post_query.fetch_by_ids(post_ids)
+            _attach_images(items, request, images_limit)
+            return {
                 "total": total,
+                "total_is_estimate": False,
                 "page": page,
                 "page_size": page_size,
                 "results": items,
             }
+
+        # ?total=estimate -> filter rộng (không q, chỉ province | mã tỉnh / category /
+        # post_type) lấy tổng gần đúng từ bộ đếm, bỏ qua hẳn bước đếm trên listings_post.
+        total = None
+        if estimate:
+            total = post_counters.estimate_total(**filters)
+        total_is_estimate = total is not None
+
+        # Engine theo LISTINGS_SEARCH_ENGINE: procedure (trang + tổng trong
+        # 1 lần CALL) hoặc dynamic (SQL chỉ gồm filter đang có).
+        items, counted = search_engine.search_page(
+            filters,
+            sort,
+            order,
+            page,
+            page_size,
+            with_total=not total_is_estimate,
+            names=names,
         )
+        if not total_is_estimate:
+            total = counted
+
+        # ===== GẮN ẢNH CHO TỪNG POST =====
+        _attach_images(items, request, images_limit)
+
+        return {
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+            "page": page,
+            "page_size": page_size,
+            "results": items,
+        }
 
     def post(self, request, *args, **kwargs):
         # 1) Check đăng nhập
@@ -190,22 +506,6 @@ class PostListCreateView(APIView):
         # Lọc bỏ None / file rỗng
         valid_files = [f for f in files if f]
 
-        # 3.2) Áp hạn mức số ảnh theo role
-        max_images = 10 if is_agent_flag == 1 else 6
-        if len(valid_files) > max_images:
-            return Response(
-                {
-                    "ok": 0,
-                    "error": "MAX_IMAGES_PER_POST_REACHED",
-                    "message": (
-                        "Bạn chỉ được upload tối đa "
-                        f"{max_images} ảnh cho mỗi bài đăng "
-                        + ("(AGENT: 10, MEMBER: 6)." if max_images == 10 else "(MEMBER: 6).")
-                    ),
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
         # ---- Parse JSON fields (hỗ trợ cả JSON & multipart) ----
         try:
             address_json = _parse_json_field(
@@ -252,24 +552,41 @@ class PostListCreateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # ====== GỌI SP TẠO BÀI ======
-        result = post_procs.sp_post_create(
-            actor_id=actor_id,
-            is_agent=is_agent_flag,
-            title=data.get("title"),
-            description=data.get("description"),
-            address_json=address_json,
-            location_json=location_json,
-            details_json=details_json,
-            other_info_json=other_info_json,
-            area=area,
-            price=price,
-            post_type_id=post_type_id,
-            category_id=category_id,
+        # ====== HẠN MỨC: 1 bài / ngày + số ảnh theo role / gói (1 lần kiểm) ======
+        quota = quotas.consume(
+            {quotas.KIND_POST: 1, quotas.KIND_IMAGE: len(valid_files)},
+            user_id=actor_id,
+            limits=quotas.limits_for_user(actor_id, is_agent_flag),
         )
+        if not quota["ok"]:
+            return Response(
+                {"ok": 0, "error": quota["error"], "message": quota["message"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # Nếu SP trả lỗi dạng { ok: 0, ... } (vd: MAX_DAILY_POSTS_REACHED)
+        # ====== GỌI SP TẠO BÀI ======
+        try:
+            result = post_procs.sp_post_create(
+                actor_id=actor_id,
+                is_agent=is_agent_flag,
+                title=data.get("title"),
+                description=data.get("description"),
+                address_json=address_json,
+                location_json=location_json,
+                details_json=details_json,
+                other_info_json=other_info_json,
+                area=area,
+                price=price,
+                post_type_id=post_type_id,
+                category_id=category_id,
+            )
+        except Exception:
+            quotas.release({quotas.KIND_POST: 1}, user_id=actor_id)
+            raise
+
+        # Nếu SP trả lỗi dạng { ok: 0, ... } -> trả lại lượt tạo bài
         if isinstance(result, dict) and result.get("ok") == 0:
+            quotas.release({quotas.KIND_POST: 1}, user_id=actor_id)
             return Response(result, status=status.HTTP_400_BAD_REQUEST)
 
         post_id = result.get("id") if isinstance(result, dict) else None
@@ -283,9 +600,9 @@ class PostListCreateView(APIView):
         except Post.DoesNotExist:
             return Response(result, status=status.HTTP_201_CREATED)
 
-        # Dùng lại valid_files đã lấy ở trên (đã check limit)
-        for f in valid_files:
-            PostImage.objects.create(post=post, image=f)
+        # Dùng lại valid_files đã lấy ở trên (đã check limit).
+        # Lưu tạm + trả placeholder (status=pending), upload storage chạy nền.
+        image_pipeline.enqueue_uploads(post, valid_files)
 
         # ====== GẮN LIST ẢNH VÀO RESPONSE ======
         if isinstance(result, dict):
@@ -298,6 +615,37 @@ class PostListCreateView(APIView):
 
         return Response(result, status=status.HTTP_201_CREATED)
 
+class PostFacetsView(APIView):
+    """
+    GET /api/listings/posts/facets
+    Số bài theo category / post_type / tỉnh / quận / khoảng giá cho bộ filter
+    hiện tại (cùng query params với GET /posts) trong 1 response.
+    Admin có thêm số bài theo trạng thái duyệt / hiển thị.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            # bộ đếm sẵn theo tên tỉnh -> facet giữ filter chuỗi
+            filters = _search_filters(request.query_params, codes=False)
+        except ValueError:
+            return Response(
+                {"detail": "Tham số filter không hợp lệ"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        key = search_cache.make_key("facets", filters)
+        payload = search_cache.get_or_set(
+            key, lambda: post_facets.facet_counts(filters)
+        )
+
+        if request.user.is_authenticated and get_is_admin_flag(request):
+            payload["statuses"] = post_facets.status_counts()
+
+        return Response(payload)
+
+
 class PostDetailView(APIView):
     """
     GET: chi tiết post + danh sách ảnh
@@ -308,26 +656,46 @@ class PostDetailView(APIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     parser_classes = [JSONParser, FormParser, MultiPartParser]
 
+    def get_authenticators(self):
+        # GET chỉ cần user_id trong token -> không query bảng user,
+        # để 304 / cache hit không chạm MySQL
+        if self.request is not None and self.request.method == "GET":
+            return [JWTStatelessUserAuthentication()]
+        return super().get_authenticators()
+
     def get(self, request, post_id: str, *args, **kwargs):
-        data = post_procs.sp_post_get_json(post_id)
-        if not data:
+        entry = detail_cache.get(post_id, post_images.absolute_base(request))
+        if entry is None:
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Gắn thêm images từ ORM
-        try:
-            post_obj = Post.objects.get(id=post_id)
-            images_qs = PostImage.objects.filter(post=post_obj)
-            images_data = PostImageSerializer(
-                images_qs,
-                many=True,
-                context={"request": request},
-            ).data
+        # ảnh đang upload / lỗi chỉ chủ bài thấy -> chủ bài không dùng bản cache công khai
+        if str(get_actor_id(request) or "") == entry.owner_id:
+            response = self._owner_detail(request, post_id)
+            response["Cache-Control"] = "private, no-cache"
+            return response
 
-            if isinstance(data, dict):
-                data["images"] = images_data
-        except Post.DoesNotExist:
-            pass
+        if detail_cache.etag_matches(request.headers.get("If-None-Match", ""), entry.etag):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(entry.body, content_type="application/json")
+        response["ETag"] = entry.etag
+        response["Cache-Control"] = "public, no-cache"
+        response["X-Detail-Cache"] = entry.state.upper()
+        return response
 
+    def _owner_detail(self, request, post_id: str):
+        data = post_procs.sp_post_get_json(post_id)
+        if not data:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        # Gắn thêm images từ ORM (kể cả ảnh pending / failed có status)
+        images_data = PostImageSerializer(
+            PostImage.objects.filter(post_id=post_id),
+            many=True,
+            context={"request": request},
+        ).data
+        if isinstance(data, dict):
+            data["images"] = images_data
         return Response(data)
 
     def patch(self, request, post_id: str, *args, **kwargs):
@@ -376,6 +744,29 @@ class PostDetailView(APIView):
         post_type_id = _to_int(data.get("post_type_id")) if "post_type_id" in data else None
         category_id = _to_int(data.get("category_id")) if "category_id" in data else None
 
+        # ====== HẠN MỨC ẢNH CỦA BÀI (tính cả ảnh đang có) ======
+        if hasattr(request.data, "getlist"):
+            files = request.data.getlist("images")
+        else:
+            files = request.FILES.getlist("images")
+        files = [f for f in files if f]
+        if files:
+            quota = quotas.consume(
+                {quotas.KIND_IMAGE: len(files)},
+                post_id=post_id,
+                # admin không bị giới hạn, vẫn đếm để bộ đếm khớp số ảnh thật
+                limits=(
+                    {quotas.KIND_IMAGE: quotas.UNLIMITED}
+                    if is_admin_flag
+                    else quotas.limits_for_user(actor_id, is_agent(request))
+                ),
+            )
+            if not quota["ok"]:
+                return Response(
+                    {"ok": 0, "error": quota["error"], "message": quota["message"]},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
         # ====== GỌI SP UPDATE BÀI ======
         result = post_procs.sp_post_update(
             post_id=post_id,
@@ -393,16 +784,17 @@ class PostDetailView(APIView):
             category_id=category_id,
         )
 
-        if result and result.get("error") == "NOT_ALLOWED_OR_NOT_FOUND":
-            return Response(result, status=status.HTTP_403_FORBIDDEN)
-
-        if not result:
+        if not result or result.get("error") == "NOT_ALLOWED_OR_NOT_FOUND":
+            quotas.release({quotas.KIND_IMAGE: len(files)}, post_id=post_id)
+            if result:
+                return Response(result, status=status.HTTP_403_FORBIDDEN)
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
 
         # ====== SAU KHI UPDATE THÀNH CÔNG: XỬ LÝ ẢNH ======
         try:
             post = Post.objects.get(id=post_id)
         except Post.DoesNotExist:
+            quotas.release({quotas.KIND_IMAGE: len(files)}, post_id=post_id)
             return Response(result)
 
         # 1) Xoá ảnh theo delete_image_ids (optional)
@@ -414,24 +806,25 @@ class PostDetailView(APIView):
                 else:
                     delete_ids = delete_raw
                 if isinstance(delete_ids, list) and delete_ids:
-                    PostImage.objects.filter(post=post, id__in=delete_ids).delete()
+                    to_delete = PostImage.objects.filter(post=post, id__in=delete_ids)
+                    image_pipeline.discard(
+                        to_delete.filter(status=PostImage.STATUS_PENDING)
+                    )
+                    # ảnh failed đã được trả hạn mức khi chuyển failed
+                    in_quota = to_delete.exclude(status=PostImage.STATUS_FAILED).count()
+                    deleted, _ = to_delete.delete()
+                    if deleted:
+                        quotas.release({quotas.KIND_IMAGE: in_quota}, post_id=post.id)
+                        notify_post_changed([post.id], "images")
             except (TypeError, ValueError, json.JSONDecodeError):
                 pass
 
-        # 2) Thêm ảnh mới (images)
-        if hasattr(request.data, "getlist"):
-            files = request.data.getlist("images")
-        else:
-            files = request.FILES.getlist("images")
-
-        new_images = []
-        for f in files:
-            if not f:
-                continue
-            img = PostImage.objects.create(post=post, image=f)
-            new_images.append(
-                PostImageSerializer(img, context={"request": request}).data
-            )
+        # 2) Thêm ảnh mới (images, đã trừ hạn mức ở trên)
+        new_images = PostImageSerializer(
+            image_pipeline.enqueue_uploads(post, files),
+            many=True,
+            context={"request": request},
+        ).data
 
         # 3) Trả lại result + danh sách ảnh hiện tại
         all_images = PostImageSerializer(
@@ -488,10 +881,6 @@ class PostStatusChangeView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
 
-    # Huynh chỉnh lại 2 hằng số này theo id thực tế trong bảng listings_approvalstatus
-    ID_APPROVED = 2
-    ID_REJECTED = 3
-
     def patch(self, request, post_id: str, *args, **kwargs):
         actor_id = get_actor_id(request)
         is_admin_flag = get_is_admin_flag(request)
@@ -506,9 +895,12 @@ class PostStatusChangeView(APIView):
         data = request.data
         approval_status_id = _to_int(data.get("approval_status_id"))
         post_status_id = _to_int(data.get("post_status_id"))
+        # id thực tế trong listings_approvalstatus, tra theo tên từ registry
+        approved_id = masters.approval_status_id(masters.APPROVAL_APPROVED)
+        rejected_id = masters.approval_status_id(masters.APPROVAL_REJECTED)
 
         # Nếu chuyển sang Approved -> cần post.approve
-        if approval_status_id == self.ID_APPROVED:
+        if approval_status_id is not None and approval_status_id == approved_id:
             if not has_perm(request, "post.approve"):
                 return Response(
                     {"detail": "Thiếu quyền duyệt bài (post.approve)"},
@@ -516,7 +908,7 @@ class PostStatusChangeView(APIView):
                 )
 
         # Nếu chuyển sang Rejected -> cần post.reject
-        if approval_status_id == self.ID_REJECTED:
+        if approval_status_id is not None and approval_status_id == rejected_id:
             if not has_perm(request, "post.reject"):
                 return Response(
                     {"detail": "Thiếu quyền từ chối bài (post.reject)"},
@@ -525,7 +917,7 @@ class PostStatusChangeView(APIView):
 
         # Các thay đổi trạng thái khác: có thể chỉ cần post.view_all
         if (
-            approval_status_id not in (self.ID_APPROVED, self.ID_REJECTED)
+            approval_status_id not in (approved_id, rejected_id)
             and approval_status_id is not None
         ):
             if not has_perm(request, "post.view_all"):
@@ -551,6 +943,8 @@ class PostStatusChangeView(APIView):
 class OwnerPostListView(APIView):
     """
     GET /api/listings/owner-posts/?owner_id=&page=&page_size=&only_public=
+    GET /api/listings/owner-posts/?owner_id=&cursor=&page_size=   (keyset)
+    GET /api/listings/owner-posts/?owner_id=&view=card            (card, chỉ bài public)
 
     - Ai cũng xem được (AllowAny)
     - Dùng để:
@@ -573,9 +967,43 @@ class OwnerPostListView(APIView):
         page = _to_int(params.get("page")) or 1
         page_size = _to_int(params.get("page_size")) or 20
 
+        try:
+            images_limit = _images_limit(params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         only_public_raw = params.get("only_public", "1")
         only_public = 1 if only_public_raw in ["1", "true", "True"] else 0
 
+        # ?view=card (chỉ bài public) -> đọc từ read model listings_postcard
+        if params.get("view") == "card" and only_public:
+            return self._cards(request, owner_id, page, page_size)
+
+        # ?cursor=... -> phân trang keyset theo (created_at, id)
+        if "cursor" in params:
+            try:
+                items, next_cursor = post_query.owner_posts_keyset(
+                    owner_id=owner_id,
+                    only_public=only_public,
+                    cursor=params.get("cursor") or None,
+                    page_size=page_size,
+                )
+            except post_query.InvalidCursor as e:
+                return Response(
+                    {"detail": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            _attach_images(items, request, images_limit)
+            return Response(
+                {
+                    "page_size": page_size,
+                    "next_cursor": next_cursor,
+                    "results": items,
+                },
+                status=status.HTTP_200_OK,
+            )
+
         items = post_procs.sp_posts_by_owner(
             owner_id=owner_id,
             only_public=only_public,
@@ -584,30 +1012,7 @@ class OwnerPostListView(APIView):
         )
 
         # ===== GẮN ẢNH CHO TỪNG POST =====
-        post_ids = [
-            item["id"]
-            for item in items
-            if isinstance(item, dict) and "id" in item
-        ]
-
-        image_map = {}
-        if post_ids:
-            images_qs = PostImage.objects.filter(
-                post_id__in=post_ids
-            ).order_by("created_at")
-
-            for img in images_qs:
-                data = PostImageSerializer(
-                    img,
-                    context={"request": request},
-                ).data
-                key = str(img.post_id)
-                image_map.setdefault(key, []).append(data)
-
-        for item in items:
-            if isinstance(item, dict):
-                pid = str(item.get("id"))
-                item["images"] = image_map.get(pid, [])
+        _attach_images(items, request, images_limit)
 
         return Response(
             {
@@ -618,6 +1023,41 @@ class OwnerPostListView(APIView):
             status=status.HTTP_200_OK,
         )
 
+    def _cards(self, request, owner_id, page, page_size):
+        params = request.query_params
+        if "cursor" in params:
+            try:
+                cards, next_cursor = post_cards.owner_keyset(
+                    owner_id=owner_id,
+                    cursor=params.get("cursor") or None,
+                    page_size=page_size,
+                )
+            except post_query.InvalidCursor as e:
+                return Response(
+                    {"detail": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(
+                {
+                    "page_size": page_size,
+                    "next_cursor": next_cursor,
+                    "results": post_cards.absolutize(cards, request),
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        cards, total = post_cards.owner_page(owner_id, page, page_size)
+        return Response(
+            {
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "results": post_cards.absolutize(cards, request),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class PostBumpView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
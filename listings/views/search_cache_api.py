@@ -0,0 +1,32 @@
+# listings/views/search_cache_api.py
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+
+from listings.services import detail_cache, search_cache, search_engine
+from listings.services.auth_helpers import get_is_admin_flag
+
+
+class SearchCacheStatsView(APIView):
+    """
+    GET /api/listings/search-cache/stats
+    Số hit/miss của cache kết quả tìm kiếm + latency theo search engine
+    + cache chi tiết bài (chỉ SUPER_ADMIN/STAFF).
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if not get_is_admin_flag(request):
+            return Response(
+                {"detail": "Chỉ SUPER_ADMIN/STAFF mới xem được thống kê cache"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(
+            {
+                **search_cache.stats(),
+                "engines": search_engine.stats(),
+                "detail": detail_cache.stats(),
+            }
+        )
@@ -0,0 +1,152 @@
+# listings/views/upload_api.py
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+from rest_framework.parsers import MultiPartParser
+
+from listings.models import Post
+from listings.serializers import PostImageSerializer
+from listings.services import direct_uploads
+from listings.services.auth_helpers import (
+    get_actor_id,
+    get_is_admin_flag,
+    has_perm,
+    is_agent,
+)
+
+
+def _error(e: direct_uploads.UploadError) -> Response:
+    return Response(
+        {"ok": 0, "error": e.code, "message": e.message},
+        status=e.status_code,
+    )
+
+
+def _editable_post(request, post_id: str):
+    """
+    (post, None) nếu người gọi được sửa ảnh của bài, ngược lại (None, Response lỗi).
+    Admin sửa mọi bài; AGENT / MEMBER cần post.update_own + chính chủ.
+    """
+    actor_id = get_actor_id(request)
+    is_admin_flag = get_is_admin_flag(request)
+    if not is_admin_flag and not has_perm(request, "post.update_own"):
+        return None, Response(
+            {"detail": "Không có quyền sửa bài của mình (post.update_own)"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    post = Post.objects.filter(id=post_id, is_deleted=0).first()
+    if post is None or (not is_admin_flag and str(post.owner_id) != str(actor_id)):
+        return None, Response(
+            {"detail": "Not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return post, None
+
+
+class PostImageUploadIntentView(APIView):
+    """
+    POST /api/listings/posts/<id>/images/intents
+    body: {"count": 3}
+    Cấp tham số upload đã ký cho từng slot ảnh; client upload thẳng lên storage
+    (không đi qua API), rồi gọi .../images/finalize với token trả về.
+    Áp hạn mức ảnh theo role / gói VIP (LISTINGS_QUOTAS) tính cả ảnh đã có.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, post_id: str, *args, **kwargs):
+        post, error = _editable_post(request, post_id)
+        if error is not None:
+            return error
+        try:
+            count = int(request.data.get("count", 1))
+        except (TypeError, ValueError):
+            return Response({"detail": "count không hợp lệ"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            intent = direct_uploads.create_intent(
+                post,
+                actor_id=get_actor_id(request),
+                is_agent_flag=is_agent(request),
+                count=count,
+                request=request,
+            )
+        except direct_uploads.UploadError as e:
+            return _error(e)
+        return Response(intent, status=status.HTTP_201_CREATED)
+
+
+class PostImageFinalizeView(APIView):
+    """
+    POST /api/listings/posts/<id>/images/finalize
+    body:
+    {
+      "token": "<token từ intents>",
+      "uploads": [{"public_id": "...", "version": 1712..., "signature": "..."}]
+    }
+    (public_id / version / signature lấy nguyên từ response upload của storage)
+    Đăng ký các ảnh đã upload thành PostImage trong 1 lần insert.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, post_id: str, *args, **kwargs):
+        post, error = _editable_post(request, post_id)
+        if error is not None:
+            return error
+        uploads = request.data.get("uploads")
+        if not isinstance(uploads, list) or not all(isinstance(u, dict) for u in uploads):
+            return Response(
+                {"detail": "uploads phải là list các object"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            images = direct_uploads.finalize(
+                post,
+                actor_id=get_actor_id(request),
+                is_agent_flag=is_agent(request),
+                token=request.data.get("token"),
+                uploads=uploads,
+            )
+        except direct_uploads.UploadError as e:
+            return _error(e)
+        return Response(
+            {
+                "ok": 1,
+                "images": PostImageSerializer(
+                    images, many=True, context={"request": request}
+                ).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class LocalDirectUploadView(APIView):
+    """
+    POST /api/listings/uploads/local  (multipart: file + các field đã ký)
+    Stand-in của storage khi LISTINGS_DIRECT_UPLOAD["SIGNER"] = "local"
+    (dev / test offline). Signer khác -> 404.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        signer = direct_uploads.get_signer()
+        if not isinstance(signer, direct_uploads.LocalSigner):
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"detail": "Thiếu file"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = signer.accept(
+                public_id=request.data.get("public_id") or "",
+                expires=request.data.get("expires"),
+                signature=request.data.get("signature") or "",
+                upload=upload,
+            )
+        except direct_uploads.UploadError as e:
+            return _error(e)
+        return Response(result, status=status.HTTP_201_CREATED)
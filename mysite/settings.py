@@ -206,6 +206,9 @@ CLOUDINARY_STORAGE = {
 }
 
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
+# Chạy test / dev không có Cloudinary: LISTINGS_IMAGE_STORAGE=local -> lưu ảnh vào MEDIA_ROOT
+if os.getenv("LISTINGS_IMAGE_STORAGE") == "local":
+    DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
 
 cloudinary.config(
     cloud_name=CLOUDINARY_STORAGE["CLOUD_NAME"],
@@ -215,4 +218,169 @@ cloudinary.config(
  
 # MEDIA_URL vẫn để vậy cho FE dễ dùng (thực ra ảnh load từ Cloudinary)
 MEDIA_URL = "/media/"
-MEDIA_ROOT = BASE_DIR / "media"
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / "media"
+
+# ===== LISTINGS: CACHE KẾT QUẢ TÌM KIẾM =====
+# BACKEND: local (LRU trong process) | redis (dùng chung các worker) | off
+LISTINGS_SEARCH_CACHE = {
+    "BACKEND": os.getenv("LISTINGS_SEARCH_CACHE_BACKEND", "local"),
+    "TTL": int(os.getenv("LISTINGS_SEARCH_CACHE_TTL", "60")),
+    "MAX_ENTRIES": 2048,
+    "REDIS_URL": os.getenv("LISTINGS_REDIS_URL", "redis://127.0.0.1:6379/1"),
+}
+
+# ===== LISTINGS: FULL-TEXT INDEX (BM25, bỏ dấu tiếng Việt) =====
+# Snapshot được tạo bằng: python manage.py rebuild_text_index
+LISTINGS_TEXT_INDEX = {
+    "ENABLED": os.getenv("LISTINGS_TEXT_INDEX_ENABLED", "True") == "True",
+    "PATH": os.getenv("LISTINGS_TEXT_INDEX_PATH", str(BASE_DIR / "var" / "text_index.pickle")),
+    "SYNC_INTERVAL": int(os.getenv("LISTINGS_TEXT_INDEX_SYNC_INTERVAL", "30")),
+}
+
+# ===== LISTINGS: SEARCH ENGINE =====
+# "procedure": gọi SP như cũ | "dynamic": SQL chỉ gồm filter đang có
+# "ab": chia ngẫu nhiên AB_DYNAMIC_PERCENT% request sang dynamic để so latency
+LISTINGS_SEARCH_ENGINE = {
+    "ENGINE": os.getenv("LISTINGS_SEARCH_ENGINE", "procedure"),
+    "AB_DYNAMIC_PERCENT": int(os.getenv("LISTINGS_SEARCH_AB_DYNAMIC_PERCENT", "50")),
+}
+
+# ===== LISTINGS: DANH MỤC (category, loại tin, trạng thái) =====
+# Nạp 1 lần / process, tự xoá khi sửa danh mục trong process đó;
+# TTL (giây) để các worker khác cũng thấy thay đổi, 0 = không hết hạn.
+LISTINGS_MASTERS = {
+    "TTL": int(os.getenv("LISTINGS_MASTERS_TTL", "300")),
+}
+
+# ===== LISTINGS: GHI LỊCH SỬ THEO LÔ =====
+# Lịch sử thay đổi tần suất cao (bump) được gom lại, thread nền ghi mỗi
+# FLUSH_INTERVAL giây hoặc khi đủ MAX_BATCH dòng. ENABLED=False -> ghi ngay.
+LISTINGS_HISTORY_BUFFER = {
+    "ENABLED": os.getenv("LISTINGS_HISTORY_BUFFER_ENABLED", "True") == "True",
+    "MAX_BATCH": int(os.getenv("LISTINGS_HISTORY_BUFFER_MAX_BATCH", "500")),
+    "FLUSH_INTERVAL": float(os.getenv("LISTINGS_HISTORY_BUFFER_FLUSH_INTERVAL", "5")),
+}
+
+# ===== CẤP ID 9 KÝ TỰ (Post, User) =====
+# Mỗi process giữ trước BLOCK_SIZE id / lần (1 UPDATE sequence / khối).
+ID_ALLOCATOR = {
+    "BLOCK_SIZE": int(os.getenv("ID_ALLOCATOR_BLOCK_SIZE", "100")),
+}
+
+# ===== LISTINGS: UPLOAD ẢNH CHẠY NỀN =====
+# Ảnh được lưu tạm vào SPOOL_DIR, trả placeholder (pending) ngay, WORKERS thread
+# upload song song lên storage, lỗi thì thử lại (RETRY_BACKOFF * 2^n giây).
+# EAGER=True: upload ngay trong request (test). ENABLED=False: upload đồng bộ như cũ.
+LISTINGS_IMAGE_PIPELINE = {
+    "ENABLED": os.getenv("LISTINGS_IMAGE_PIPELINE_ENABLED", "True") == "True",
+    "EAGER": os.getenv("LISTINGS_IMAGE_PIPELINE_EAGER", "False") == "True",
+    "SPOOL_DIR": os.getenv("LISTINGS_IMAGE_SPOOL_DIR", str(BASE_DIR / "var" / "image_spool")),
+    "WORKERS": int(os.getenv("LISTINGS_IMAGE_UPLOAD_WORKERS", "4")),
+    "MAX_ATTEMPTS": int(os.getenv("LISTINGS_IMAGE_UPLOAD_MAX_ATTEMPTS", "5")),
+    "RETRY_BACKOFF": float(os.getenv("LISTINGS_IMAGE_UPLOAD_RETRY_BACKOFF", "2")),
+}
+
+# ===== LISTINGS: DERIVATIVE ẢNH (THUMBNAIL / WEBP / BLURHASH) =====
+# Mỗi ảnh upload sinh các bản WebP theo chiều rộng WIDTHS (không phóng to),
+# blurhash và kích thước gốc; render trên WORKERS process (Pillow).
+LISTINGS_IMAGE_VARIANTS = {
+    "ENABLED": os.getenv("LISTINGS_IMAGE_VARIANTS_ENABLED", "True") == "True",
+    "WIDTHS": {
+        "thumb": int(os.getenv("LISTINGS_IMAGE_THUMB_WIDTH", "320")),
+        "medium": int(os.getenv("LISTINGS_IMAGE_MEDIUM_WIDTH", "960")),
+    },
+    "QUALITY": int(os.getenv("LISTINGS_IMAGE_WEBP_QUALITY", "75")),
+    "WORKERS": int(os.getenv("LISTINGS_IMAGE_VARIANT_WORKERS", "2")),
+    "TIMEOUT": float(os.getenv("LISTINGS_IMAGE_VARIANT_TIMEOUT", "60")),
+}
+
+# ===== LISTINGS: UPLOAD ẢNH TRỰC TIẾP LÊN STORAGE =====
+# Client xin tham số đã ký (posts/<id>/images/intents), upload thẳng lên storage,
+# rồi finalize. SIGNER: "cloudinary" | "local" (stand-in offline, lưu qua
+# endpoint uploads/local). TOKEN_TTL: hạn của phiên upload (giây).
+LISTINGS_DIRECT_UPLOAD = {
+    "SIGNER": os.getenv(
+        "LISTINGS_DIRECT_UPLOAD_SIGNER",
+        "local" if os.getenv("LISTINGS_IMAGE_STORAGE") == "local" else "cloudinary",
+    ),
+    "TOKEN_TTL": int(os.getenv("LISTINGS_DIRECT_UPLOAD_TOKEN_TTL", "3600")),
+}
+
+# ===== LISTINGS: IMPORT BÀI HÀNG LOẠT (CSV / JSONL) =====
+# BATCH_SIZE dòng / transaction (1 lần cấp id + 1 bulk insert).
+# Hạn mức bài / ngày: LISTINGS_QUOTAS (chung với tạo bài qua API).
+LISTINGS_IMPORT = {
+    "BATCH_SIZE": int(os.getenv("LISTINGS_IMPORT_BATCH_SIZE", "500")),
+}
+
+# ===== LISTINGS: DUYỆT BÀI THEO LÔ =====
+LISTINGS_MODERATION = {
+    "MAX_BATCH": int(os.getenv("LISTINGS_MODERATION_MAX_BATCH", "500")),
+}
+
+# ===== LISTINGS: HẠN MỨC (BÀI / NGÀY, ĐẨY TIN / NGÀY, ẢNH / BÀI) =====
+# Kiểm + tăng nguyên tử. BACKEND: "db" (bảng QuotaCounter, UPDATE có điều kiện)
+# | "redis" (script Lua, dùng chung nhiều server) | "memory" (1 process, dev).
+# Ngày tính theo TIME_ZONE. ROLES: hạn mức theo role; PLANS: ghi đè theo
+# MembershipPlan.code (gói chưa khai báo -> DEFAULT).
+LISTINGS_QUOTAS = {
+    "BACKEND": os.getenv("LISTINGS_QUOTA_BACKEND", "db"),
+    "REDIS_URL": os.getenv("LISTINGS_QUOTA_REDIS_URL", "redis://127.0.0.1:6379/1"),
+    "ROLES": {
+        "MEMBER": {
+            "post": int(os.getenv("LISTINGS_QUOTA_MEMBER_DAILY_POSTS", "10")),
+            "bump": 0,
+            "image": int(os.getenv("LISTINGS_QUOTA_MEMBER_IMAGES", "6")),
+        },
+        "AGENT": {
+            "post": int(os.getenv("LISTINGS_QUOTA_AGENT_DAILY_POSTS", "1000")),
+            "bump": 10,
+            "image": int(os.getenv("LISTINGS_QUOTA_AGENT_IMAGES", "10")),
+        },
+    },
+    "PLANS": {
+        "AGENT_1M": {"bump": 10},
+        "AGENT_3M": {"bump": 20},
+        "DEFAULT": {"bump": 10},
+    },
+}
+
+# ===== LISTINGS: LOG ĐẨY TIN (PostBumpLog + PostBumpDaily) =====
+# Ghi theo lô ở thread nền: flush khi đủ MAX_BATCH lượt hoặc sau FLUSH_INTERVAL giây;
+# mỗi lô cộng luôn bảng tổng hợp theo ngày (post / actor / plan).
+# ENABLED=False -> ghi ngay sau commit (không buffer).
+LISTINGS_BUMP_LOG = {
+    "ENABLED": os.getenv("LISTINGS_BUMP_LOG_BUFFER_ENABLED", "True") == "True",
+    "MAX_BATCH": int(os.getenv("LISTINGS_BUMP_LOG_MAX_BATCH", "500")),
+    "FLUSH_INTERVAL": float(os.getenv("LISTINGS_BUMP_LOG_FLUSH_INTERVAL", "0.5")),
+}
+
+# ===== LISTINGS: HẸN GIỜ TỰ ĐẨY TIN =====
+# Lệnh run_bump_scheduler mỗi phút bump theo lô tối đa BATCH_SIZE lịch đến hạn.
+# MAX_TIMES: số mốc giờ / bài / ngày (thêm giới hạn bởi hạn mức bump của gói).
+LISTINGS_BUMP_SCHEDULE = {
+    "BATCH_SIZE": int(os.getenv("LISTINGS_BUMP_SCHEDULE_BATCH_SIZE", "1000")),
+    "MAX_TIMES": int(os.getenv("LISTINGS_BUMP_SCHEDULE_MAX_TIMES", "24")),
+}
+
+# ===== LISTINGS: LƯU TRỮ LỊCH SỬ BÀI (PostHistory) =====
+# archive_post_history: dòng cũ hơn MONTHS tháng -> file JSONL gzip trong DIR,
+# rồi xoá khỏi bảng theo lô CHUNK_SIZE dòng. compact_post_history: gom bump liên tiếp.
+LISTINGS_HISTORY_ARCHIVE = {
+    "DIR": os.getenv("LISTINGS_HISTORY_ARCHIVE_DIR", str(BASE_DIR / "var" / "history_archive")),
+    "MONTHS": int(os.getenv("LISTINGS_HISTORY_ARCHIVE_MONTHS", "6")),
+    "CHUNK_SIZE": int(os.getenv("LISTINGS_HISTORY_ARCHIVE_CHUNK_SIZE", "5000")),
+}
+
+# ===== LISTINGS: CACHE CHI TIẾT BÀI (ETag + stale-while-revalidate) =====
+# TTL: thời gian entry còn "tươi"; STALE_TTL: sau đó vẫn trả bản cũ trong khi
+# 1 worker dựng lại ở thread nền. BACKEND: local | redis | off.
+LISTINGS_DETAIL_CACHE = {
+    "BACKEND": os.getenv("LISTINGS_DETAIL_CACHE_BACKEND", "local"),
+    "TTL": int(os.getenv("LISTINGS_DETAIL_CACHE_TTL", "300")),
+    "STALE_TTL": int(os.getenv("LISTINGS_DETAIL_CACHE_STALE_TTL", "60")),
+    "LOCK_TTL": 30,
+    "REFRESH_WORKERS": 2,
+    "MAX_ENTRIES": 4096,
+    "REDIS_URL": os.getenv("LISTINGS_REDIS_URL", "redis://127.0.0.1:6379/1"),
+}